@@ -0,0 +1,194 @@
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app import crud
+from app.cache import user_cache
+from app.models import Contact, EmailOutbox, User
+from app.pagination import ContactSort
+from app.search import SearchMode
+from app.schemas import CachedUser, ContactCreate, ContactFilter, ContactUpdate, UserCreate
+
+# Async-обгортки над app.crud.
+# AsyncSession виконує ту саму логіку через run_sync (greenlet, без блокування
+# event loop), звичайна Session — у threadpool, тож роутери не залежать від режиму.
+DbSession = Union[Session, AsyncSession]
+
+
+async def run(db: DbSession, fn, *args, **kwargs):
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+async def get_user_by_email(db: DbSession, email: str) -> Optional[User]:
+    return await run(db, crud.get_user_by_email, email)
+
+
+# Читання користувача через кеш: БД запитується лише при промаху
+async def get_cached_user_by_email(db: DbSession, email: str) -> Optional[CachedUser]:
+    cached = await user_cache.get_by_email(email)
+    if cached is not None:
+        return cached
+    user = await run(db, crud.get_user_by_email, email)
+    return await user_cache.set(user) if user else None
+
+
+async def get_cached_user(db: DbSession, user_id: int) -> Optional[CachedUser]:
+    cached = await user_cache.get_by_id(user_id)
+    if cached is not None:
+        return cached
+    user = await run(db, crud.get_user_by_id, user_id)
+    return await user_cache.set(user) if user else None
+
+
+# Записи в users одразу оновлюють кеш (write-through)
+async def create_user(
+    db: DbSession,
+    user: UserCreate,
+    hashed_password: str,
+    outbox: Sequence[EmailOutbox] = (),
+) -> User:
+    db_user = await run(db, crud.create_user, user, hashed_password, outbox)
+    await user_cache.set(db_user)
+    return db_user
+
+
+async def verify_user(db: DbSession, user_id: int) -> Optional[User]:
+    await user_cache.invalidate(user_id=user_id)
+    db_user = await run(db, crud.verify_user, user_id)
+    if db_user:
+        await user_cache.set(db_user)
+    return db_user
+
+
+async def update_avatar(db: DbSession, user_id: int, avatar_url: str) -> Optional[User]:
+    await user_cache.invalidate(user_id=user_id)
+    db_user = await run(db, crud.update_avatar, user_id, avatar_url)
+    if db_user:
+        await user_cache.set(db_user)
+    return db_user
+
+
+async def create_contact(db: DbSession, contact: ContactCreate, user_id: int) -> Contact:
+    return await run(db, crud.create_contact, contact, user_id)
+
+
+async def bulk_create_contacts(db: DbSession, user_id: int, rows: List[Tuple[int, ContactCreate]]) -> List[Tuple[int, str]]:
+    return await run(db, crud.bulk_create_contacts, user_id, rows)
+
+
+async def get_contacts(
+    db: DbSession, user_id: int, skip: int = 0, limit: int = 10, as_rows: bool = False
+) -> List[Contact]:
+    return await run(db, crud.get_contacts, user_id, skip, limit, as_rows)
+
+
+async def get_contacts_version(db: DbSession, user_id: int) -> int:
+    return await run(db, crud.get_contacts_version, user_id)
+
+
+async def get_contacts_page(
+    db: DbSession,
+    user_id: int,
+    sort: ContactSort = ContactSort.id,
+    after: Optional[Tuple[Any, int]] = None,
+    limit: int = 10,
+    as_rows: bool = False,
+) -> Tuple[List[Contact], Optional[Tuple[Any, int]]]:
+    return await run(db, crud.get_contacts_page, user_id, sort, after, limit, as_rows)
+
+
+async def get_contact_by_id(db: DbSession, contact_id: int, user_id: int) -> Optional[Contact]:
+    return await run(db, crud.get_contact_by_id, contact_id, user_id)
+
+
+async def update_contact(db: DbSession, contact_id: int, contact: ContactUpdate, user_id: int) -> Optional[Contact]:
+    return await run(db, crud.update_contact, contact_id, contact, user_id)
+
+
+async def delete_contact(db: DbSession, contact_id: int, user_id: int) -> bool:
+    return await run(db, crud.delete_contact, contact_id, user_id)
+
+
+async def batch_update_contacts(
+    db: DbSession,
+    user_id: int,
+    changes: ContactUpdate,
+    ids: Optional[List[int]] = None,
+    filter: Optional[ContactFilter] = None,
+    max_size: int = 1000,
+) -> List[int]:
+    return await run(db, crud.batch_update_contacts, user_id, changes, ids, filter, max_size)
+
+
+async def batch_delete_contacts(
+    db: DbSession,
+    user_id: int,
+    ids: Optional[List[int]] = None,
+    filter: Optional[ContactFilter] = None,
+    max_size: int = 1000,
+) -> List[int]:
+    return await run(db, crud.batch_delete_contacts, user_id, ids, filter, max_size)
+
+
+async def search_contacts(
+    db: DbSession,
+    query: str,
+    user_id: int,
+    mode: SearchMode = SearchMode.substring,
+    limit: int = 50,
+    as_rows: bool = False,
+) -> List[Contact]:
+    return await run(db, crud.search_contacts, query, user_id, mode, limit, as_rows)
+
+
+async def get_upcoming_birthdays(
+    db: DbSession, user_id: int, days: int = 7, as_rows: bool = False
+) -> List[Contact]:
+    return await run(db, crud.get_upcoming_birthdays, user_id, days, as_rows)
+
+
+async def claim_outbox_batch(db: DbSession, batch_size: int, lease_seconds: int) -> List[EmailOutbox]:
+    return await run(db, crud.claim_outbox_batch, batch_size, lease_seconds)
+
+
+async def mark_outbox_sent(db: DbSession, message_ids: List[int]) -> None:
+    return await run(db, crud.mark_outbox_sent, message_ids)
+
+
+async def mark_outbox_failed(db: DbSession, message_id: int, error: str, next_attempt_at: Optional[datetime]) -> None:
+    return await run(db, crud.mark_outbox_failed, message_id, error, next_attempt_at)
+
+
+async def count_outbox(db: DbSession) -> dict:
+    return await run(db, crud.count_outbox)
+
+
+async def get_contact_changes(
+    db: DbSession, user_id: int, since: Optional[int], limit: int = 500
+) -> Tuple[List[dict], int, bool]:
+    return await run(db, crud.get_contact_changes, user_id, since, limit)
+
+
+async def compact_contact_changes(db: DbSession, before: datetime) -> int:
+    return await run(db, crud.compact_contact_changes, before)
+
+
+async def next_digest_chunk(db: DbSession, digest_date: date, after_user_id: int, size: int) -> Optional[int]:
+    return await run(db, crud.next_digest_chunk, digest_date, after_user_id, size)
+
+
+async def get_birthday_digest_rows(
+    db: DbSession, digest_date: date, days: int, after_user_id: int, last_user_id: int
+) -> List[Tuple[Any, ...]]:
+    return await run(db, crud.get_birthday_digest_rows, digest_date, days, after_user_id, last_user_id)
+
+
+async def save_birthday_digests(
+    db: DbSession, digest_date: date, digests: Sequence[Tuple[int, int, EmailOutbox]]
+) -> None:
+    return await run(db, crud.save_birthday_digests, digest_date, digests)
@@ -1,39 +1,42 @@
 from datetime import datetime, timedelta
-from jose import JWTError, jwt
-from app.db import get_password_hash, verify_password
-from app.models import User
+from jose import JWTError
 
-from fastapi import Depends, HTTPException, status
+from fastapi import HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.db import get_db
 
-import os
-from dotenv import load_dotenv
+from app.jwt_backend import SigningKey, TokenCache, get_jwt_backend
+from settings import settings
 
-from fastapi import BackgroundTasks
+SECRET_KEY = settings.SECRET_KEY
+ALGORITHM = settings.ALGORITHM
+ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
+EMAIL_TOKEN_EXPIRE_MINUTES = settings.EMAIL_TOKEN_EXPIRE_MINUTES
 
-load_dotenv()
-
-SECRET_KEY = os.getenv("SECRET_KEY")
-ALGORITHM = os.getenv("ALGORITHM")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
-EMAIL_TOKEN_EXPIRE_MINUTES = int(os.getenv("EMAIL_TOKEN_EXPIRE_MINUTES", 60))
+# Один ключ і один бекенд на процес: спільні для access- та email-токенів
+signing_key = SigningKey(SECRET_KEY, ALGORITHM)
+jwt_backend = get_jwt_backend(settings.JWT_BACKEND)
+token_cache = TokenCache(maxsize=settings.JWT_CACHE_SIZE)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
-def create_access_token(data: dict):
+def create_token(data: dict, expires_delta: timedelta) -> str:
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    to_encode.update({"exp": datetime.utcnow() + expires_delta})
+    return jwt_backend.encode(to_encode, signing_key)
+
+def create_access_token(data: dict):
+    return create_token(data, timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
 
 def decode_access_token(token: str):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    payload = token_cache.get(token)
+    if payload is not None:
         return payload
+    try:
+        payload = jwt_backend.decode(token, signing_key)
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token",
-        )
\ No newline at end of file
+        )
+    token_cache.set(token, payload)
+    return payload
@@ -0,0 +1,202 @@
+import asyncio
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Union
+
+from fastapi import UploadFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+from starlette.concurrency import run_in_threadpool
+
+from app.storage import AvatarStorage, build_avatar_storage
+from settings import settings
+
+ALLOWED_FORMATS = {"JPEG", "PNG", "WEBP", "GIF"}
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class AvatarError(Exception):
+    pass
+
+
+class InvalidImage(AvatarError):
+    pass
+
+
+class AvatarTooLarge(AvatarError):
+    pass
+
+
+class AvatarUploadsOverloaded(AvatarError):
+    pass
+
+
+# Перевірка, зменшення і перекодування; виконується у пулі потоків —
+# Pillow відпускає GIL під час декодування і масштабування
+def process_image(data: bytes, max_side: int, max_pixels: int, quality: int) -> bytes:
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            if image.format not in ALLOWED_FORMATS:
+                raise InvalidImage(f"Unsupported image format: {image.format}")
+            # Розмір із заголовка перевіряється до декодування пікселів
+            if image.width * image.height > max_pixels:
+                raise InvalidImage("Image dimensions are too large")
+            image.seek(0)
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+            output = io.BytesIO()
+            # Метадані (EXIF, GPS) не копіюються
+            image.save(output, format="WEBP", quality=quality, method=4)
+            return output.getvalue()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError) as e:
+        raise InvalidImage(f"Invalid image: {e}") from e
+
+
+# Ключ — хеш вихідних байтів разом із параметрами обробки. Він не залежить від того,
+# як конкретна версія Pillow перекодує файл, тож однаковий на всіх воркерах, а дубль
+# знаходиться ще до декодування
+def avatar_key(data: bytes, max_side: int, quality: int) -> str:
+    digest = hashlib.sha256(data)
+    digest.update(f":{max_side}:{quality}".encode())
+    return digest.hexdigest() + ".webp"
+
+
+class AvatarMetrics:
+    def __init__(self):
+        self.uploaded = 0
+        self.deduplicated = 0
+        self.rejected = 0
+
+    def snapshot(self) -> dict:
+        return {"uploaded": self.uploaded, "deduplicated": self.deduplicated, "rejected": self.rejected}
+
+
+class AvatarService:
+    def __init__(
+        self,
+        storage: Union[AvatarStorage, Callable[[], AvatarStorage]],
+        max_bytes: int = 5 * 1024 * 1024,
+        max_side: int = 512,
+        max_pixels: int = 40_000_000,
+        quality: int = 85,
+        max_concurrent: int = 4,
+        max_pending: int = 32,
+        workers: int = 2,
+        known_keys: int = 10000,
+    ):
+        self._storage = storage
+        self.max_bytes = max_bytes
+        self.max_side = max_side
+        self.max_pixels = max_pixels
+        self.quality = quality
+        self.max_concurrent = max_concurrent
+        self.max_pending = max_pending
+        self.workers = workers
+        self.known_keys = known_keys
+        self.pending = 0
+        self.metrics = AvatarMetrics()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Хеш вмісту -> URL уже завантажених файлів, щоб не питати сховище щоразу
+        self._urls: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Сховище можна передати фабрикою: клієнт створюється при першому завантаженні
+    @property
+    def storage(self) -> AvatarStorage:
+        if not isinstance(self._storage, AvatarStorage):
+            self._storage = self._storage()
+        return self._storage
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="avatar")
+        return self._executor
+
+    # Семафор прив'язується до event loop, тож створюється в тому циклі, де його
+    # використовують: модульний сервіс переживає кілька запусків застосунку
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self._semaphore
+
+    # Читання частинами з обмеженням розміру замість file.file цілком
+    async def read_upload(self, file: UploadFile) -> bytes:
+        buffer = bytearray()
+        while chunk := await file.read(READ_CHUNK_SIZE):
+            buffer += chunk
+            if len(buffer) > self.max_bytes:
+                raise AvatarTooLarge(f"Avatar must not exceed {self.max_bytes} bytes")
+        if not buffer:
+            raise InvalidImage("Empty file")
+        return bytes(buffer)
+
+    def _cached_url(self, key: str) -> Optional[str]:
+        with self._lock:
+            url = self._urls.get(key)
+            if url is not None:
+                self._urls.move_to_end(key)
+            return url
+
+    def _remember(self, key: str, url: str) -> None:
+        with self._lock:
+            self._urls[key] = url
+            self._urls.move_to_end(key)
+            while len(self._urls) > self.known_keys:
+                self._urls.popitem(last=False)
+
+    # Спершу пам'ять процесу, потім сховище — там видно файли інших воркерів
+    async def _find(self, key: str) -> Optional[str]:
+        url = self._cached_url(key)
+        if url is None:
+            url = await run_in_threadpool(self.storage.find, key)
+        if url is not None:
+            self.metrics.deduplicated += 1
+        return url
+
+    async def upload(self, file: UploadFile) -> str:
+        if self.pending >= self.max_pending:
+            self.metrics.rejected += 1
+            raise AvatarUploadsOverloaded("Too many avatar uploads in progress")
+        self.pending += 1
+        try:
+            async with self.semaphore:
+                data = await self.read_upload(file)
+                key = avatar_key(data, self.max_side, self.quality)
+                url = await self._find(key)
+                if url is None:
+                    loop = asyncio.get_running_loop()
+                    processed = await loop.run_in_executor(
+                        self.executor, process_image, data, self.max_side, self.max_pixels, self.quality
+                    )
+                    url = await run_in_threadpool(self.storage.save, key, processed, "image/webp")
+                    self.metrics.uploaded += 1
+                self._remember(key, url)
+                return url
+        finally:
+            self.pending -= 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+avatar_service = AvatarService(
+    storage=build_avatar_storage,
+    max_bytes=settings.AVATAR_MAX_BYTES,
+    max_side=settings.AVATAR_MAX_SIDE,
+    quality=settings.AVATAR_QUALITY,
+    max_concurrent=settings.AVATAR_MAX_CONCURRENT_UPLOADS,
+    max_pending=settings.AVATAR_MAX_PENDING_UPLOADS,
+    workers=settings.AVATAR_WORKERS,
+)
@@ -0,0 +1,180 @@
+import argparse
+import asyncio
+import logging
+import time
+from datetime import date, datetime, timedelta
+from itertools import groupby
+from operator import itemgetter
+from typing import Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+
+from app import async_crud
+from app.db import session_scope
+from app.email_utils import build_birthday_digests
+from settings import settings
+
+logger = logging.getLogger("app.birthday_digest")
+
+
+class DigestStats:
+    def __init__(self, digest_date: date):
+        self.digest_date = digest_date
+        self.chunks = 0
+        self.conflicts = 0
+        self.emails = 0
+        self.contacts = 0
+        self.seconds = 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            "digest_date": self.digest_date.isoformat(),
+            "chunks": self.chunks,
+            "conflicts": self.conflicts,
+            "emails": self.emails,
+            "contacts": self.contacts,
+            "seconds": round(self.seconds, 3),
+        }
+
+
+# Розсилка дайджестів днів народження всім підтвердженим користувачам.
+# Користувачі обробляються пакетами за діапазонами id, до concurrency пакетів одночасно.
+# Листи лише додаються в outbox (їх відправляє app.outbox через пул SMTP-з'єднань),
+# а журнал birthday_digests є чекпоінтом: повторний запуск пропускає оброблених.
+class BirthdayDigestJob:
+    def __init__(self, days: int = 7, chunk_size: int = 500, concurrency: int = 4):
+        self.days = days
+        self.chunk_size = chunk_size
+        self.concurrency = concurrency
+        self.last_run: Optional[DigestStats] = None
+
+    async def _next_chunk(self, digest_date: date, after_user_id: int) -> Optional[int]:
+        async with session_scope() as db:
+            return await async_crud.next_digest_chunk(db, digest_date, after_user_id, self.chunk_size)
+
+    async def process_chunk(self, digest_date: date, chunk: Tuple[int, int]) -> Tuple[int, int]:
+        after_user_id, last_user_id = chunk
+        async with session_scope() as db:
+            rows = await async_crud.get_birthday_digest_rows(db, digest_date, self.days, after_user_id, last_user_id)
+            recipients = []
+            user_ids = []
+            for (user_id, email), contacts in groupby(rows, key=itemgetter(0, 1)):
+                user_ids.append(user_id)
+                recipients.append((email, [(f"{row[2]} {row[3]}", row[4]) for row in contacts]))
+            if not recipients:
+                return 0, 0
+            messages = build_birthday_digests(recipients, self.days)
+            digests = [
+                (user_id, len(contacts), message)
+                for user_id, (_, contacts), message in zip(user_ids, recipients, messages)
+            ]
+            await async_crud.save_birthday_digests(db, digest_date, digests)
+        return len(digests), sum(count for _, count, _ in digests)
+
+    async def _run_chunk(self, stats: DigestStats, chunk: Tuple[int, int], semaphore: asyncio.Semaphore) -> None:
+        try:
+            emails, contacts = await self.process_chunk(stats.digest_date, chunk)
+        except IntegrityError:
+            # Пакет уже обробив інший запуск (кілька процесів із планувальником)
+            logger.warning("Birthday digest chunk %s was created concurrently; skipped", chunk)
+            stats.conflicts += 1
+            return
+        finally:
+            semaphore.release()
+        stats.chunks += 1
+        stats.emails += emails
+        stats.contacts += contacts
+
+    async def run(self, digest_date: Optional[date] = None) -> DigestStats:
+        stats = DigestStats(digest_date or date.today())
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = []
+        after_user_id = 0
+        try:
+            while True:
+                # Межі наступного пакета читаються лише коли є вільний слот
+                await semaphore.acquire()
+                last_user_id = await self._next_chunk(stats.digest_date, after_user_id)
+                if last_user_id is None:
+                    semaphore.release()
+                    break
+                chunk = (after_user_id, last_user_id)
+                tasks.append(asyncio.create_task(self._run_chunk(stats, chunk, semaphore)))
+                after_user_id = last_user_id
+        finally:
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        errors = [result for result in results if isinstance(result, BaseException)]
+        stats.seconds = time.perf_counter() - started
+        self.last_run = stats
+        if errors:
+            raise errors[0]
+        logger.info("Birthday digests for %s: %s", stats.digest_date, stats.snapshot())
+        return stats
+
+
+# Щоденний запуск у процесі застосунку о hour:00 UTC. Якщо процес стартував пізніше,
+# сьогоднішній запуск виконується одразу: недороблений раніше прогін просто продовжиться.
+class BirthdayDigestScheduler:
+    def __init__(self, job: BirthdayDigestJob, hour: int = 7):
+        self.job = job
+        self.hour = hour
+        # Event прив'язується до event loop, тож живе лише один запуск run_forever
+        self._stop: Optional[asyncio.Event] = None
+
+    def next_run(self, now: datetime) -> datetime:
+        scheduled = now.replace(hour=self.hour, minute=0, second=0, microsecond=0)
+        return scheduled if scheduled > now else scheduled + timedelta(days=1)
+
+    async def run_forever(self) -> None:
+        # stop() міг бути викликаний ще до старту задачі — тоді Event уже встановлено
+        if self._stop is None:
+            self._stop = asyncio.Event()
+        stop = self._stop
+        try:
+            now = datetime.utcnow()
+            if now.hour < self.hour:
+                await self._sleep_until(stop, self.next_run(now))
+            while not stop.is_set():
+                try:
+                    await self.job.run(datetime.utcnow().date())
+                except Exception:
+                    logger.exception("Birthday digest run failed")
+                await self._sleep_until(stop, self.next_run(datetime.utcnow()))
+        finally:
+            self._stop = None
+
+    async def _sleep_until(self, stop: asyncio.Event, moment: datetime) -> None:
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=max((moment - datetime.utcnow()).total_seconds(), 0))
+        except asyncio.TimeoutError:
+            pass
+
+    def stop(self) -> None:
+        if self._stop is None:
+            self._stop = asyncio.Event()
+        self._stop.set()
+
+
+birthday_digest_job = BirthdayDigestJob(
+    days=settings.BIRTHDAY_DIGEST_DAYS,
+    chunk_size=settings.BIRTHDAY_DIGEST_CHUNK_SIZE,
+    concurrency=settings.BIRTHDAY_DIGEST_CONCURRENCY,
+)
+birthday_digest_scheduler = BirthdayDigestScheduler(birthday_digest_job, hour=settings.BIRTHDAY_DIGEST_HOUR)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Queue birthday digest emails for all verified users")
+    parser.add_argument("--date", type=date.fromisoformat, help="digest date (default: today)")
+    parser.add_argument("--days", type=int, default=settings.BIRTHDAY_DIGEST_DAYS)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    birthday_digest_job.days = args.days
+    stats = asyncio.run(birthday_digest_job.run(args.date))
+    print(f"Queued {stats.emails} digest(s) covering {stats.contacts} contact(s) in {stats.chunks} chunk(s)")
+
+
+if __name__ == "__main__":
+    main()
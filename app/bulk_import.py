@@ -0,0 +1,107 @@
+import codecs
+import csv
+import json
+from enum import Enum
+from typing import AsyncIterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.schemas import BulkImportError, BulkImportReport, ContactCreate
+
+
+class ImportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+CONTENT_TYPES = {
+    "text/csv": ImportFormat.csv,
+    "application/csv": ImportFormat.csv,
+    "application/x-ndjson": ImportFormat.ndjson,
+    "application/ndjson": ImportFormat.ndjson,
+    "application/jsonl": ImportFormat.ndjson,
+}
+
+
+def format_from_content_type(content_type: Optional[str]) -> Optional[ImportFormat]:
+    if not content_type:
+        return None
+    return CONTENT_TYPES.get(content_type.split(";", 1)[0].strip().lower())
+
+
+# Розбиває потік байтів на рядки, не тримаючи в пам'яті більше одного шматка
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+# Повертає пари (номер запису, dict | текст помилки)
+async def iter_records(chunks: AsyncIterator[bytes], fmt: ImportFormat) -> AsyncIterator[Tuple[int, object]]:
+    row = 0
+    if fmt is ImportFormat.ndjson:
+        async for line in iter_lines(chunks):
+            if not line.strip():
+                continue
+            row += 1
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield row, f"Invalid JSON: {e.msg}"
+                continue
+            yield row, record if isinstance(record, dict) else "Expected a JSON object"
+        return
+
+    header: Optional[List[str]] = None
+    pending = ""
+    async for line in iter_lines(chunks):
+        # Значення в лапках можуть містити перенесення рядка
+        pending = f"{pending}\n{line}" if pending else line
+        if pending.count('"') % 2:
+            continue
+        record, pending = pending, ""
+        if not record.strip():
+            continue
+        values = next(csv.reader([record]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row += 1
+        if len(values) != len(header):
+            yield row, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield row, {name: (value if value != "" else None) for name, value in zip(header, values)}
+    if pending:
+        yield row + 1, "Unterminated quoted field"
+
+
+class ImportReportBuilder:
+    def __init__(self, max_errors: int):
+        self.max_errors = max_errors
+        self.report = BulkImportReport()
+
+    def add_error(self, row: int, error: str) -> None:
+        self.report.failed += 1
+        if len(self.report.errors) < self.max_errors:
+            self.report.errors.append(BulkImportError(row=row, error=error))
+        else:
+            self.report.errors_truncated = True
+
+
+def validate_record(record: object) -> Tuple[Optional[ContactCreate], Optional[str]]:
+    if isinstance(record, str):
+        return None, record
+    try:
+        return ContactCreate.model_validate(record), None
+    except ValidationError as e:
+        details = "; ".join(
+            f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}" for err in e.errors()
+        )
+        return None, details
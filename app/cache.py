@@ -0,0 +1,142 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.schemas import CachedUser, normalize_email
+from settings import settings
+
+
+class CacheBackend:
+    async def get(self, key: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: dict, ttl: int) -> None:
+        raise NotImplementedError
+
+    async def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+
+# Обмежений кеш у пам'яті процесу з TTL та витісненням LRU
+class LocalTTLCache(CacheBackend):
+    def __init__(self, maxsize: int = 10000, clock=time.monotonic):
+        self.maxsize = maxsize
+        self._clock = clock
+        self._data: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= self._clock():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value: dict, ttl: int) -> None:
+        with self._lock:
+            self._data[key] = (self._clock() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    async def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Бекенд для кількох воркерів: будь-який клієнт з async get/set/delete (redis.asyncio)
+class RedisCache(CacheBackend):
+    def __init__(self, client, prefix: str = "contacts:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[dict]:
+        raw = await self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: dict, ttl: int) -> None:
+        await self.client.set(self.prefix + key, json.dumps(value), ex=ttl)
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.client.delete(*(self.prefix + key for key in keys))
+
+
+# Кеш записів користувачів за id та за email з лічильниками влучань
+class UserCache:
+    def __init__(self, backend: CacheBackend, ttl: int = 300):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _id_key(user_id: int) -> str:
+        return f"user:id:{user_id}"
+
+    @staticmethod
+    def _email_key(email: str) -> str:
+        return f"user:email:{normalize_email(email)}"
+
+    async def _get(self, key: str) -> Optional[CachedUser]:
+        value = await self.backend.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return CachedUser(**value)
+
+    async def get_by_id(self, user_id: int) -> Optional[CachedUser]:
+        return await self._get(self._id_key(user_id))
+
+    async def get_by_email(self, email: str) -> Optional[CachedUser]:
+        return await self._get(self._email_key(email))
+
+    async def set(self, user) -> CachedUser:
+        cached = CachedUser.model_validate(user)
+        value = cached.model_dump()
+        await self.backend.set(self._id_key(cached.id), value, self.ttl)
+        await self.backend.set(self._email_key(cached.email), value, self.ttl)
+        return cached
+
+    async def invalidate(self, user_id: Optional[int] = None, email: Optional[str] = None) -> None:
+        keys = []
+        if user_id is not None:
+            keys.append(self._id_key(user_id))
+            # Запис за email знаходимо через запис за id, щоб не лишити його застарілим
+            cached = await self.backend.get(self._id_key(user_id))
+            if cached is not None:
+                keys.append(self._email_key(cached["email"]))
+        if email:
+            keys.append(self._email_key(email))
+        await self.backend.delete(*keys)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+
+def build_cache_backend() -> CacheBackend:
+    if settings.USER_CACHE_BACKEND == "redis":
+        import redis.asyncio as redis
+
+        return RedisCache(redis.from_url(settings.REDIS_URL))
+    return LocalTTLCache(maxsize=settings.USER_CACHE_MAXSIZE)
+
+
+user_cache = UserCache(build_cache_backend(), ttl=settings.USER_CACHE_TTL)
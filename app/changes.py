@@ -0,0 +1,142 @@
+import argparse
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, Iterator, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.requests import Request
+
+from app import async_crud, schemas
+from app.crud import ChangeCursorExpired
+from app.db import session_scope
+from settings import settings
+
+logger = logging.getLogger("app.changes")
+
+
+# Пробудження SSE-стрімів після коміту змін. Працює в межах одного процесу:
+# стріми на інших воркерах дізнаються про зміни з опитування раз на poll_seconds.
+class ChangeNotifier:
+    def __init__(self):
+        self._waiters: Dict[int, Set[asyncio.Event]] = defaultdict(set)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _wake(self, user_id: int) -> None:
+        for waiter in self._waiters.get(user_id, ()):
+            waiter.set()
+
+    # Може викликатися з threadpool (синхронний режим БД)
+    def notify(self, user_id: int) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._wake, user_id)
+
+    @contextmanager
+    def subscribe(self, user_id: int) -> Iterator[asyncio.Event]:
+        self._loop = asyncio.get_running_loop()
+        waiter = asyncio.Event()
+        self._waiters[user_id].add(waiter)
+        try:
+            yield waiter
+        finally:
+            self._waiters[user_id].discard(waiter)
+            if not self._waiters[user_id]:
+                del self._waiters[user_id]
+
+
+change_notifier = ChangeNotifier()
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_committed_changes(session: Session) -> None:
+    for user_id in session.info.pop("changed_users", ()):
+        change_notifier.notify(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_changes(session: Session) -> None:
+    session.info.pop("changed_users", None)
+
+
+def sse_event(name: str, data: str, event_id: Optional[int] = None) -> bytes:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {name}\ndata: {data}\n\n".encode("utf-8")
+
+
+async def _read_page(user_id: int, since: Optional[int], limit: int):
+    async with session_scope() as db:
+        changes, next_since, has_more = await async_crud.get_contact_changes(db, user_id, since, limit)
+        # Серіалізуємо, поки сесія відкрита
+        page = schemas.ContactChangesPage(changes=changes, next_since=next_since, has_more=has_more)
+        return page, page.model_dump_json()
+
+
+# SSE-стрім змін: кожна непорожня сторінка — подія "changes" з id = next_since,
+# тож після перепідключення браузер сам надсилає Last-Event-ID.
+# Якщо курсор застарів (журнал стиснуто), надсилається "reset" і стрім
+# продовжує з поточного seq — клієнт має перечитати список повністю.
+async def stream_changes(
+    request: Request, user_id: int, since: Optional[int], poll_seconds: float, limit: int
+) -> AsyncIterator[bytes]:
+    if since is None:
+        page, _ = await _read_page(user_id, None, limit)
+        since = page.next_since
+        yield sse_event("ready", page.model_dump_json(include={"next_since"}), since)
+    with change_notifier.subscribe(user_id) as changed:
+        while not await request.is_disconnected():
+            # Скидається до читання, тож коміт під час читання не загубиться
+            changed.clear()
+            try:
+                page, data = await _read_page(user_id, since, limit)
+            except ChangeCursorExpired as e:
+                current, _ = await _read_page(user_id, None, limit)
+                since = current.next_since
+                yield sse_event("reset", json.dumps({"detail": str(e), "next_since": since}), since)
+                continue
+            if page.changes:
+                since = page.next_since
+                yield sse_event("changes", data, since)
+                if page.has_more:
+                    continue
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=poll_seconds)
+            except asyncio.TimeoutError:
+                # Коментар тримає з'єднання живим крізь проксі
+                yield b": keepalive\n\n"
+
+
+async def compact(retention_days: int) -> int:
+    async with session_scope() as db:
+        return await async_crud.compact_contact_changes(db, datetime.utcnow() - timedelta(days=retention_days))
+
+
+# Періодичне стиснення журналу у процесі застосунку
+async def compact_forever(interval: float, retention_days: int) -> None:
+    while True:
+        try:
+            deleted = await compact(retention_days)
+            if deleted:
+                logger.info("Compacted %s contact change(s)", deleted)
+        except Exception:
+            logger.exception("Contact change compaction failed")
+        await asyncio.sleep(interval)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compact the contact change log")
+    parser.add_argument("--retention-days", type=int, default=settings.CONTACT_CHANGES_RETENTION_DAYS)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    deleted = asyncio.run(compact(args.retention_days))
+    print(f"Deleted {deleted} change(s) older than {args.retention_days} day(s)")
+
+
+if __name__ == "__main__":
+    main()
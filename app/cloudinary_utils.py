@@ -1,21 +1,50 @@
+import io
+import logging
+from typing import Optional
+
 import cloudinary
-import cloudinary.uploader
 import cloudinary.api
+import cloudinary.uploader
+from cloudinary.exceptions import NotFound
+
+from app.storage import AvatarStorage
 from settings import settings
 
-cloudinary.config(
-    cloud_name=settings.CLOUDINARY_CLOUD_NAME,
-    api_key=settings.CLOUDINARY_API_KEY,
-    api_secret=settings.CLOUDINARY_API_SECRET,
-    secure=True
-)
+logger = logging.getLogger(__name__)
+
+class CloudinaryStorage(AvatarStorage):
+    def __init__(self, folder: str):
+        self.folder = folder
+        # Конфігурація застосовується, лише коли сховище справді потрібне
+        cloudinary.config(
+            cloud_name=settings.CLOUDINARY_CLOUD_NAME,
+            api_key=settings.CLOUDINARY_API_KEY,
+            api_secret=settings.CLOUDINARY_API_SECRET,
+            secure=True
+        )
+
+    def _public_id(self, key: str) -> str:
+        # Розширення задає формат, а не public_id
+        return f"{self.folder}/{key.rsplit('.', 1)[0]}"
+
+    # Перевірка через Admin API знаходить файл, завантажений іншим воркером, і
+    # заощаджує повторне завантаження. Admin API має жорсткий ліміт запитів, тож
+    # будь-яка помилка — просто промах: upload з overwrite=False все одно не дублює файл
+    def find(self, key: str) -> Optional[str]:
+        try:
+            return cloudinary.api.resource(self._public_id(key)).get("secure_url")
+        except NotFound:
+            return None
+        except Exception as e:
+            logger.warning("Cloudinary lookup for %s failed, uploading instead: %s", key, e)
+            return None
 
-def upload_avatar(file, public_id):
-    response = cloudinary.uploader.upload(
-        file.file,
-        folder="avatars/",
-        public_id=public_id,
-        overwrite=True,
-        resource_type="image"
-    )
-    return response.get("secure_url")
\ No newline at end of file
+    def save(self, key: str, data: bytes, content_type: str) -> str:
+        response = cloudinary.uploader.upload(
+            io.BytesIO(data),
+            public_id=self._public_id(key),
+            # Ключ — хеш вмісту, тож той самий public_id завжди означає той самий файл
+            overwrite=False,
+            resource_type="image"
+        )
+        return response.get("secure_url")
@@ -1,104 +1,556 @@
+from sqlalchemy import case, delete, exists, func, insert, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from app.models import Contact, User
-from app.schemas import ContactCreate, ContactUpdate, UserCreate
-from typing import List, Optional
-from datetime import date, timedelta
-from bcrypt import hashpw, gensalt
+from app.models import BirthdayDigest, Contact, ContactChange, EmailOutbox, User, birthday_ordinal
+from app.pagination import SORT_COLUMNS, ContactSort, sort_value
+from app.search import SearchMode, get_search_backend
+from app.serialization import CONTACT_COLUMNS
+from app.schemas import ChangeOp, ContactCreate, ContactFilter, ContactUpdate, UserCreate, normalize_email
+from typing import Any, List, Optional, Sequence, Tuple
+from datetime import date, datetime, timedelta
+
+# INSERT ... ON CONFLICT DO NOTHING підтримують Postgres і SQLite
+DIALECT_INSERTS = {
+    "postgresql": pg_insert,
+    "sqlite": sqlite_insert,
+}
 
 
 # Отримати користувача за email
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
-    return db.query(User).filter(User.email == email).first()
+    return db.query(User).filter(User.email == normalize_email(email)).first()
+
+
+# Сутності для запитів списків: ORM-об'єкти або лише кортежі колонок
+# для швидкої серіалізації (app.serialization)
+def contact_entities(as_rows: bool) -> tuple:
+    return CONTACT_COLUMNS if as_rows else (Contact,)
 
 
 # Створити нового користувача
-def create_user(db: Session, user: UserCreate) -> User:
-    hashed_password = hashpw(user.password.encode("utf-8"), gensalt()).decode("utf-8")
+def create_user(
+    db: Session,
+    user: UserCreate,
+    hashed_password: str,
+    outbox: Sequence[EmailOutbox] = (),
+) -> User:
     db_user = User(email=user.email, hashed_password=hashed_password)
     db.add(db_user)
+    # Листи з outbox зберігаються в тій самій транзакції, що й користувач
+    db.add_all(outbox)
     db.commit()
     db.refresh(db_user)
     return db_user
 
 
+# Отримати користувача за ID
+def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
+    return db.get(User, user_id)
+
+
+# Позначити email користувача як підтверджений
+def verify_user(db: Session, user_id: int) -> Optional[User]:
+    stmt = (
+        update(User)
+        .where(User.id == user_id)
+        .values(is_verified=True)
+        .returning(User)
+        .execution_options(synchronize_session=False)
+    )
+    db_user = db.execute(stmt).scalar_one_or_none()
+    db.commit()
+    return db_user
+
+
+# Оновити аватар користувача
+def update_avatar(db: Session, user_id: int, avatar_url: str) -> Optional[User]:
+    stmt = (
+        update(User)
+        .where(User.id == user_id)
+        .values(avatar_url=avatar_url)
+        .returning(User)
+        .execution_options(synchronize_session=False)
+    )
+    db_user = db.execute(stmt).scalar_one_or_none()
+    db.commit()
+    return db_user
+
+
+# Записати зміни в журнал у поточній транзакції. UPDATE лічильника в users
+# блокує рядок користувача, тож паралельні записи одного користувача
+# отримують номери і комітяться по черзі.
+def record_contact_changes(db: Session, user_id: int, op: ChangeOp, contact_ids: Sequence[int]) -> None:
+    if not contact_ids:
+        return
+    # Зміни одного запиту нумеруються в порядку id
+    contact_ids = sorted(contact_ids)
+    last_seq = db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(change_seq=User.change_seq + len(contact_ids))
+        .returning(User.change_seq)
+        .execution_options(synchronize_session=False)
+    ).scalar_one()
+    first_seq = last_seq - len(contact_ids) + 1
+    db.execute(insert(ContactChange), [
+        {"user_id": user_id, "seq": first_seq + i, "contact_id": contact_id, "op": op.value}
+        for i, contact_id in enumerate(contact_ids)
+    ])
+    # Після коміту app.changes будить SSE-стріми цього користувача
+    db.info.setdefault("changed_users", set()).add(user_id)
+
+
 # Створити новий контакт, прив'язаний до користувача
-def create_contact(db: Session, contact: ContactCreate, user_email: str) -> Contact:
-    user = get_user_by_email(db, user_email)
-    if not user:
-        raise ValueError("User not found")
-    db_contact = Contact(**contact.model_dump(), user_id=user.id)
+def create_contact(db: Session, contact: ContactCreate, user_id: int) -> Contact:
+    db_contact = Contact(**contact.model_dump(), user_id=user_id)
     db.add(db_contact)
+    db.flush()
+    record_contact_changes(db, user_id, ChangeOp.insert, [db_contact.id])
     db.commit()
     db.refresh(db_contact)
     return db_contact
 
 
+# Вставити пакет контактів одним багаторядковим INSERT.
+# Дублікати email (в пакеті або в БД) пропускаються і повертаються як помилки рядків.
+def bulk_create_contacts(db: Session, user_id: int, rows: List[Tuple[int, ContactCreate]]) -> List[Tuple[int, str]]:
+    errors: List[Tuple[int, str]] = []
+    now = datetime.utcnow()
+    values_by_email = {}
+    rows_by_email = {}
+    for row, contact in rows:
+        data = contact.model_dump()
+        if data["email"] in values_by_email:
+            errors.append((row, "Duplicate email in upload"))
+            continue
+        data["user_id"] = user_id
+        data["birthday_ordinal"] = birthday_ordinal(data["birthday"])
+        data["updated_at"] = now
+        values_by_email[data["email"]] = data
+        rows_by_email[data["email"]] = row
+    if not values_by_email:
+        return errors
+
+    dialect = db.get_bind().dialect.name
+    if dialect in DIALECT_INSERTS:
+        stmt = (
+            DIALECT_INSERTS[dialect](Contact)
+            .values(list(values_by_email.values()))
+            .on_conflict_do_nothing(index_elements=[Contact.user_id, Contact.email])
+            .returning(Contact.id, Contact.email)
+        )
+        inserted = {email: contact_id for contact_id, email in db.execute(stmt)}
+    else:
+        inserted = {}
+        for email, data in values_by_email.items():
+            try:
+                with db.begin_nested():
+                    inserted[email] = db.execute(insert(Contact).values(data)).inserted_primary_key[0]
+            except IntegrityError:
+                pass
+    record_contact_changes(db, user_id, ChangeOp.insert, list(inserted.values()))
+    db.commit()
+
+    errors.extend(
+        (row, "Contact with this email already exists")
+        for email, row in rows_by_email.items()
+        if email not in inserted
+    )
+    return errors
+
+
 # Отримати всі контакти для користувача
-def get_contacts(db: Session, user_email: str, skip: int = 0, limit: int = 10) -> List[Contact]:
-    user = get_user_by_email(db, user_email)
-    if not user:
-        return []
-    return db.query(Contact).filter(Contact.user_id == user.id).offset(skip).limit(limit).all()
+def get_contacts(db: Session, user_id: int, skip: int = 0, limit: int = 10, as_rows: bool = False) -> List[Contact]:
+    return db.query(*contact_entities(as_rows)).filter(Contact.user_id == user_id).offset(skip).limit(limit).all()
+
+
+# Версія списку контактів користувача — лічильник журналу змін users.change_seq.
+# Кожен запис контактів збільшує його в тій самій транзакції, тож версія змінюється
+# при будь-якій зміні, навіть якщо max(updated_at) і кількість лишаються ті самі.
+def get_contacts_version(db: Session, user_id: int) -> int:
+    return db.execute(select(User.change_seq).where(User.id == user_id)).scalar_one_or_none() or 0
+
+
+# Keyset-пагінація: сторінка після пари (значення сортування, id) без OFFSET
+def get_contacts_page(
+    db: Session,
+    user_id: int,
+    sort: ContactSort = ContactSort.id,
+    after: Optional[Tuple[Any, int]] = None,
+    limit: int = 10,
+    as_rows: bool = False,
+) -> Tuple[List[Contact], Optional[Tuple[Any, int]]]:
+    column = SORT_COLUMNS[sort]
+    query = db.query(*contact_entities(as_rows)).filter(Contact.user_id == user_id)
+    if after is not None:
+        value, last_id = after
+        if sort is ContactSort.id:
+            query = query.filter(Contact.id > last_id)
+        else:
+            query = query.filter(tuple_(column, Contact.id) > tuple_(value, last_id))
+    order_by = (Contact.id,) if sort is ContactSort.id else (column, Contact.id)
+    # Беремо на один рядок більше, щоб знати, чи є наступна сторінка
+    rows = query.order_by(*order_by).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, (sort_value(last, sort), last.id)
 
 
 # Отримати контакт за ID (перевірка належності користувачу)
-def get_contact_by_id(db: Session, contact_id: int, user_email: str) -> Optional[Contact]:
-    user = get_user_by_email(db, user_email)
-    if not user:
-        return None
-    return db.query(Contact).filter(Contact.id == contact_id, Contact.user_id == user.id).first()
+def get_contact_by_id(db: Session, contact_id: int, user_id: int) -> Optional[Contact]:
+    return db.query(Contact).filter(Contact.id == contact_id, Contact.user_id == user_id).first()
 
 
-# Оновити контакт
-def update_contact(db: Session, contact_id: int, contact: ContactUpdate, user_email: str) -> Optional[Contact]:
-    user = get_user_by_email(db, user_email)
-    if not user:
-        return None
-    db_contact = db.query(Contact).filter(Contact.id == contact_id, Contact.user_id == user.id).first()
-    if not db_contact:
-        return None
-    for key, value in contact.model_dump(exclude_unset=True).items():
-        setattr(db_contact, key, value)
+# Оновити контакт одним UPDATE ... RETURNING
+def update_contact(db: Session, contact_id: int, contact: ContactUpdate, user_id: int) -> Optional[Contact]:
+    values = contact.model_dump(exclude_unset=True)
+    if not values:
+        return get_contact_by_id(db, contact_id, user_id)
+    if values.get("birthday") is not None:
+        values["birthday_ordinal"] = birthday_ordinal(values["birthday"])
+    stmt = (
+        update(Contact)
+        .where(Contact.id == contact_id, Contact.user_id == user_id)
+        .values(**values)
+        .returning(Contact)
+        # populate_existing: об'єкт, уже завантажений у сесію, отримує нові значення
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    db_contact = db.execute(stmt).scalar_one_or_none()
+    if db_contact is not None:
+        record_contact_changes(db, user_id, ChangeOp.update, [db_contact.id])
     db.commit()
-    db.refresh(db_contact)
     return db_contact
 
 
-# Видалити контакт
-def delete_contact(db: Session, contact_id: int, user_email: str) -> bool:
-    user = get_user_by_email(db, user_email)
-    if not user:
-        return False
-    db_contact = db.query(Contact).filter(Contact.id == contact_id, Contact.user_id == user.id).first()
-    if not db_contact:
-        return False
-    db.delete(db_contact)
+# Видалити контакт одним DELETE ... RETURNING
+def delete_contact(db: Session, contact_id: int, user_id: int) -> bool:
+    stmt = (
+        delete(Contact)
+        .where(Contact.id == contact_id, Contact.user_id == user_id)
+        .returning(Contact.id)
+        .execution_options(synchronize_session=False)
+    )
+    deleted_id = db.execute(stmt).scalar_one_or_none()
+    if deleted_id is not None:
+        record_contact_changes(db, user_id, ChangeOp.delete, [deleted_id])
     db.commit()
-    return True
-
-
-# Пошук контактів користувача
-def search_contacts(db: Session, query: str, user_email: str) -> List[Contact]:
-    user = get_user_by_email(db, user_email)
-    if not user:
-        return []
-    return db.query(Contact).filter(
-        Contact.user_id == user.id,
-        (Contact.first_name.ilike(f"%{query}%")) |
-        (Contact.last_name.ilike(f"%{query}%")) |
-        (Contact.email.ilike(f"%{query}%"))
+    return deleted_id is not None
+
+
+# Порушення унікальності (user_id, email): Postgres називає індекс у повідомленні,
+# SQLite — лише колонки. Інші IntegrityError не є конфліктом email
+def is_duplicate_contact_email(error: IntegrityError) -> bool:
+    message = str(error.orig)
+    return "uq_contacts_user_id_email" in message or "contacts.user_id, contacts.email" in message
+
+
+class BatchTooLarge(Exception):
+    pass
+
+
+# Id контактів користувача для пакетної операції: явний список або фільтр пошуку.
+# Фільтр, що зачіпає більше max_size рядків, відхиляється до будь-яких змін.
+def _batch_ids(
+    db: Session,
+    user_id: int,
+    ids: Optional[List[int]],
+    filter: Optional[ContactFilter],
+    max_size: int,
+) -> List[int]:
+    if ids is not None:
+        if len(ids) > max_size:
+            raise BatchTooLarge(f"At most {max_size} ids per batch")
+        return list(dict.fromkeys(ids))
+    backend = get_search_backend(db.get_bind().dialect.name)
+    matched = (
+        db.query(Contact.id)
+        .filter(Contact.user_id == user_id, backend.condition(filter.query, filter.mode))
+        .order_by(Contact.id)
+        .limit(max_size + 1)
+        .all()
+    )
+    if len(matched) > max_size:
+        raise BatchTooLarge(f"Filter matches more than {max_size} contacts, narrow it down")
+    return [row.id for row in matched]
+
+
+# Пакетне оновлення одним UPDATE ... RETURNING в одній транзакції
+def batch_update_contacts(
+    db: Session,
+    user_id: int,
+    changes: ContactUpdate,
+    ids: Optional[List[int]] = None,
+    filter: Optional[ContactFilter] = None,
+    max_size: int = 1000,
+) -> List[int]:
+    values = changes.model_dump(exclude_unset=True)
+    if values.get("birthday") is not None:
+        values["birthday_ordinal"] = birthday_ordinal(values["birthday"])
+    try:
+        target_ids = _batch_ids(db, user_id, ids, filter, max_size)
+        if not target_ids or not values:
+            db.rollback()
+            return []
+        stmt = (
+            update(Contact)
+            .where(Contact.user_id == user_id, Contact.id.in_(target_ids))
+            .values(**values)
+            .returning(Contact.id)
+            .execution_options(synchronize_session=False)
+        )
+        updated = sorted(db.execute(stmt).scalars())
+        record_contact_changes(db, user_id, ChangeOp.update, updated)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return updated
+
+
+# Пакетне видалення одним DELETE ... RETURNING в одній транзакції
+def batch_delete_contacts(
+    db: Session,
+    user_id: int,
+    ids: Optional[List[int]] = None,
+    filter: Optional[ContactFilter] = None,
+    max_size: int = 1000,
+) -> List[int]:
+    try:
+        target_ids = _batch_ids(db, user_id, ids, filter, max_size)
+        if not target_ids:
+            db.rollback()
+            return []
+        stmt = (
+            delete(Contact)
+            .where(Contact.user_id == user_id, Contact.id.in_(target_ids))
+            .returning(Contact.id)
+            .execution_options(synchronize_session=False)
+        )
+        deleted = sorted(db.execute(stmt).scalars())
+        record_contact_changes(db, user_id, ChangeOp.delete, deleted)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return deleted
+
+
+# Пошук контактів користувача через індексований бекенд поточної СУБД
+def search_contacts(
+    db: Session,
+    query: str,
+    user_id: int,
+    mode: SearchMode = SearchMode.substring,
+    limit: int = 50,
+    as_rows: bool = False,
+) -> List[Contact]:
+    backend = get_search_backend(db.get_bind().dialect.name)
+    return backend.search(db, user_id, query, mode, limit, contact_entities(as_rows))
+
+
+# Діапазон birthday_ordinal для вікна [today, today + days]; None — увесь рік.
+# Якщо start > end, вікно переходить через кінець року.
+def birthday_window(today: date, days: int) -> Optional[Tuple[int, int]]:
+    if days >= 365:
+        return None
+    return birthday_ordinal(today), birthday_ordinal(today + timedelta(days=days))
+
+
+# Отримати дні народження на найближчі days днів для користувача (місяць і день, без року)
+def get_upcoming_birthdays(db: Session, user_id: int, days: int = 7, as_rows: bool = False) -> List[Contact]:
+    query = db.query(*contact_entities(as_rows)).filter(Contact.user_id == user_id).order_by(Contact.birthday_ordinal, Contact.id)
+    window = birthday_window(date.today(), days)
+    if window is None:
+        return query.all()
+
+    start, end = window
+    if start <= end:
+        return query.filter(Contact.birthday_ordinal.between(start, end)).all()
+
+    # Вікно переходить через кінець року: два діапазони по індексу (user_id, birthday_ordinal)
+    return (
+        query.filter(Contact.birthday_ordinal >= start).all()
+        + query.filter(Contact.birthday_ordinal <= end).all()
+    )
+
+
+class ChangeCursorExpired(Exception):
+    pass
+
+
+# Зміни користувача після since, не більше limit записів журналу.
+# Кілька змін одного контакту на сторінці згортаються в останню, а контакт
+# повертається в поточному стані. Якщо частину журналу після since уже стиснуто
+# (або since з майбутнього), клієнт має перечитати список повністю.
+def get_contact_changes(
+    db: Session, user_id: int, since: Optional[int], limit: int = 500
+) -> Tuple[List[dict], int, bool]:
+    current = db.execute(select(User.change_seq).where(User.id == user_id)).scalar_one()
+    if since is None:
+        return [], current, False
+    if since > current:
+        raise ChangeCursorExpired(f"Cursor {since} is ahead of the change log ({current})")
+    if since == current:
+        return [], current, False
+
+    oldest = db.execute(select(func.min(ContactChange.seq)).where(ContactChange.user_id == user_id)).scalar()
+    if oldest is None or oldest > since + 1:
+        raise ChangeCursorExpired(f"Changes after {since} were compacted, reload the contact list")
+
+    entries = db.execute(
+        select(ContactChange.seq, ContactChange.op, ContactChange.contact_id)
+        .where(ContactChange.user_id == user_id, ContactChange.seq > since)
+        .order_by(ContactChange.seq)
+        .limit(limit + 1)
+    ).all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    latest = {contact_id: (seq, op) for seq, op, contact_id in entries}
+    alive = {
+        contact.id: contact
+        for contact in db.query(Contact).filter(
+            Contact.user_id == user_id, Contact.id.in_([cid for cid, (_, op) in latest.items() if op != "delete"])
+        )
+    }
+    changes = []
+    for contact_id, (seq, op) in sorted(latest.items(), key=lambda item: item[1][0]):
+        contact = alive.get(contact_id)
+        # Контакт видалено пізніше, ніж ця сторінка: клієнту достатньо видалення
+        changes.append({
+            "seq": seq,
+            "op": op if contact is not None or op == "delete" else ChangeOp.delete.value,
+            "contact_id": contact_id,
+            "contact": contact,
+        })
+    return changes, entries[-1].seq, has_more
+
+
+# Стиснення журналу: для кожного користувача видаляється весь префікс до
+# найбільшого seq, старшого за before, тож у журналі не лишається дірок
+def compact_contact_changes(db: Session, before: datetime, batch_users: int = 500) -> int:
+    horizons = db.execute(
+        select(ContactChange.user_id, func.max(ContactChange.seq))
+        .where(ContactChange.created_at < before)
+        .group_by(ContactChange.user_id)
     ).all()
+    deleted = 0
+    for start in range(0, len(horizons), batch_users):
+        for user_id, seq in horizons[start:start + batch_users]:
+            deleted += db.execute(
+                delete(ContactChange).where(ContactChange.user_id == user_id, ContactChange.seq <= seq)
+            ).rowcount
+        db.commit()
+    return deleted
+
+
+def _digest_pending(digest_date: date):
+    return ~exists().where(BirthdayDigest.user_id == User.id, BirthdayDigest.digest_date == digest_date)
+
+
+# Межа наступного пакета дайджестів: найбільший id серед size підтверджених
+# користувачів після after_user_id, яким дайджест на цю дату ще не створено
+def next_digest_chunk(db: Session, digest_date: date, after_user_id: int, size: int) -> Optional[int]:
+    ids = (
+        select(User.id)
+        .where(User.is_verified.is_(True), User.id > after_user_id, _digest_pending(digest_date))
+        .order_by(User.id)
+        .limit(size)
+        .subquery()
+    )
+    return db.execute(select(func.max(ids.c.id))).scalar()
+
+
+# Один запит на весь пакет користувачів: контакти з днем народження у вікні,
+# впорядковані за користувачем
+def get_birthday_digest_rows(
+    db: Session, digest_date: date, days: int, after_user_id: int, last_user_id: int
+) -> List[Tuple[Any, ...]]:
+    query = (
+        select(User.id, User.email, Contact.first_name, Contact.last_name, Contact.birthday, Contact.birthday_ordinal)
+        .join(Contact, Contact.user_id == User.id)
+        .where(
+            User.is_verified.is_(True),
+            User.id > after_user_id,
+            User.id <= last_user_id,
+            _digest_pending(digest_date),
+        )
+    )
+    window = birthday_window(digest_date, days)
+    if window is None:
+        return db.execute(query.order_by(User.id, Contact.birthday_ordinal, Contact.id)).all()
+
+    start, end = window
+    if start <= end:
+        query = query.where(Contact.birthday_ordinal.between(start, end))
+    else:
+        query = query.where(or_(Contact.birthday_ordinal >= start, Contact.birthday_ordinal <= end))
+    # Спершу дні народження до кінця року, потім — з початку наступного
+    next_year = case((Contact.birthday_ordinal < start, 1), else_=0)
+    return db.execute(query.order_by(User.id, next_year, Contact.birthday_ordinal, Contact.id)).all()
+
+
+# Листи і записи журналу пакета комітяться разом: або пакет оброблено повністю, або ні.
+# IntegrityError означає, що паралельний запуск уже створив дайджест комусь із пакета.
+def save_birthday_digests(
+    db: Session, digest_date: date, digests: Sequence[Tuple[int, int, EmailOutbox]]
+) -> None:
+    try:
+        for user_id, contacts, message in digests:
+            db.add(BirthdayDigest(user_id=user_id, digest_date=digest_date, contacts=contacts))
+            db.add(message)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise
+
+
+# Забрати пакет листів з outbox для відправки.
+# Рядок "орендується" на lease_seconds: якщо воркер впаде, лист повернеться в чергу.
+def claim_outbox_batch(db: Session, batch_size: int, lease_seconds: int) -> List[EmailOutbox]:
+    now = datetime.utcnow()
+    messages = (
+        db.query(EmailOutbox)
+        .filter(EmailOutbox.status.in_(("pending", "sending")), EmailOutbox.next_attempt_at <= now)
+        .order_by(EmailOutbox.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    for message in messages:
+        message.status = "sending"
+        message.attempts += 1
+        message.next_attempt_at = now + timedelta(seconds=lease_seconds)
+    db.commit()
+    return messages
+
+
+def mark_outbox_sent(db: Session, message_ids: List[int]) -> None:
+    if not message_ids:
+        return
+    db.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.id.in_(message_ids))
+        .values(status="sent", sent_at=datetime.utcnow(), last_error=None)
+    )
+    db.commit()
+
+
+# Невдала спроба: або повтор після next_attempt_at, або dead-letter (next_attempt_at=None)
+def mark_outbox_failed(db: Session, message_id: int, error: str, next_attempt_at: Optional[datetime]) -> None:
+    values = {"last_error": error[:2000]}
+    if next_attempt_at is None:
+        values["status"] = "dead"
+    else:
+        values.update(status="pending", next_attempt_at=next_attempt_at)
+    db.execute(update(EmailOutbox).where(EmailOutbox.id == message_id).values(**values))
+    db.commit()
 
 
-# Отримати дні народження на найближчий тиждень для користувача
-def get_upcoming_birthdays(db: Session, user_email: str) -> List[Contact]:
-    user = get_user_by_email(db, user_email)
-    if not user:
-        return []
-    today = date.today()
-    next_week = today + timedelta(days=7)
-    return db.query(Contact).filter(
-        Contact.user_id == user.id,
-        Contact.birthday >= today,
-        Contact.birthday <= next_week
-    ).all()
\ No newline at end of file
+def count_outbox(db: Session) -> dict:
+    rows = db.query(EmailOutbox.status, func.count(EmailOutbox.id)).group_by(EmailOutbox.status).all()
+    return {status: count for status, count in rows}
@@ -0,0 +1,125 @@
+import threading
+import time
+import uuid
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+from settings import settings
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.waits = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def incr(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def observe_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "waits": self.waits,
+                "wait_seconds_avg": self.wait_seconds_total / self.waits if self.waits else 0.0,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+
+
+# Пули, що заміряють час очікування вільного з'єднання. Очікуванням вважається
+# лише checkout, коли вільних з'єднань немає і overflow вичерпано, тобто запит
+# справді блокується; звичайний checkout і відкриття нового з'єднання не рахуються.
+class _TimedPoolMixin:
+    stats: PoolStats = None
+
+    def _must_wait(self) -> bool:
+        return self.checkedin() == 0 and -1 < self._max_overflow <= self._overflow
+
+    def _do_get(self):
+        if self.stats is None or not self._must_wait():
+            return super()._do_get()
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.stats.observe_wait(time.perf_counter() - started)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    if url.startswith("sqlite"):
+        return {} if is_async else {"connect_args": {"check_same_thread": False}}
+
+    if settings.DB_PGBOUNCER:
+        # PgBouncer у transaction-режимі: пулом керує він, prepared statements вимкнено
+        options = {"poolclass": NullPool}
+        if is_async:
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+            }
+        return options
+
+    return {
+        "poolclass": TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def instrument_pool(engine) -> PoolStats:
+    stats = PoolStats()
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if isinstance(sync_engine.pool, _TimedPoolMixin):
+        sync_engine.pool.stats = stats
+
+    event.listen(sync_engine, "connect", lambda *args: stats.incr("connects"))
+    event.listen(sync_engine, "checkout", lambda *args: stats.incr("checkouts"))
+    event.listen(sync_engine, "checkin", lambda *args: stats.incr("checkins"))
+    event.listen(sync_engine, "invalidate", lambda *args: stats.incr("invalidations"))
+    return stats
+
+
+def pool_status(engine, stats: PoolStats) -> dict:
+    pool = getattr(engine, "sync_engine", engine).pool
+    status = {"pool_class": type(pool).__name__, **stats.snapshot()}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+        })
+    return status
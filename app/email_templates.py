@@ -0,0 +1,95 @@
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template, meta, select_autoescape
+from markupsafe import escape
+
+from settings import settings
+
+TEMPLATE_FOLDER = Path(__file__).parent / "templates"
+
+
+# Шаблон, розбитий на статичні частини і місця підстановки змінних.
+# Статичні частини рендеряться один раз, на кожного отримувача лише склеюються рядки.
+class CompiledTemplate:
+    def __init__(self, template: Template, fields: List[str], autoescape: bool):
+        self.template = template
+        self.fields = fields
+        self.autoescape = autoescape
+        self.static: Optional[List[str]] = None
+        self.slots: List[str] = []
+        if fields:
+            self._split()
+
+    def _split(self) -> None:
+        rendered = self.template.render({name: f"\x00{name}\x00" for name in self.fields})
+        pattern = re.compile("\x00(" + "|".join(re.escape(name) for name in self.fields) + ")\x00")
+        pieces = pattern.split(rendered)
+        self.static, self.slots = pieces[0::2], pieces[1::2]
+        # Змінні у фільтрах чи умовах так не підставиш: перевіряємо на пробних
+        # значеннях і, якщо результат відрізняється, рендеримо через Jinja як звичайно
+        probe = {name: f"<{name}>&\"'" for name in self.fields}
+        if self._substitute(probe) != self.template.render(probe):
+            self.static, self.slots = None, []
+
+    @property
+    def precompiled(self) -> bool:
+        return self.static is not None or not self.fields
+
+    def _substitute(self, values: Mapping[str, object]) -> str:
+        parts = [self.static[0]]
+        for name, tail in zip(self.slots, self.static[1:]):
+            value = values.get(name)
+            # Невизначена змінна в Jinja рендериться як порожній рядок
+            value = "" if value is None else value
+            parts.append(str(escape(value)) if self.autoescape else str(value))
+            parts.append(tail)
+        return "".join(parts)
+
+    def render(self, values: Mapping[str, object]) -> str:
+        if self.static is None:
+            return self.template.render(values)
+        return self._substitute(values)
+
+
+class EmailTemplates:
+    def __init__(self, folder: Path, cache_dir: Optional[str] = None):
+        self.env = Environment(
+            loader=FileSystemLoader(folder),
+            autoescape=select_autoescape(["html"]),
+            # Скомпільований байткод зберігається на диску і переживає рестарт процесу
+            bytecode_cache=FileSystemBytecodeCache(cache_dir),
+            auto_reload=False,
+        )
+        self._compiled: Dict[str, CompiledTemplate] = {}
+        self._lock = threading.Lock()
+
+    def compile(self, name: str) -> CompiledTemplate:
+        compiled = self._compiled.get(name)
+        if compiled is None:
+            with self._lock:
+                compiled = self._compiled.get(name)
+                if compiled is None:
+                    source, _, _ = self.env.loader.get_source(self.env, name)
+                    fields = sorted(meta.find_undeclared_variables(self.env.parse(source)))
+                    autoescape = self.env.autoescape(name) if callable(self.env.autoescape) else self.env.autoescape
+                    compiled = CompiledTemplate(self.env.get_template(name), fields, autoescape)
+                    self._compiled[name] = compiled
+        return compiled
+
+    # Компіляція всіх шаблонів під час старту застосунку
+    def warm(self) -> None:
+        for name in self.env.list_templates():
+            self.compile(name)
+
+    def render(self, name: str, **values) -> str:
+        return self.compile(name).render(values)
+
+    def render_batch(self, name: str, rows: Iterable[Mapping[str, object]]) -> List[str]:
+        compiled = self.compile(name)
+        return [compiled.render(values) for values in rows]
+
+
+email_templates = EmailTemplates(TEMPLATE_FOLDER, cache_dir=settings.EMAIL_TEMPLATE_CACHE_DIR)
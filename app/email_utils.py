@@ -1,38 +1,52 @@
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
-from fastapi_mail.errors import ConnectionErrors
+from datetime import date
+from typing import Iterable, List, Sequence, Tuple
+
 from pydantic import EmailStr
-from pathlib import Path
 
+from app.email_templates import email_templates
+from app.models import EmailOutbox
 from app.utils import create_email_token
-from settings import settings
 
-# Конфігурація SMTP
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.MAIL_USERNAME,
-    MAIL_PASSWORD=settings.MAIL_PASSWORD,
-    MAIL_FROM=settings.MAIL_FROM,
-    MAIL_PORT=settings.MAIL_PORT,
-    MAIL_SERVER=settings.MAIL_SERVER,
-    MAIL_FROM_NAME=settings.MAIL_FROM_NAME,
-    MAIL_STARTTLS=settings.MAIL_STARTTLS,
-    MAIL_SSL_TLS=settings.MAIL_SSL_TLS,
-    USE_CREDENTIALS=settings.USE_CREDENTIALS,
-    VALIDATE_CERTS=settings.VALIDATE_CERTS,
-    TEMPLATE_FOLDER=Path(__file__).parent / "templates"
-)
+VERIFICATION_SUBJECT = "Confirm Your Email"
+VERIFICATION_TEMPLATE = "verify_email.html"
+BIRTHDAY_DIGEST_SUBJECT = "Upcoming birthdays"
+BIRTHDAY_DIGEST_TEMPLATE = "birthday_digest.html"
+
+# Лист підтвердження не надсилається одразу: він потрапляє в outbox,
+# звідки його відправляє воркер app.outbox
+def build_verification_email(email: EmailStr) -> EmailOutbox:
+    # Створення токену для підтвердження email
+    token = create_email_token({"sub": email})
+    html_body = email_templates.render(VERIFICATION_TEMPLATE, token=token)
+    return EmailOutbox(recipient=email, subject=VERIFICATION_SUBJECT, html_body=html_body)
 
-async def send_verification_email(email: EmailStr):
-    try:
-        # Створення токену для підтвердження email
-        token = create_email_token({"sub": email})
-        message = MessageSchema(
-            subject="Confirm Your Email",
-            recipients=[email],
-            template_body={"token": token},  # Дані, які будуть передані в шаблон
-            subtype=MessageType.html,
-        )
+# Пакетна версія для повторних розсилок: шаблон компілюється один раз на весь пакет
+def build_verification_emails(emails: Iterable[EmailStr]) -> List[EmailOutbox]:
+    recipients = list(emails)
+    bodies = email_templates.render_batch(
+        VERIFICATION_TEMPLATE,
+        ({"token": create_email_token({"sub": email})} for email in recipients),
+    )
+    return [
+        EmailOutbox(recipient=email, subject=VERIFICATION_SUBJECT, html_body=body)
+        for email, body in zip(recipients, bodies)
+    ]
 
-        fm = FastMail(conf)
-        await fm.send_message(message, template_name="verify_email.html")
-    except ConnectionErrors as e:
-        print(f"Failed to send email: {e}")
\ No newline at end of file
+# Дайджести днів народження для пакета користувачів: (email, [(ім'я, дата), ...])
+def build_birthday_digests(
+    recipients: Sequence[Tuple[str, Sequence[Tuple[str, date]]]], days: int
+) -> List[EmailOutbox]:
+    bodies = email_templates.render_batch(
+        BIRTHDAY_DIGEST_TEMPLATE,
+        (
+            {
+                "days": days,
+                "contacts": [{"name": name, "date": birthday.strftime("%d %B")} for name, birthday in contacts],
+            }
+            for _, contacts in recipients
+        ),
+    )
+    return [
+        EmailOutbox(recipient=email, subject=BIRTHDAY_DIGEST_SUBJECT, html_body=body)
+        for (email, _), body in zip(recipients, bodies)
+    ]
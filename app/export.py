@@ -0,0 +1,84 @@
+import csv
+import io
+import json
+from enum import Enum
+from typing import AsyncIterator, Iterable, Iterator, Sequence
+
+from sqlalchemy import select
+from starlette.concurrency import iterate_in_threadpool
+
+from app import db as database
+from app.models import Contact
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv; charset=utf-8",
+}
+
+EXPORT_COLUMNS = (
+    Contact.id,
+    Contact.first_name,
+    Contact.last_name,
+    Contact.email,
+    Contact.phone,
+    Contact.birthday,
+    Contact.additional_info,
+)
+EXPORT_FIELDS = tuple(column.key for column in EXPORT_COLUMNS)
+BIRTHDAY_INDEX = EXPORT_FIELDS.index("birthday")
+
+
+def export_statement(user_id: int):
+    return select(*EXPORT_COLUMNS).where(Contact.user_id == user_id).order_by(Contact.id)
+
+
+# Серіалізація кортежів напряму, без Pydantic-моделі на кожен рядок
+def encode_ndjson(rows: Iterable[Sequence]) -> bytes:
+    lines = []
+    for row in rows:
+        values = list(row)
+        values[BIRTHDAY_INDEX] = values[BIRTHDAY_INDEX].isoformat()
+        lines.append(json.dumps(dict(zip(EXPORT_FIELDS, values)), ensure_ascii=False))
+    return ("\n".join(lines) + "\n").encode("utf-8") if lines else b""
+
+
+def encode_csv(rows: Iterable[Sequence], header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    writer.writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def _encode(partition: Sequence, fmt: ExportFormat) -> bytes:
+    return encode_ndjson(partition) if fmt is ExportFormat.ndjson else encode_csv(partition)
+
+
+def _sync_partitions(user_id: int, batch_size: int) -> Iterator[Sequence]:
+    with database.SessionLocal() as session:
+        stmt = export_statement(user_id).execution_options(yield_per=batch_size, stream_results=True)
+        yield from session.execute(stmt).partitions()
+
+
+# Сесія відкривається всередині генератора: залежності з yield закриваються
+# до того, як StreamingResponse віддасть тіло
+async def stream_contacts(user_id: int, fmt: ExportFormat, batch_size: int = 1000) -> AsyncIterator[bytes]:
+    if fmt is ExportFormat.csv:
+        yield encode_csv((), header=True)
+
+    if database.DB_ASYNC:
+        async with database.AsyncSessionLocal() as session:
+            stmt = export_statement(user_id).execution_options(yield_per=batch_size, stream_results=True)
+            result = await session.stream(stmt)
+            async for partition in result.partitions():
+                yield _encode(partition, fmt)
+    else:
+        async for partition in iterate_in_threadpool(_sync_partitions(user_id, batch_size)):
+            yield _encode(partition, fmt)
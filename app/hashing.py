@@ -0,0 +1,104 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+import bcrypt
+
+from settings import settings
+
+
+# Функції виконуються у воркерах пулу, тому мають бути на рівні модуля
+def _hash(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+
+def _verify(password: bytes, hashed: bytes) -> bool:
+    try:
+        return bcrypt.checkpw(password, hashed)
+    except ValueError:
+        return False
+
+
+class HashingOverloaded(Exception):
+    pass
+
+
+class HashMetrics:
+    def __init__(self):
+        self.count = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "rejected": self.rejected,
+            "avg_seconds": self.total_seconds / self.count if self.count else 0.0,
+            "max_seconds": self.max_seconds,
+        }
+
+
+# Єдиний сервіс хешування паролів: bcrypt у окремому пулі процесів,
+# щоб не займати потоки threadpool і не тримати GIL під час запитів
+class PasswordHasher:
+    def __init__(self, workers: int = 2, max_pending: int = 64, rounds: int = 12, executor: str = "process"):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self.executor_kind = executor
+        self.pending = 0
+        self.metrics = HashMetrics()
+        self._executor: Optional[Executor] = None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "thread":
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+            else:
+                # spawn: fork процесу з потоками uvicorn/anyio може успадкувати захоплені блокування
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+        return self._executor
+
+    async def _submit(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.metrics.rejected += 1
+            raise HashingOverloaded("Too many pending password hashing jobs")
+        self.pending += 1
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        finally:
+            self.pending -= 1
+            self.metrics.observe(time.perf_counter() - started)
+
+    async def hash(self, password: str) -> str:
+        hashed = await self._submit(_hash, password.encode("utf-8"), self.rounds)
+        return hashed.decode("utf-8")
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._submit(_verify, password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.HASH_WORKERS,
+    max_pending=settings.HASH_MAX_PENDING,
+    rounds=settings.BCRYPT_ROUNDS,
+    executor=settings.HASH_EXECUTOR,
+)
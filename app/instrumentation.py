@@ -0,0 +1,134 @@
+import logging
+import time
+from collections import Counter as StatementCounter
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+
+from app.metrics import REGISTRY
+
+logger = logging.getLogger("app.slow_requests")
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests", "HTTP requests by route and status code", ("method", "route", "status")
+)
+HTTP_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route")
+)
+HTTP_IN_PROGRESS = REGISTRY.gauge(
+    "http_requests_in_progress", "HTTP requests currently being processed", ("method",)
+)
+REQUEST_DB_QUERIES = REGISTRY.histogram(
+    "http_request_db_queries", "SQL statements executed per request", ("route",),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+REQUEST_DB_SECONDS = REGISTRY.histogram(
+    "http_request_db_seconds", "Time spent in SQL statements per request", ("route",)
+)
+DB_QUERIES = REGISTRY.counter("db_queries", "SQL statements executed", ("engine",))
+DB_DURATION = REGISTRY.histogram(
+    "db_query_duration_seconds", "SQL statement latency", ("engine",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+# Статистика поточного запиту. Об'єкт змінюється на місці, тож його бачать
+# і потоки threadpool, і greenlet-и async-сесії, яким копіюється контекст.
+class RequestStats:
+    def __init__(self, max_statements: int):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.max_statements = max_statements
+        self.statements: List[Tuple[str, float]] = []
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.queries += 1
+        self.db_seconds += seconds
+        if len(self.statements) < self.max_statements:
+            self.statements.append((statement, seconds))
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+def instrument_engine(engine, name: str) -> None:
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        DB_QUERIES.inc(engine=name)
+        DB_DURATION.observe(elapsed, engine=name)
+        stats = current_request.get()
+        if stats is not None:
+            stats.record(statement, elapsed)
+
+
+def route_name(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+def format_statements(stats: RequestStats) -> str:
+    # Однакові запити групуються: N+1 видно як "12x SELECT ..."
+    counts = StatementCounter()
+    durations = {}
+    for statement, seconds in stats.statements:
+        text = " ".join(statement.split())
+        counts[text] += 1
+        durations[text] = durations.get(text, 0.0) + seconds
+    return "\n".join(
+        f"  {count}x {durations[text] * 1000:.1f}ms {text[:500]}" for text, count in counts.most_common()
+    )
+
+
+# Чистий ASGI-middleware: не буферизує тіло і не створює додаткових задач
+class MetricsMiddleware:
+    def __init__(self, app, slow_request_seconds: float = 1.0, max_statements: int = 200):
+        self.app = app
+        self.slow_request_seconds = slow_request_seconds
+        self.max_statements = max_statements
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        stats = RequestStats(self.max_statements)
+        token = current_request.set(stats)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc(method=method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_PROGRESS.dec(method=method)
+            current_request.reset(token)
+            route = route_name(scope)
+            HTTP_REQUESTS.inc(method=method, route=route, status=status)
+            HTTP_DURATION.observe(elapsed, method=method, route=route)
+            REQUEST_DB_QUERIES.observe(stats.queries, route=route)
+            REQUEST_DB_SECONDS.observe(stats.db_seconds, route=route)
+            if elapsed >= self.slow_request_seconds:
+                logger.warning(
+                    "Slow request %s %s -> %s in %.1fms, %d queries, %.1fms in DB\n%s",
+                    method, scope["path"], status, elapsed * 1000, stats.queries,
+                    stats.db_seconds * 1000, format_statements(stats),
+                )
+
@@ -0,0 +1,165 @@
+import base64
+import calendar
+import hashlib
+import hmac
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+
+from jose import JWTError, jwt
+
+HMAC_DIGESTS = {
+    "HS256": hashlib.sha256,
+    "HS384": hashlib.sha384,
+    "HS512": hashlib.sha512,
+}
+TIME_CLAIMS = ("exp", "iat", "nbf")
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+def _timestamp(value) -> int:
+    if isinstance(value, datetime):
+        return calendar.timegm(value.utctimetuple())
+    return int(value)
+
+
+# Ключ підпису будується один раз під час старту і спільний для всіх токенів
+class SigningKey:
+    def __init__(self, secret: str, algorithm: str):
+        self.secret = secret
+        self.algorithm = algorithm
+        self.secret_bytes = secret.encode("utf-8")
+        self.digest = HMAC_DIGESTS.get(algorithm)
+        self.header = {"alg": algorithm, "typ": "JWT"}
+        self.header_segment = _b64encode(json.dumps(self.header, separators=(",", ":")).encode("utf-8"))
+        # Попередньо ініціалізований HMAC: на кожен підпис лише copy() + update()
+        self._mac = hmac.new(self.secret_bytes, digestmod=self.digest) if self.digest else None
+
+    def sign(self, signing_input: bytes) -> bytes:
+        mac = self._mac.copy()
+        mac.update(signing_input)
+        return mac.digest()
+
+
+class JWTBackend:
+    def encode(self, claims: dict, key: SigningKey) -> str:
+        raise NotImplementedError
+
+    def decode(self, token: str, key: SigningKey) -> dict:
+        raise NotImplementedError
+
+
+class JoseBackend(JWTBackend):
+    def encode(self, claims: dict, key: SigningKey) -> str:
+        return jwt.encode(claims, key.secret, algorithm=key.algorithm)
+
+    def decode(self, token: str, key: SigningKey) -> dict:
+        return jwt.decode(token, key.secret, algorithms=[key.algorithm])
+
+
+# Швидкий бекенд для HS256/384/512: hmac + base64 + json зі стандартної бібліотеки.
+# Помилки піднімаються як jose.JWTError, тож код, що викликає, не залежить від бекенду.
+class HMACBackend(JWTBackend):
+    def encode(self, claims: dict, key: SigningKey) -> str:
+        if key.digest is None:
+            raise JWTError(f"Algorithm {key.algorithm} is not supported by the hmac backend")
+        payload = dict(claims)
+        for name in TIME_CLAIMS:
+            if name in payload:
+                payload[name] = _timestamp(payload[name])
+        payload_segment = _b64encode(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+        signing_input = key.header_segment + b"." + payload_segment
+        return (signing_input + b"." + _b64encode(key.sign(signing_input))).decode("ascii")
+
+    def decode(self, token: str, key: SigningKey) -> dict:
+        if key.digest is None:
+            raise JWTError(f"Algorithm {key.algorithm} is not supported by the hmac backend")
+        try:
+            raw = token.encode("ascii")
+            signing_input, _, signature = raw.rpartition(b".")
+            header_segment, _, payload_segment = signing_input.partition(b".")
+            if not header_segment or not payload_segment:
+                raise JWTError("Not enough segments")
+            if not hmac.compare_digest(key.sign(signing_input), _b64decode(signature)):
+                raise JWTError("Signature verification failed")
+            header = json.loads(_b64decode(header_segment))
+            if not isinstance(header, dict) or header.get("alg") != key.algorithm:
+                raise JWTError("The specified alg value is not allowed")
+            claims = json.loads(_b64decode(payload_segment))
+            if not isinstance(claims, dict):
+                raise JWTError("Invalid payload")
+
+            # Некоректні exp/nbf (рядок, null) — такий самий невалідний токен, а не 500
+            now = time.time()
+            if "exp" in claims and _timestamp(claims["exp"]) <= now:
+                raise JWTError("Signature has expired")
+            if "nbf" in claims and _timestamp(claims["nbf"]) > now:
+                raise JWTError("The token is not yet valid (nbf)")
+        except (ValueError, TypeError, UnicodeError) as e:
+            raise JWTError(f"Invalid token: {e}") from e
+        return claims
+
+
+JWT_BACKENDS = {
+    "jose": JoseBackend,
+    "hmac": HMACBackend,
+}
+
+
+def get_jwt_backend(name: str) -> JWTBackend:
+    if name not in JWT_BACKENDS:
+        raise ValueError(f"Unknown JWT backend '{name}'")
+    return JWT_BACKENDS[name]()
+
+
+# LRU перевірених токенів: токен -> claims; запис зникає у момент exp
+class TokenCache:
+    def __init__(self, maxsize: int = 10000, clock=time.time):
+        self.maxsize = maxsize
+        self._clock = clock
+        self._data: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[dict]:
+        with self._lock:
+            item = self._data.get(token)
+            if item is None:
+                self.misses += 1
+                return None
+            expires_at, claims = item
+            if expires_at <= self._clock():
+                del self._data[token]
+                self.misses += 1
+                return None
+            self._data.move_to_end(token)
+            self.hits += 1
+            return claims
+
+    def set(self, token: str, claims: dict) -> None:
+        # Токени без exp не кешуються: для них немає моменту витіснення
+        if self.maxsize <= 0 or "exp" not in claims:
+            return
+        with self._lock:
+            self._data[token] = (_timestamp(claims["exp"]), claims)
+            self._data.move_to_end(token)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,56 @@
+from fastapi import HTTPException
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+from starlette.requests import Request
+
+from app.auth import decode_access_token
+from settings import settings
+
+
+def ip_key(request: Request) -> str:
+    return f"ip:{get_remote_address(request)}"
+
+
+# Для автентифікованих запитів ліміт рахується на користувача (uid з токена),
+# для решти — на IP-адресу. Лише для /auth/me, де токен перевіряється вже в обробнику
+def user_or_ip_key(request: Request) -> str:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            payload = decode_access_token(token)
+        except HTTPException:
+            return ip_key(request)
+        if payload.get("uid") is not None:
+            return f"user:{payload['uid']}"
+        if payload.get("sub"):
+            return f"user:{payload['sub']}"
+    return ip_key(request)
+
+
+# Ключ ліміту контактів — id користувача, який get_current_user уже перевірив і
+# записав у request.state. Зміст токена тут не розбирається, тож довільні токени
+# не створюють нових лічильників; без перевіреного користувача рахується IP
+def user_key(request: Request) -> str:
+    user_id = getattr(request.state, "user_id", None)
+    return f"user:{user_id}" if user_id is not None else ip_key(request)
+
+
+# Єдиний лімітер застосунку. Зі спільним сховищем (redis://...) ліміти діють на всі
+# воркери; moving-window та sliding-window-counter виконуються одним атомарним
+# Lua-скриптом. Якщо сховище недоступне, slowapi переходить на пам'ять процесу.
+limiter = Limiter(
+    key_func=ip_key,
+    storage_uri=settings.RATE_LIMIT_STORAGE_URI,
+    strategy=settings.RATE_LIMIT_STRATEGY,
+    in_memory_fallback_enabled=True,
+    key_prefix="contacts",
+)
+
+# Спільні ліміти на весь API контактів: один лічильник на користувача для всіх маршрутів
+# і окремий на IP-адресу, тож багато облікових записів з однієї адреси не обходять ліміт
+contacts_user_limit = limiter.shared_limit(settings.RATE_LIMIT_CONTACTS, scope="contacts", key_func=user_key)
+contacts_ip_limit = limiter.shared_limit(settings.RATE_LIMIT_CONTACTS_IP, scope="contacts-ip", key_func=ip_key)
+
+
+def contacts_limit(func):
+    return contacts_ip_limit(contacts_user_limit(func))
@@ -1,19 +1,75 @@
+import asyncio
+from contextlib import asynccontextmanager
+from pathlib import Path
+
 from fastapi import FastAPI, Request
-from app.routers import contacts, auth
-from app.db import engine
+from starlette.concurrency import run_in_threadpool
+from app.routers import contacts, auth, admin, metrics
+from app import db
 from app.models import Base
 
 from fastapi.middleware.cors import CORSMiddleware
-from slowapi import Limiter
+from fastapi.staticfiles import StaticFiles
+from slowapi import _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
-from slowapi.util import get_remote_address
+from app.avatars import avatar_service
+from app.birthday_digest import birthday_digest_scheduler
+from app.changes import compact_forever
+from app.email_templates import email_templates
+from app.hashing import password_hasher
+from app.instrumentation import MetricsMiddleware
+from app.limiter import limiter
+from app.outbox import outbox_worker
 from settings import settings
 
-limiter = Limiter(key_func=get_remote_address)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Схемою керує Alembic; create_all лишився лише як опція для локальної розробки
+    if settings.DB_CREATE_ALL:
+        await run_in_threadpool(Base.metadata.create_all, bind=db.engine)
+    email_templates.warm()
+    # Воркер outbox працює у процесі застосунку; його можна вимкнути
+    # і запускати окремо: python -m app.outbox
+    worker_task = None
+    if settings.OUTBOX_WORKER_ENABLED:
+        worker_task = asyncio.create_task(outbox_worker.run_forever())
+    replica_task = None
+    if db.DATABASE_REPLICA_URLS:
+        replica_task = asyncio.create_task(db.monitor_replicas())
+    # Щоденні дайджести днів народження; окремий запуск: python -m app.birthday_digest
+    digest_task = None
+    if settings.BIRTHDAY_DIGEST_ENABLED:
+        digest_task = asyncio.create_task(birthday_digest_scheduler.run_forever())
+    # Стиснення журналу змін контактів; окремий запуск: python -m app.changes
+    compact_task = None
+    if settings.CONTACT_CHANGES_COMPACT_INTERVAL > 0:
+        compact_task = asyncio.create_task(compact_forever(
+            settings.CONTACT_CHANGES_COMPACT_INTERVAL, settings.CONTACT_CHANGES_RETENTION_DAYS
+        ))
+    yield
+    if compact_task is not None:
+        compact_task.cancel()
+        await asyncio.gather(compact_task, return_exceptions=True)
+    if digest_task is not None:
+        birthday_digest_scheduler.stop()
+        await digest_task
+    if worker_task is not None:
+        outbox_worker.stop()
+        await worker_task
+    if replica_task is not None:
+        replica_task.cancel()
+        await asyncio.gather(replica_task, return_exceptions=True)
+    password_hasher.shutdown()
+    avatar_service.shutdown()
+    await db.dispose_engines()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.state.limiter = limiter
+app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 app.add_middleware(SlowAPIMiddleware)
 
@@ -23,14 +79,27 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[contacts.NEXT_CURSOR_HEADER, "ETag"],
+)
+
+# Додається останнім, тож стає зовнішнім і заміряє весь стек, включно з rate limit
+app.add_middleware(
+    MetricsMiddleware,
+    slow_request_seconds=settings.SLOW_REQUEST_SECONDS,
+    max_statements=settings.SLOW_REQUEST_MAX_STATEMENTS,
 )
 
 app.include_router(auth.router)
 app.include_router(contacts.router, prefix="/contacts", tags=["contacts"])
+app.include_router(admin.router)
+app.include_router(metrics.router)
+
+# Локальне сховище аватарів роздається самим застосунком
+if settings.AVATAR_STORAGE == "local":
+    Path(settings.AVATAR_LOCAL_DIR).mkdir(parents=True, exist_ok=True)
+    app.mount(settings.AVATAR_LOCAL_URL, StaticFiles(directory=settings.AVATAR_LOCAL_DIR), name="avatars")
 
 @app.get("/")
 @limiter.limit(settings.RATE_LIMIT_GLOBAL)
 async def root(request: Request):  # Додайте параметр request
     return {"message": "Welcome to the API"}
-
-Base.metadata.create_all(bind=engine)
\ No newline at end of file
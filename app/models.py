@@ -1,21 +1,59 @@
-from sqlalchemy import Column, Integer, Boolean, String, Date, ForeignKey
-from sqlalchemy.orm import relationship
+from datetime import date, datetime
+
+from sqlalchemy import Column, Integer, SmallInteger, Boolean, String, Text, Date, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship, validates
 from app.db import Base
 
+
+# Порядковий номер дня народження у високосному році (1..366):
+# 29 лютого завжди 60, 1 березня завжди 61 незалежно від року народження
+def birthday_ordinal(value: date) -> int:
+    return date(2000, value.month, value.day).timetuple().tm_yday
+
 class Contact(Base):
     __tablename__ = "contacts"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     first_name = Column(String, nullable=False)
     last_name = Column(String, nullable=False)
-    email = Column(String, unique=True, index=True, nullable=False)
+    email = Column(String, nullable=False)
     phone = Column(String, nullable=False)
     birthday = Column(Date, nullable=False)
+    birthday_ordinal = Column(SmallInteger, nullable=False)
     additional_info = Column(String)
     user_id = Column(Integer, ForeignKey("users.id"))
+    # Час останньої зміни: з нього будуються ETag контакту і версія списку
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     user = relationship("User", back_populates="contacts")
 
+    @validates("birthday")
+    def _sync_birthday_ordinal(self, key, value):
+        self.birthday_ordinal = birthday_ordinal(value)
+        return value
+
+    # Усі запити фільтрують за user_id, тож індекси починаються з нього.
+    # Email унікальний лише в межах користувача.
+    __table_args__ = (
+        Index("uq_contacts_user_id_email", "user_id", "email", unique=True),
+        # Індекси під keyset-пагінацію: (user_id, ключ сортування, id)
+        Index("ix_contacts_user_id_id", "user_id", "id"),
+        Index("ix_contacts_user_id_last_name_id", "user_id", "last_name", "id"),
+        Index("ix_contacts_user_id_birthday_id", "user_id", "birthday", "id"),
+        Index("ix_contacts_user_id_birthday_ordinal", "user_id", "birthday_ordinal"),
+        Index("ix_contacts_user_id_updated_at", "user_id", "updated_at"),
+        # Trigram GIN-індекси для пошуку (лише Postgres; у SQLite — FTS5, див. app/search.py)
+        *(
+            Index(
+                f"ix_contacts_{field}_trgm",
+                field,
+                postgresql_using="gin",
+                postgresql_ops={field: "gin_trgm_ops"},
+            ).ddl_if(dialect="postgresql")
+            for field in ("first_name", "last_name", "email", "phone")
+        ),
+    )
+
 class User(Base):
     __tablename__ = "users"
 
@@ -24,5 +62,58 @@ class User(Base):
     hashed_password = Column(String, nullable=False)
     is_verified = Column(Boolean, default=False)
     avatar_url = Column(String)
+    # Останній номер у журналі змін контактів користувача (contact_changes.seq)
+    change_seq = Column(Integer, nullable=False, default=0, server_default="0")
+
+    contacts = relationship("Contact", back_populates="user")
+
+# Журнал змін контактів для інкрементальної синхронізації клієнтів.
+# seq видається лічильником users.change_seq у тій самій транзакції, що й зміна,
+# тож у межах користувача номери зростають без пропусків і в порядку комітів.
+class ContactChange(Base):
+    __tablename__ = "contact_changes"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    seq = Column(Integer, primary_key=True, autoincrement=False)
+    contact_id = Column(Integer, nullable=False)
+    op = Column(String(8), nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_contact_changes_created_at", "created_at"),
+    )
+
+# Черга вихідних листів: рядок додається в тій самій транзакції, що й зміна даних,
+# а відправляє його воркер app.outbox
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True)
+    recipient = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    html_body = Column(Text, nullable=False)
+    status = Column(String(16), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(Text)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+# Журнал дайджестів днів народження: рядок на користувача і дату розсилки.
+# Пишеться в одній транзакції з листом в outbox, тож повторний запуск не дублює листи.
+class BirthdayDigest(Base):
+    __tablename__ = "birthday_digests"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    digest_date = Column(Date, nullable=False)
+    contacts = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
-    contacts = relationship("Contact", back_populates="user")
\ No newline at end of file
+    __table_args__ = (
+        Index("uq_birthday_digests_date_user_id", "digest_date", "user_id", unique=True),
+    )
@@ -0,0 +1,261 @@
+import argparse
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from email.utils import formataddr
+from typing import List, Optional
+
+import aiosmtplib
+
+from app import async_crud
+from app.db import session_scope
+from app.models import EmailOutbox
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Невеликий пул постійних SMTP-з'єднань: підключення й автентифікація
+# відбуваються один раз, а не для кожного листа.
+# conf — будь-який об'єкт з полями MAIL_* (settings або fastapi_mail.ConnectionConfig).
+class SMTPConnectionPool:
+    def __init__(self, conf, size: int = 2, timeout: float = 30):
+        self.conf = conf
+        self.size = size
+        self.timeout = timeout
+        self._idle: "Optional[asyncio.Queue[Optional[aiosmtplib.SMTP]]]" = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # Черга прив'язується до event loop, тож створюється в тому циклі, де пул
+    # використовують: пул модульного воркера переживає кілька запусків застосунку
+    def _queue(self) -> "asyncio.Queue[Optional[aiosmtplib.SMTP]]":
+        loop = asyncio.get_running_loop()
+        if self._idle is None or self._loop is not loop:
+            self._loop = loop
+            self._idle = asyncio.Queue()
+            for _ in range(self.size):
+                self._idle.put_nowait(None)
+        return self._idle
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        client = aiosmtplib.SMTP(
+            hostname=self.conf.MAIL_SERVER,
+            port=self.conf.MAIL_PORT,
+            use_tls=self.conf.MAIL_SSL_TLS,
+            start_tls=self.conf.MAIL_STARTTLS,
+            validate_certs=self.conf.VALIDATE_CERTS,
+            timeout=self.timeout,
+        )
+        await client.connect()
+        if self.conf.USE_CREDENTIALS:
+            password = self.conf.MAIL_PASSWORD
+            if hasattr(password, "get_secret_value"):
+                password = password.get_secret_value()
+            await client.login(self.conf.MAIL_USERNAME, password)
+        return client
+
+    async def send(self, message: EmailMessage) -> None:
+        idle = self._queue()
+        client = await idle.get()
+        try:
+            if client is None or not client.is_connected:
+                client = await self._connect()
+            await client.send_message(message)
+        except Exception:
+            # Зламане з'єднання не повертаємо в пул: наступна відправка перепідключиться
+            if client is not None:
+                client.close()
+            client = None
+            raise
+        finally:
+            idle.put_nowait(client)
+
+    async def close(self) -> None:
+        idle = self._queue()
+        for _ in range(self.size):
+            client = await idle.get()
+            if client is not None and client.is_connected:
+                try:
+                    await client.quit()
+                except aiosmtplib.SMTPException:
+                    client.close()
+        for _ in range(self.size):
+            idle.put_nowait(None)
+
+
+class OutboxMetrics:
+    def __init__(self):
+        self.sent = 0
+        self.retried = 0
+        self.dead = 0
+        self.send_seconds_total = 0.0
+        self.send_seconds_max = 0.0
+        self.queue_depth = 0
+
+    def observe_send(self, seconds: float) -> None:
+        self.send_seconds_total += seconds
+        self.send_seconds_max = max(self.send_seconds_max, seconds)
+
+    def snapshot(self) -> dict:
+        attempts = self.sent + self.retried + self.dead
+        return {
+            "queue_depth": self.queue_depth,
+            "sent": self.sent,
+            "retried": self.retried,
+            "dead": self.dead,
+            "send_seconds_avg": self.send_seconds_total / attempts if attempts else 0.0,
+            "send_seconds_max": self.send_seconds_max,
+        }
+
+
+class OutboxWorker:
+    def __init__(
+        self,
+        pool: SMTPConnectionPool,
+        sender: str,
+        batch_size: int = 50,
+        concurrency: int = 2,
+        max_attempts: int = 5,
+        backoff_base: float = 30,
+        backoff_max: float = 3600,
+        lease_seconds: int = 300,
+        poll_interval: float = 5,
+    ):
+        self.pool = pool
+        self.sender = sender
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.metrics = OutboxMetrics()
+        # Event прив'язується до event loop, тож живе лише один запуск run_forever
+        self._stop: Optional[asyncio.Event] = None
+
+    def build_message(self, item: EmailOutbox) -> EmailMessage:
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = item.recipient
+        message["Subject"] = item.subject
+        message.set_content(item.html_body, subtype="html")
+        return message
+
+    # Експоненційна затримка з невеликим джитером
+    def backoff(self, attempts: int) -> timedelta:
+        delay = min(self.backoff_base * 2 ** (attempts - 1), self.backoff_max)
+        return timedelta(seconds=delay * random.uniform(0.9, 1.1))
+
+    async def _send(self, item: EmailOutbox, semaphore: asyncio.Semaphore) -> Optional[str]:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await self.pool.send(self.build_message(item))
+                return None
+            except (aiosmtplib.SMTPException, OSError, asyncio.TimeoutError) as e:
+                return str(e) or type(e).__name__
+            finally:
+                self.metrics.observe_send(time.perf_counter() - started)
+
+    async def run_once(self) -> int:
+        async with session_scope() as db:
+            batch: List[EmailOutbox] = await async_crud.claim_outbox_batch(db, self.batch_size, self.lease_seconds)
+            if not batch:
+                return 0
+
+            semaphore = asyncio.Semaphore(self.concurrency)
+            errors = await asyncio.gather(*(self._send(item, semaphore) for item in batch))
+
+            sent_ids = [item.id for item, error in zip(batch, errors) if error is None]
+            await async_crud.mark_outbox_sent(db, sent_ids)
+            self.metrics.sent += len(sent_ids)
+
+            for item, error in zip(batch, errors):
+                if error is None:
+                    continue
+                if item.attempts >= self.max_attempts:
+                    logger.error("Outbox message %s dead-lettered after %s attempts: %s", item.id, item.attempts, error)
+                    await async_crud.mark_outbox_failed(db, item.id, error, None)
+                    self.metrics.dead += 1
+                else:
+                    retry_at = datetime.utcnow() + self.backoff(item.attempts)
+                    await async_crud.mark_outbox_failed(db, item.id, error, retry_at)
+                    self.metrics.retried += 1
+            return len(batch)
+
+    async def refresh_queue_depth(self) -> int:
+        async with session_scope() as db:
+            counts = await async_crud.count_outbox(db)
+        self.metrics.queue_depth = counts.get("pending", 0) + counts.get("sending", 0)
+        return self.metrics.queue_depth
+
+    async def run_forever(self) -> None:
+        # stop() міг бути викликаний ще до старту задачі — тоді Event уже встановлено
+        if self._stop is None:
+            self._stop = asyncio.Event()
+        stop = self._stop
+        try:
+            while not stop.is_set():
+                try:
+                    processed = await self.run_once()
+                    await self.refresh_queue_depth()
+                except Exception:
+                    logger.exception("Outbox worker iteration failed")
+                    processed = 0
+                # Повний пакет — одразу беремо наступний, інакше чекаємо poll_interval
+                if processed < self.batch_size:
+                    try:
+                        await asyncio.wait_for(stop.wait(), timeout=self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            self._stop = None
+        await self.pool.close()
+
+    def stop(self) -> None:
+        if self._stop is None:
+            self._stop = asyncio.Event()
+        self._stop.set()
+
+
+# Воркер лише описує з'єднання: SMTP-клієнти створюються під час першої відправки
+def build_worker() -> OutboxWorker:
+    return OutboxWorker(
+        pool=SMTPConnectionPool(settings, size=settings.OUTBOX_SMTP_POOL_SIZE),
+        sender=formataddr((settings.MAIL_FROM_NAME or "", settings.MAIL_FROM)),
+        batch_size=settings.OUTBOX_BATCH_SIZE,
+        concurrency=settings.OUTBOX_CONCURRENCY,
+        max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+        backoff_base=settings.OUTBOX_BACKOFF_BASE,
+        backoff_max=settings.OUTBOX_BACKOFF_MAX,
+        lease_seconds=settings.OUTBOX_LEASE_SECONDS,
+        poll_interval=settings.OUTBOX_POLL_INTERVAL,
+    )
+
+
+outbox_worker = build_worker()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Send pending emails from the outbox")
+    parser.add_argument("--once", action="store_true", help="process a single batch and exit")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    async def run():
+        if args.once:
+            processed = await outbox_worker.run_once()
+            await outbox_worker.pool.close()
+            print(f"Processed {processed} message(s)")
+        else:
+            await outbox_worker.run_forever()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import base64
+import json
+from datetime import date
+from enum import Enum
+from typing import Any, Tuple
+
+from app.models import Contact
+
+
+class ContactSort(str, Enum):
+    id = "id"
+    last_name = "last_name"
+    birthday = "birthday"
+
+
+SORT_COLUMNS = {
+    ContactSort.id: Contact.id,
+    ContactSort.last_name: Contact.last_name,
+    ContactSort.birthday: Contact.birthday,
+}
+
+
+def sort_value(contact: Contact, sort: ContactSort) -> Any:
+    return getattr(contact, SORT_COLUMNS[sort].key)
+
+
+# Непрозорий курсор: base64(JSON) з ключем сортування та останньою парою (значення, id)
+def encode_cursor(sort: ContactSort, value: Any, contact_id: int) -> str:
+    if isinstance(value, date):
+        value = value.isoformat()
+    raw = json.dumps({"s": sort.value, "v": value, "id": contact_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: ContactSort) -> Tuple[Any, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if data["s"] != sort.value:
+            raise ValueError("Cursor was issued for a different sort order")
+        value = data["v"]
+        if sort is ContactSort.birthday:
+            value = date.fromisoformat(value)
+        return value, int(data["id"])
+    except (KeyError, TypeError, ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {e}") from e
@@ -0,0 +1,105 @@
+import asyncio
+import itertools
+import logging
+from typing import Iterable, List, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger("app.replicas")
+
+
+class Replica:
+    def __init__(self, name: str, engine):
+        self.name = name
+        self.engine = engine
+        # Session.get_bind повертає sync-двигун і для AsyncSession
+        self.bind = getattr(engine, "sync_engine", engine)
+        self.healthy = True
+        event.listen(self.bind, "handle_error", self._on_error)
+
+    # Пасивна перевірка: репліка, до якої не вдалось підключитись, виводиться
+    # з ротації до наступної успішної активної перевірки
+    def _on_error(self, context) -> None:
+        if context.connection is None or context.is_disconnect:
+            self.set_healthy(False)
+
+    def set_healthy(self, healthy: bool) -> None:
+        if healthy != self.healthy:
+            logger.warning("Replica %s is %s", self.name, "back online" if healthy else "unavailable")
+        self.healthy = healthy
+
+    async def ping(self, timeout: float) -> bool:
+        try:
+            if self.engine is self.bind:
+                await asyncio.wait_for(run_in_threadpool(self._ping_sync), timeout)
+            else:
+                await asyncio.wait_for(self._ping_async(), timeout)
+        except Exception:
+            return False
+        return True
+
+    def _ping_sync(self) -> None:
+        with self.engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    async def _ping_async(self) -> None:
+        async with self.engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+
+class ReplicaSet:
+    def __init__(self, replicas: Iterable[Replica]):
+        self.replicas: List[Replica] = list(replicas)
+        self._counter = itertools.count()
+
+    # Round-robin серед здорових реплік; None — читати нема звідки, крім primary
+    def pick(self) -> Optional[Replica]:
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+
+    async def check(self, timeout: float) -> None:
+        results = await asyncio.gather(*(replica.ping(timeout) for replica in self.replicas))
+        for replica, healthy in zip(self.replicas, results):
+            replica.set_healthy(healthy)
+
+    async def monitor(self, interval: float) -> None:
+        while True:
+            await self.check(timeout=interval)
+            await asyncio.sleep(interval)
+
+    def status(self) -> dict:
+        return {replica.name: replica.healthy for replica in self.replicas}
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            if replica.engine is replica.bind:
+                await run_in_threadpool(replica.engine.dispose)
+            else:
+                await replica.engine.dispose()
+
+
+# Сесія для read-only залежностей: SELECT ідуть на одну репліку на всю сесію,
+# усе інше (DML, text(), flush) — на primary. Після першого запису в primary
+# у межах запиту (request_state.db_wrote) сесія теж читає з primary.
+class RoutingSession(Session):
+    def __init__(self, *args, primary, replicas: ReplicaSet, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.primary = primary
+        self.replicas = replicas
+        self.use_primary = False
+        self._replica: Optional[Replica] = None
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if not self.use_primary:
+            state = self.info.get("request_state")
+            if self._flushing or clause is None or not clause.is_select or getattr(state, "db_wrote", False):
+                self.use_primary = True
+        if self.use_primary:
+            return self.primary
+        if self._replica is None or not self._replica.healthy:
+            self._replica = self.replicas.pick()
+        return self._replica.bind if self._replica is not None else self.primary
@@ -0,0 +1,36 @@
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from app import async_crud, db
+from app.db import get_session
+from app.db_pool import pool_status
+from app.outbox import outbox_worker
+from settings import settings
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+# Службові ендпоінти доступні лише з X-Admin-Token; без ADMIN_TOKEN вони вимкнені
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+@router.get("/pool", dependencies=[Depends(require_admin)])
+async def get_pool_stats():
+    stats = {"primary": pool_status(db.engine, db.pool_stats)}
+    if db.async_engine is not None:
+        stats["async"] = pool_status(db.async_engine, db.async_pool_stats)
+    return stats
+
+
+@router.get("/outbox", dependencies=[Depends(require_admin)])
+async def get_outbox_stats(session: async_crud.DbSession = Depends(get_session)):
+    return {
+        "statuses": await async_crud.count_outbox(session),
+        "worker": outbox_worker.metrics.snapshot(),
+    }
@@ -1,26 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Request, File, UploadFile
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Request, File, UploadFile
 from pydantic import BaseModel
 
-from app.db import get_db, verify_password
+from app.db import get_read_session, get_session
+from app.async_crud import DbSession
 from app.auth import create_access_token, decode_access_token
-from app.email_utils import send_verification_email
-from app.models import User
-from app import crud, schemas
-from app.cloudinary_utils import upload_avatar
+from app.email_utils import build_verification_email
+from app import async_crud, schemas
+from app.avatars import AvatarTooLarge, AvatarUploadsOverloaded, InvalidImage, avatar_service
+from app.hashing import HashingOverloaded, password_hasher
+from app.limiter import limiter, user_or_ip_key
 
-from slowapi.util import get_remote_address
-from slowapi import Limiter
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from app.schemas import UserResponse
+from app.schemas import CachedUser, UserResponse
 from settings import settings
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
-limiter = Limiter(key_func=get_remote_address)
-
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
+async def get_token_user(token: str, db: DbSession) -> CachedUser:
+    payload = decode_access_token(token)
+    user_id = payload.get("uid")
+    email = payload.get("sub")
+    if user_id is None and not email:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    if user_id is not None:
+        user = await async_crud.get_cached_user(db, int(user_id))
+    else:
+        user = await async_crud.get_cached_user_by_email(db, email)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+def server_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server is busy, please retry",
+        headers={"Retry-After": "1"},
+    )
+
 class LoginRequest(BaseModel):
     email: str
     password: str
@@ -33,78 +52,75 @@ class TokenResponse(BaseModel):
 async def upload_user_avatar(
     token: str = Depends(oauth2_scheme),
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
-    payload = decode_access_token(token)
-    email = payload.get("sub")
-    if not email:
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    user = await get_token_user(token, db)
 
-    avatar_url = upload_avatar(file, public_id=f"user_{user.id}")
+    try:
+        avatar_url = await avatar_service.upload(file)
+    except InvalidImage as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except AvatarTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except AvatarUploadsOverloaded:
+        raise server_busy()
 
-    user.avatar_url = avatar_url
-    db.commit()
+    await async_crud.update_avatar(db, user.id, avatar_url)
 
     return {"avatar_url": avatar_url}
 
 @router.get("/me", response_model=UserResponse)
-@limiter.limit("5/minute")
+@limiter.limit(settings.RATE_LIMIT_ME, key_func=user_or_ip_key)
 async def get_me(
     request: Request,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_read_session),
     token: str = Depends(oauth2_scheme)
 ):
-    payload = decode_access_token(token)
-    email = payload.get("sub")
-    if not email:
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    return user
+    return await get_token_user(token, db)
 
 @router.post("/token")
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
-    user = crud.get_user_by_email(db, form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = await async_crud.get_user_by_email(db, form_data.username)
+    try:
+        password_ok = bool(user) and await password_hasher.verify(form_data.password, user.hashed_password)
+    except HashingOverloaded:
+        raise server_busy()
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password",
         )
-    access_token = create_access_token(data={"sub": user.email})
+    access_token = create_access_token(data={"sub": user.email, "uid": user.id})
     return {"access_token": access_token, "token_type": "bearer"}
 
 # Новий маршрут для реєстрації користувачів
 @router.post("/register", status_code=status.HTTP_201_CREATED, response_model=schemas.UserResponse)
 async def register_user(
     user: schemas.UserCreate,
-    db: Session = Depends(get_db),
-    background_tasks: BackgroundTasks = BackgroundTasks()
+    db: DbSession = Depends(get_session)
 ):
-    existing_user = crud.get_user_by_email(db, user.email)
+    existing_user = await async_crud.get_user_by_email(db, user.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="User with this email already exists"
         )
     
-    new_user = crud.create_user(db, user)
-    
-    # Надсилання верифікаційного email у фоновому режимі
-    background_tasks.add_task(send_verification_email, new_user.email)
+    try:
+        hashed_password = await password_hasher.hash(user.password)
+    except HashingOverloaded:
+        raise server_busy()
+    # Верифікаційний лист записується в outbox разом з користувачем
+    new_user = await async_crud.create_user(
+        db, user, hashed_password, outbox=[build_verification_email(user.email)]
+    )
     return new_user
 
 @router.get("/verify-email")
-async def verify_email(token: str, db: Session = Depends(get_db)):
+async def verify_email(token: str, db: DbSession = Depends(get_session)):
     try:
         payload = decode_access_token(token)
     except HTTPException as e:
@@ -114,15 +130,13 @@ async def verify_email(token: str, db: Session = Depends(get_db)):
     if not email:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Token does not contain an email")
 
-    user = crud.get_user_by_email(db, email)
+    user = await async_crud.get_cached_user_by_email(db, email)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
     if user.is_verified:
         return {"message": "Email is already verified."}
 
-    user.is_verified = True
-    db.add(user)
-    db.commit()
+    await async_crud.verify_user(db, user.id)
 
     return {"message": "Email successfully verified."}
\ No newline at end of file
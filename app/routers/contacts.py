@@ -1,81 +1,328 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.db import get_db
-from app import crud, schemas
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from sqlalchemy.exc import IntegrityError
+from fastapi.responses import StreamingResponse
+from app.db import get_read_session, get_session
+from app.async_crud import DbSession
+from app import async_crud, schemas
+from app.changes import stream_changes
+from app.crud import BatchTooLarge, ChangeCursorExpired, is_duplicate_contact_email
+from typing import List, Optional, Tuple
+from datetime import date
 from fastapi.security import OAuth2PasswordBearer
 from app.auth import decode_access_token
+from app.pagination import ContactSort, decode_cursor, encode_cursor
+from app.search import SearchMode
+from app.bulk_import import ImportFormat, ImportReportBuilder, format_from_content_type, iter_records, validate_record
+from app.export import MEDIA_TYPES, ExportFormat, stream_contacts
+from app.etag import make_etag, not_modified, set_etag
+from app.limiter import contacts_limit
+from app.serialization import ORJSONResponse, encode_contacts
+from settings import settings
 
 router = APIRouter()
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
+# Перевірений id зберігається в request.state: за ним рахується ліміт контактів
+async def get_current_user(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db: DbSession = Depends(get_read_session),
+) -> int:
     payload = decode_access_token(token)
-    return payload["sub"]
+    user_id = payload.get("uid")
+    if user_id is None:
+        # Токени, видані до появи "uid", розв'язуємо через email
+        email = payload.get("sub")
+        user = await async_crud.get_cached_user_by_email(db, email) if email else None
+        if not user:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        user_id = user.id
+    request.state.user_id = int(user_id)
+    return request.state.user_id
+
+# Швидкий режим: рядки-кортежі одразу кодуються orjson, минаючи response_model.
+# Заголовки (ETag, X-Next-Cursor), виставлені на response, переносяться у відповідь.
+def contacts_response(response: Response, rows, fast: bool):
+    if not fast:
+        return rows
+    fast_response = ORJSONResponse(encode_contacts(rows))
+    fast_response.headers.update(response.headers)
+    return fast_response
+
+def contact_etag(contact) -> str:
+    return make_etag("contact", contact.id, contact.updated_at)
+
+# ETag списку: версія колекції користувача + параметри запиту.
+# Якщо клієнт має актуальну версію, запит рядків не виконується взагалі.
+async def collection_etag(db: DbSession, user_id: int, *params) -> str:
+    version = await async_crud.get_contacts_version(db=db, user_id=user_id)
+    return make_etag("contacts", user_id, version, *params)
+
+# Журнал змін для синхронізації клієнтів. Читається з primary: репліка може
+# відставати, і клієнт пропустив би зміни з уже виданим курсором.
+@router.get("/changes", response_model=schemas.ContactChangesPage)
+@contacts_limit
+async def read_contact_changes(
+    request: Request,
+    since: Optional[int] = Query(None, ge=0),
+    limit: int = Query(settings.CONTACT_CHANGES_PAGE_SIZE, ge=1, le=settings.CONTACT_CHANGES_PAGE_SIZE),
+    db: DbSession = Depends(get_session),
+    current_user: int = Depends(get_current_user),
+):
+    try:
+        changes, next_since, has_more = await async_crud.get_contact_changes(
+            db=db, user_id=current_user, since=since, limit=limit
+        )
+    except ChangeCursorExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    return schemas.ContactChangesPage(changes=changes, next_since=next_since, has_more=has_more)
+
+@router.get("/changes/stream")
+@contacts_limit
+async def stream_contact_changes(
+    request: Request,
+    since: Optional[int] = Query(None, ge=0),
+    last_event_id: Optional[int] = Header(None, ge=0),
+    current_user: int = Depends(get_current_user),
+):
+    return StreamingResponse(
+        stream_changes(
+            request, current_user, last_event_id if last_event_id is not None else since,
+            poll_seconds=settings.CONTACT_CHANGES_POLL_SECONDS, limit=settings.CONTACT_CHANGES_PAGE_SIZE,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# Пакетні маршрути оголошені до /{contact_id}, інакше "batch" розбирався б як id
+@router.patch("/batch", response_model=schemas.ContactBatchResult)
+@contacts_limit
+async def batch_update_contacts(
+    request: Request,
+    batch: schemas.ContactBatchUpdate,
+    db: DbSession = Depends(get_session),
+    current_user: int = Depends(get_current_user),
+):
+    if not batch.changes.model_fields_set:
+        raise HTTPException(status_code=422, detail="No changes provided")
+    try:
+        ids = await async_crud.batch_update_contacts(
+            db=db, user_id=current_user, changes=batch.changes, ids=batch.ids, filter=batch.filter,
+            max_size=settings.CONTACT_BATCH_MAX_SIZE,
+        )
+    except BatchTooLarge as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except IntegrityError as e:
+        if not is_duplicate_contact_email(e):
+            raise
+        raise HTTPException(status_code=409, detail="Contact with this email already exists")
+    return schemas.ContactBatchResult(affected=len(ids), ids=ids)
+
+@router.delete("/batch", response_model=schemas.ContactBatchResult)
+@contacts_limit
+async def batch_delete_contacts(
+    request: Request,
+    batch: schemas.ContactBatchSelector,
+    db: DbSession = Depends(get_session),
+    current_user: int = Depends(get_current_user),
+):
+    try:
+        ids = await async_crud.batch_delete_contacts(
+            db=db, user_id=current_user, ids=batch.ids, filter=batch.filter,
+            max_size=settings.CONTACT_BATCH_MAX_SIZE,
+        )
+    except BatchTooLarge as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return schemas.ContactBatchResult(affected=len(ids), ids=ids)
 
 @router.post("/", response_model=schemas.Contact)
-def create_contact(
+@contacts_limit
+async def create_contact(
+    request: Request,
     contact: schemas.ContactCreate,
-    db: Session = Depends(get_db),
-    current_user: str = Depends(get_current_user),
+    db: DbSession = Depends(get_session),
+    current_user: int = Depends(get_current_user),
+):
+    try:
+        return await async_crud.create_contact(db=db, contact=contact, user_id=current_user)
+    except IntegrityError as e:
+        if not is_duplicate_contact_email(e):
+            raise
+        raise HTTPException(status_code=409, detail="Contact with this email already exists")
+
+@router.post("/bulk", response_model=schemas.BulkImportReport)
+@contacts_limit
+async def bulk_import_contacts(
+    request: Request,
+    format: Optional[ImportFormat] = None,
+    db: DbSession = Depends(get_session),
+    current_user: int = Depends(get_current_user),
 ):
-    return crud.create_contact(db=db, contact=contact, user_email=current_user)
+    fmt = format or format_from_content_type(request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(status_code=415, detail="Upload CSV (text/csv) or NDJSON (application/x-ndjson)")
+
+    builder = ImportReportBuilder(max_errors=settings.BULK_IMPORT_MAX_ERRORS)
+    chunk: List[Tuple[int, schemas.ContactCreate]] = []
+
+    async def flush():
+        errors = await async_crud.bulk_create_contacts(db=db, user_id=current_user, rows=chunk)
+        builder.report.inserted += len(chunk) - len(errors)
+        for row, error in errors:
+            builder.add_error(row, error)
+        chunk.clear()
+
+    async for row, record in iter_records(request.stream(), fmt):
+        builder.report.received += 1
+        contact, error = validate_record(record)
+        if error:
+            builder.add_error(row, error)
+            continue
+        chunk.append((row, contact))
+        if len(chunk) >= settings.BULK_IMPORT_CHUNK_SIZE:
+            await flush()
+    if chunk:
+        await flush()
+    builder.report.errors.sort(key=lambda e: e.row)
+    return builder.report
+
+@router.get("/export")
+@contacts_limit
+async def export_contacts(
+    request: Request,
+    format: ExportFormat = ExportFormat.ndjson,
+    current_user: int = Depends(get_current_user),
+):
+    return StreamingResponse(
+        stream_contacts(current_user, format, batch_size=settings.EXPORT_BATCH_SIZE),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="contacts.{format.value}"'},
+    )
 
 @router.get("/", response_model=List[schemas.Contact])
-def read_contacts(
+@contacts_limit
+async def read_contacts(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 10,
-    db: Session = Depends(get_db),
-    current_user: str = Depends(get_current_user),
+    sort: Optional[ContactSort] = None,
+    cursor: Optional[str] = None,
+    db: DbSession = Depends(get_read_session),
+    current_user: int = Depends(get_current_user),
 ):
-    return crud.get_contacts(db=db, skip=skip, limit=limit, user_email=current_user)
+    etag = await collection_etag(db, current_user, skip, limit, sort, cursor)
+    if (cached := not_modified(request, etag)) is not None:
+        return cached
+    set_etag(response, etag)
+
+    fast = settings.FAST_JSON_RESPONSES
+    # Без sort/cursor лишається старий режим OFFSET/LIMIT
+    if sort is None and cursor is None:
+        contacts = await async_crud.get_contacts(db=db, skip=skip, limit=limit, user_id=current_user, as_rows=fast)
+        return contacts_response(response, contacts, fast)
+
+    sort = sort or ContactSort.id
+    try:
+        after = decode_cursor(cursor, sort) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    contacts, next_key = await async_crud.get_contacts_page(
+        db=db, user_id=current_user, sort=sort, after=after, limit=limit, as_rows=fast
+    )
+    if next_key is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(sort, *next_key)
+    return contacts_response(response, contacts, fast)
 
 @router.get("/{contact_id}", response_model=schemas.Contact)
-def read_contact(
+@contacts_limit
+async def read_contact(
     contact_id: int,
-    db: Session = Depends(get_db),
-    current_user: str = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    db: DbSession = Depends(get_read_session),
+    current_user: int = Depends(get_current_user),
 ):
-    db_contact = crud.get_contact_by_id(db=db, contact_id=contact_id, user_email=current_user)
+    db_contact = await async_crud.get_contact_by_id(db=db, contact_id=contact_id, user_id=current_user)
     if not db_contact:
         raise HTTPException(status_code=404, detail="Contact not found")
+    etag = contact_etag(db_contact)
+    if (cached := not_modified(request, etag)) is not None:
+        return cached
+    set_etag(response, etag)
     return db_contact
 
 @router.put("/{contact_id}", response_model=schemas.Contact)
-def update_contact(
+@contacts_limit
+async def update_contact(
+    request: Request,
     contact_id: int,
     contact: schemas.ContactUpdate,
-    db: Session = Depends(get_db),
-    current_user: str = Depends(get_current_user),
+    response: Response,
+    db: DbSession = Depends(get_session),
+    current_user: int = Depends(get_current_user),
 ):
-    db_contact = crud.update_contact(db=db, contact_id=contact_id, contact=contact, user_email=current_user)
+    try:
+        db_contact = await async_crud.update_contact(
+            db=db, contact_id=contact_id, contact=contact, user_id=current_user
+        )
+    except IntegrityError as e:
+        if not is_duplicate_contact_email(e):
+            raise
+        raise HTTPException(status_code=409, detail="Contact with this email already exists")
     if not db_contact:
         raise HTTPException(status_code=404, detail="Contact not found")
+    set_etag(response, contact_etag(db_contact))
     return db_contact
 
 @router.delete("/{contact_id}")
-def delete_contact(
+@contacts_limit
+async def delete_contact(
+    request: Request,
     contact_id: int,
-    db: Session = Depends(get_db),
-    current_user: str = Depends(get_current_user),
+    db: DbSession = Depends(get_session),
+    current_user: int = Depends(get_current_user),
 ):
-    success = crud.delete_contact(db=db, contact_id=contact_id, user_email=current_user)
+    success = await async_crud.delete_contact(db=db, contact_id=contact_id, user_id=current_user)
     if not success:
         raise HTTPException(status_code=404, detail="Contact not found")
     return {"message": "Contact deleted successfully"}
 
 @router.get("/search/", response_model=List[schemas.Contact])
-def search_contacts(
-    query: str,
-    db: Session = Depends(get_db),
-    current_user: str = Depends(get_current_user),
+@contacts_limit
+async def search_contacts(
+    request: Request,
+    response: Response,
+    query: str = Query(..., min_length=1),
+    mode: SearchMode = SearchMode.substring,
+    limit: int = Query(50, ge=1, le=200),
+    db: DbSession = Depends(get_read_session),
+    current_user: int = Depends(get_current_user),
 ):
-    return crud.search_contacts(db=db, query=query, user_email=current_user)
+    fast = settings.FAST_JSON_RESPONSES
+    contacts = await async_crud.search_contacts(
+        db=db, query=query, user_id=current_user, mode=mode, limit=limit, as_rows=fast
+    )
+    return contacts_response(response, contacts, fast)
 
 @router.get("/birthdays/", response_model=List[schemas.Contact])
-def get_upcoming_birthdays(
-    db: Session = Depends(get_db),
-    current_user: str = Depends(get_current_user),
+@contacts_limit
+async def get_upcoming_birthdays(
+    request: Request,
+    response: Response,
+    days: int = Query(7, ge=0, le=366),
+    db: DbSession = Depends(get_read_session),
+    current_user: int = Depends(get_current_user),
 ):
-    return crud.get_upcoming_birthdays(db=db, user_email=current_user)
\ No newline at end of file
+    # Результат залежить від поточної дати, тож вона входить в ETag
+    etag = await collection_etag(db, current_user, "birthdays", days, date.today())
+    if (cached := not_modified(request, etag)) is not None:
+        return cached
+    set_etag(response, etag)
+    fast = settings.FAST_JSON_RESPONSES
+    contacts = await async_crud.get_upcoming_birthdays(db=db, user_id=current_user, days=days, as_rows=fast)
+    return contacts_response(response, contacts, fast)
\ No newline at end of file
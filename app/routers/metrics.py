@@ -0,0 +1,88 @@
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from app import db
+from app.avatars import avatar_service
+from app.birthday_digest import birthday_digest_job
+from app.cache import user_cache
+from app.db_pool import pool_status
+from app.hashing import password_hasher
+from app.metrics import REGISTRY
+from app.outbox import outbox_worker
+from settings import settings
+
+router = APIRouter(tags=["Metrics"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# Без METRICS_TOKEN ендпоінт відкритий (зазвичай закритий на рівні мережі),
+# інакше очікується "Authorization: Bearer <token>"
+def require_metrics_token(authorization: Optional[str] = Header(None)):
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if settings.METRICS_TOKEN and not (
+        authorization and secrets.compare_digest(authorization, f"Bearer {settings.METRICS_TOKEN}")
+    ):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+def gauges(name: str, documentation: str, values: dict, label: str, metric_type: str = "gauge"):
+    return name, metric_type, documentation, [({label: key}, value) for key, value in values.items()]
+
+
+# Монотонні лічильники процесу: Prometheus рахує з них rate() і коректно обробляє скидання
+def counters(name: str, documentation: str, values: dict, label: str):
+    return gauges(name, documentation, values, label, metric_type="counter")
+
+
+# Стан сервісів читається лише під час scrape
+@REGISTRY.register_collector
+def collect_services():
+    pools = {"primary": pool_status(db.engine, db.pool_stats)}
+    if db.async_engine is not None:
+        pools["async"] = pool_status(db.async_engine, db.async_pool_stats)
+    for field in ("checked_out", "checked_in", "overflow", "wait_seconds_max"):
+        values = {name: status[field] for name, status in pools.items() if field in status}
+        if values:
+            yield gauges(f"db_pool_{field}", f"Connection pool {field.replace('_', ' ')}", values, "engine")
+    yield counters("db_pool_waits", "Checkouts that waited for a free connection",
+                   {name: status["waits"] for name, status in pools.items() if "waits" in status}, "engine")
+    yield counters("db_pool_connects", "Connections opened by the pool",
+                   {name: status["connects"] for name, status in pools.items()}, "engine")
+    if db.DATABASE_REPLICA_URLS:
+        replicas = db.active_replicas().status()
+        yield gauges("db_replica_healthy", "Read replica passes health checks",
+                     {name: int(healthy) for name, healthy in replicas.items()}, "replica")
+
+    hashing = password_hasher.metrics.snapshot()
+    yield "password_hash_pending", "gauge", "Password hashing jobs in progress", [({}, password_hasher.pending)]
+    yield counters("password_hash_jobs", "Password hashing jobs", {
+        "completed": hashing["count"], "rejected": hashing["rejected"],
+    }, "result")
+    yield "password_hash_seconds_max", "gauge", "Slowest password hashing job", [({}, hashing["max_seconds"])]
+
+    outbox = outbox_worker.metrics.snapshot()
+    yield "email_outbox_queue_depth", "gauge", "Pending emails in the outbox", [({}, outbox["queue_depth"])]
+    yield counters("email_outbox_messages", "Outbox delivery attempts", {
+        "sent": outbox["sent"], "retried": outbox["retried"], "dead": outbox["dead"],
+    }, "result")
+
+    cache = user_cache.stats()
+    yield counters("user_cache_lookups", "User cache lookups", {"hit": cache["hits"], "miss": cache["misses"]}, "result")
+
+    yield counters("avatar_uploads", "Avatar uploads", avatar_service.metrics.snapshot(), "result")
+
+    if birthday_digest_job.last_run is not None:
+        last_run = birthday_digest_job.last_run.snapshot()
+        yield gauges("birthday_digest_last_run", "Last birthday digest run", {
+            key: last_run[key] for key in ("emails", "contacts", "chunks", "conflicts", "seconds")
+        }, "field")
+
+
+@router.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_metrics_token)])
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
@@ -1,6 +1,16 @@
-from pydantic import BaseModel, EmailStr, ConfigDict
-from typing import Optional
+from pydantic import BaseModel, EmailStr, ConfigDict, Field, field_validator, model_validator
+from typing import List, Optional
 from datetime import date
+from enum import Enum
+
+from app.search import SearchMode
+
+# Та сама нормалізація, що й у EmailStr: пробіли по краях прибираються, домен — у нижньому
+# регістрі, локальна частина лишається як є. Так зберігаються email у users, тож за цим
+# значенням шукають і БД, і кеш
+def normalize_email(email: str) -> str:
+    local, at, domain = email.strip().rpartition("@")
+    return f"{local}{at}{domain.lower()}" if at else email.strip()
 
 # Schemas for User
 class UserBase(BaseModel):
@@ -15,6 +25,9 @@ class UserResponse(UserBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+class CachedUser(UserResponse):
+    avatar_url: Optional[str] = None
+
 # Schemas for Contact
 class ContactBase(BaseModel):
     first_name: str
@@ -35,7 +48,68 @@ class ContactUpdate(BaseModel):
     birthday: Optional[date] = None
     additional_info: Optional[str] = None
 
+    # Поле можна не передавати, але явний null для NOT NULL колонки — помилка 422
+    @field_validator("first_name", "last_name", "email", "phone", "birthday")
+    @classmethod
+    def not_null(cls, value):
+        if value is None:
+            raise ValueError("may not be null")
+        return value
+
 class Contact(ContactBase):
     id: int
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+# Schemas for bulk import
+class BulkImportError(BaseModel):
+    row: int
+    error: str
+
+class BulkImportReport(BaseModel):
+    received: int = 0
+    inserted: int = 0
+    failed: int = 0
+    errors: List[BulkImportError] = []
+    errors_truncated: bool = False
+
+# Schemas for batch operations
+class ContactFilter(BaseModel):
+    # Ті самі параметри, що й у GET /contacts/search/
+    query: str = Field(..., min_length=1)
+    mode: SearchMode = SearchMode.substring
+
+class ContactBatchSelector(BaseModel):
+    ids: Optional[List[int]] = None
+    filter: Optional[ContactFilter] = None
+
+    @model_validator(mode="after")
+    def _one_selector(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Provide either 'ids' or 'filter'")
+        return self
+
+class ContactBatchUpdate(ContactBatchSelector):
+    changes: ContactUpdate
+
+class ContactBatchResult(BaseModel):
+    affected: int
+    ids: List[int]
+
+# Schemas for the change feed
+class ChangeOp(str, Enum):
+    insert = "insert"
+    update = "update"
+    delete = "delete"
+
+class ContactChange(BaseModel):
+    seq: int
+    op: ChangeOp
+    contact_id: int
+    # Поточний стан контакту; None для видалених
+    contact: Optional[Contact] = None
+
+class ContactChangesPage(BaseModel):
+    changes: List[ContactChange]
+    next_since: int
+    has_more: bool
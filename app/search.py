@@ -0,0 +1,183 @@
+from enum import Enum
+from typing import List
+
+from sqlalchemy import DDL, and_, column, event, func, or_, select, table, text
+from sqlalchemy.orm import Session
+
+from app.models import Contact
+
+
+class SearchMode(str, Enum):
+    substring = "substring"
+    prefix = "prefix"
+    fuzzy = "fuzzy"
+
+
+SEARCH_FIELDS = (Contact.first_name, Contact.last_name, Contact.email, Contact.phone)
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def like_pattern(query: str, mode: SearchMode) -> str:
+    escaped = escape_like(query)
+    return f"{escaped}%" if mode is SearchMode.prefix else f"%{escaped}%"
+
+
+def like_condition(query: str, mode: SearchMode):
+    pattern = like_pattern(query, mode)
+    return or_(*(field.ilike(pattern, escape="\\") for field in SEARCH_FIELDS))
+
+
+class SearchBackend:
+    # Умова WHERE без ранжування і ліміту — для пакетних UPDATE/DELETE за фільтром
+    def condition(self, query: str, mode: SearchMode):
+        raise NotImplementedError
+
+    def search(
+        self, db: Session, user_id: int, query: str, mode: SearchMode, limit: int, entities: tuple = (Contact,)
+    ) -> List[Contact]:
+        raise NotImplementedError
+
+
+# Запасний варіант для інших СУБД: ILIKE без індексу, як було раніше
+class LikeSearch(SearchBackend):
+    def condition(self, query: str, mode: SearchMode):
+        return like_condition(query, mode)
+
+    def search(
+        self, db: Session, user_id: int, query: str, mode: SearchMode, limit: int, entities: tuple = (Contact,)
+    ) -> List[Contact]:
+        return (
+            db.query(*entities)
+            .filter(Contact.user_id == user_id, self.condition(query, mode))
+            .order_by(Contact.id)
+            .limit(limit)
+            .all()
+        )
+
+
+# Postgres: GIN-індекси pg_trgm обслуговують ILIKE '%q%', 'q%' та оператор %,
+# релевантність — найбільша similarity() серед полів. Оператор % пропускає лише поля,
+# чия similarity() (частка спільних триграм з урахуванням усього слова, без регістру)
+# не нижча за pg_trgm.similarity_threshold (типово 0.3)
+class PostgresTrigramSearch(SearchBackend):
+    def condition(self, query: str, mode: SearchMode):
+        if mode is SearchMode.fuzzy:
+            return or_(*(field.op("%")(query) for field in SEARCH_FIELDS))
+        return like_condition(query, mode)
+
+    def search(
+        self, db: Session, user_id: int, query: str, mode: SearchMode, limit: int, entities: tuple = (Contact,)
+    ) -> List[Contact]:
+        condition = self.condition(query, mode)
+        rank = func.greatest(*(func.similarity(field, query) for field in SEARCH_FIELDS))
+        return (
+            db.query(*entities)
+            .filter(Contact.user_id == user_id, condition)
+            .order_by(rank.desc(), Contact.id)
+            .limit(limit)
+            .all()
+        )
+
+
+contacts_fts = table("contacts_fts", column("rowid"))
+
+
+# SQLite: зовнішня FTS5-таблиця з trigram-токенізатором, ранжування через bm25().
+# Нечіткий пошук тут наближений: порогу схожості немає, достатньо однієї спільної
+# триграми запиту, а порядок визначає bm25() за кількістю збігів. Тож результатів
+# зазвичай більше, ніж на Postgres, а запити коротші за 3 символи йдуть через LIKE
+class SQLiteFTSSearch(SearchBackend):
+    # Trigram-токенізатор не знаходить запити коротші за 3 символи
+    MIN_QUERY_LENGTH = 3
+
+    @staticmethod
+    def _phrase(value: str) -> str:
+        return '"' + value.replace('"', '""') + '"'
+
+    def _match_expression(self, query: str, mode: SearchMode) -> str:
+        if mode is SearchMode.fuzzy:
+            trigrams = {query[i:i + 3] for i in range(len(query) - 2)}
+            return " OR ".join(self._phrase(trigram) for trigram in sorted(trigrams))
+        return self._phrase(query)
+
+    def _match(self, query: str, mode: SearchMode):
+        return text("contacts_fts MATCH :match").bindparams(match=self._match_expression(query, mode))
+
+    def condition(self, query: str, mode: SearchMode):
+        if len(query) < self.MIN_QUERY_LENGTH:
+            return like_condition(query, mode)
+        condition = Contact.id.in_(select(contacts_fts.c.rowid).where(self._match(query, mode)))
+        if mode is SearchMode.prefix:
+            condition = and_(condition, like_condition(query, mode))
+        return condition
+
+    def search(
+        self, db: Session, user_id: int, query: str, mode: SearchMode, limit: int, entities: tuple = (Contact,)
+    ) -> List[Contact]:
+        if len(query) < self.MIN_QUERY_LENGTH:
+            return LikeSearch().search(db, user_id, query, mode, limit, entities)
+
+        q = (
+            db.query(*entities)
+            .join(contacts_fts, contacts_fts.c.rowid == Contact.id)
+            .filter(
+                Contact.user_id == user_id,
+                self._match(query, mode),
+            )
+        )
+        if mode is SearchMode.prefix:
+            q = q.filter(like_condition(query, mode))
+        return q.order_by(text("bm25(contacts_fts)"), Contact.id).limit(limit).all()
+
+
+BACKENDS = {
+    "postgresql": PostgresTrigramSearch(),
+    "sqlite": SQLiteFTSSearch(),
+}
+
+
+def get_search_backend(dialect_name: str) -> SearchBackend:
+    return BACKENDS.get(dialect_name, LikeSearch())
+
+
+# DDL для FTS5: зовнішня таблиця над contacts і тригери синхронізації
+SQLITE_FTS_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5(
+        first_name, last_name, email, phone,
+        content='contacts', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS contacts_fts_ai AFTER INSERT ON contacts BEGIN
+        INSERT INTO contacts_fts(rowid, first_name, last_name, email, phone)
+        VALUES (new.id, new.first_name, new.last_name, new.email, new.phone);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS contacts_fts_ad AFTER DELETE ON contacts BEGIN
+        INSERT INTO contacts_fts(contacts_fts, rowid, first_name, last_name, email, phone)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.email, old.phone);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS contacts_fts_au AFTER UPDATE ON contacts BEGIN
+        INSERT INTO contacts_fts(contacts_fts, rowid, first_name, last_name, email, phone)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.email, old.phone);
+        INSERT INTO contacts_fts(rowid, first_name, last_name, email, phone)
+        VALUES (new.id, new.first_name, new.last_name, new.email, new.phone);
+    END
+    """,
+)
+
+for statement in SQLITE_FTS_DDL:
+    event.listen(Contact.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
+event.listen(
+    Contact.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
@@ -0,0 +1,36 @@
+from typing import Any, Dict, Iterable, List, Sequence
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app import schemas
+from app.models import Contact
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson є в requirements, але не обов'язковий
+    orjson = None
+
+# Колонки в порядку полів schemas.Contact, щоб JSON збігався з response_model
+CONTACT_COLUMNS = tuple(getattr(Contact, name) for name in schemas.Contact.model_fields)
+CONTACT_FIELDS = tuple(column.key for column in CONTACT_COLUMNS)
+
+_json_rows = TypeAdapter(List[Dict[str, Any]])
+
+
+# Кортежі з БД серіалізуються напряму в байти, без валідації кожного рядка Pydantic
+def encode_contacts(rows: Iterable[Sequence]) -> bytes:
+    items = [dict(zip(CONTACT_FIELDS, row)) for row in rows]
+    if orjson is not None:
+        return orjson.dumps(items)
+    return _json_rows.dump_json(items)
+
+
+# Вже готові байти віддаються як є, інший вміст кодується orjson
+class ORJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        if orjson is not None:
+            return orjson.dumps(content)
+        return super().render(content)
@@ -0,0 +1,49 @@
+import os
+from pathlib import Path
+from typing import Optional
+
+from settings import settings
+
+
+# Сховище готових аватарів; методи блокуючі, сервіс викликає їх поза event loop
+class AvatarStorage:
+    def find(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def save(self, key: str, data: bytes, content_type: str) -> str:
+        raise NotImplementedError
+
+
+# Локальна файлова система: для розробки і тестів
+class LocalStorage(AvatarStorage):
+    def __init__(self, root: str, base_url: str):
+        self.root = Path(root)
+        self.base_url = base_url.rstrip("/")
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    def find(self, key: str) -> Optional[str]:
+        return self.url(key) if self._path(key).exists() else None
+
+    def save(self, key: str, data: bytes, content_type: str) -> str:
+        path = self._path(key)
+        # Запис через тимчасовий файл, щоб не віддати частково записаний аватар
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        return self.url(key)
+
+
+def build_avatar_storage() -> AvatarStorage:
+    if settings.AVATAR_STORAGE == "local":
+        return LocalStorage(settings.AVATAR_LOCAL_DIR, settings.AVATAR_LOCAL_URL)
+    if settings.AVATAR_STORAGE == "cloudinary":
+        from app.cloudinary_utils import CloudinaryStorage
+
+        return CloudinaryStorage(folder="avatars")
+    raise ValueError(f"Unknown avatar storage '{settings.AVATAR_STORAGE}'")
@@ -1,16 +1,6 @@
-from datetime import datetime, timedelta
-from jose import jwt
-import os
-from dotenv import load_dotenv
+from datetime import timedelta
 
-load_dotenv()
-
-SECRET_KEY = os.getenv("SECRET_KEY")
-ALGORITHM = os.getenv("ALGORITHM")
-EMAIL_TOKEN_EXPIRE_MINUTES = int(os.getenv("EMAIL_TOKEN_EXPIRE_MINUTES", 60))
+from app.auth import EMAIL_TOKEN_EXPIRE_MINUTES, create_token
 
 def create_email_token(data: dict):
-    to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(minutes=EMAIL_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
\ No newline at end of file
+    return create_token(data, timedelta(minutes=EMAIL_TOKEN_EXPIRE_MINUTES))
@@ -0,0 +1,30 @@
+import os
+import resource
+import sys
+import tempfile
+
+
+def current_rss_mb() -> float:
+    # Поточний RSS з /proc (Linux); на інших ОС — пікове значення процесу
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS повертає байти, Linux — кілобайти
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def use_database(url: str = None) -> str:
+    # Має викликатися до імпорту app.*: app.db читає DATABASE_URL під час імпорту
+    if url is None:
+        url = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="contacts-bench-"), "bench.db")
+    os.environ["DATABASE_URL"] = url
+    return url
@@ -0,0 +1,69 @@
+"""Benchmark for rendering verification emails.
+
+    python -m benchmarks.email_template_benchmark --messages 100000
+
+Compares loading and rendering the Jinja template per message (the old
+fastapi-mail path), rendering through a cached Environment, and the
+precompiled batch renderer from app.email_templates.
+"""
+import argparse
+import json
+import secrets
+import tempfile
+import time
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from app.email_templates import TEMPLATE_FOLDER, EmailTemplates
+
+TEMPLATE = "verify_email.html"
+
+
+def per_call(tokens):
+    for token in tokens:
+        env = Environment(loader=FileSystemLoader(TEMPLATE_FOLDER), autoescape=select_autoescape(["html"]))
+        env.get_template(TEMPLATE).render(token=token)
+
+
+def cached_environment(tokens):
+    env = Environment(loader=FileSystemLoader(TEMPLATE_FOLDER), autoescape=select_autoescape(["html"]))
+    template = env.get_template(TEMPLATE)
+    for token in tokens:
+        template.render(token=token)
+
+
+def precompiled_batch(tokens):
+    templates = EmailTemplates(TEMPLATE_FOLDER, cache_dir=tempfile.mkdtemp(prefix="contacts-bench-"))
+    templates.render_batch(TEMPLATE, ({"token": token} for token in tokens))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--per-call-messages", type=int, default=2000,
+                        help="the per-call path is slow, so it is measured on a smaller sample")
+    args = parser.parse_args()
+
+    # Токени генеруються заздалегідь: вимірюється лише рендеринг
+    tokens = [secrets.token_urlsafe(96) for _ in range(args.messages)]
+    results = {}
+    for name, fn, count in (
+        ("per_call", per_call, min(args.per_call_messages, args.messages)),
+        ("cached_environment", cached_environment, args.messages),
+        ("precompiled_batch", precompiled_batch, args.messages),
+    ):
+        started = time.perf_counter()
+        fn(tokens[:count])
+        elapsed = time.perf_counter() - started
+        results[name] = {
+            "messages": count,
+            "seconds": round(elapsed, 3),
+            "messages_per_second": round(count / elapsed),
+            "us_per_message": round(elapsed / count * 1e6, 2),
+        }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Peak RSS and throughput of GET /contacts/export's streaming generator.
+
+    python -m benchmarks.export_benchmark --rows 1000000
+    python -m benchmarks.export_benchmark --database-url postgresql+psycopg2://... --rows 1000000
+
+Seeds one user with N contacts (unless --skip-seed), then drains
+app.export.stream_contacts and reports rows/s and RSS growth while streaming.
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import date, timedelta
+
+from benchmarks._common import current_rss_mb, peak_rss_mb, use_database
+
+
+def seed(rows: int, batch: int = 10000) -> int:
+    from sqlalchemy import insert
+
+    from app.db import Base, SessionLocal, engine
+    from app.models import Contact, User, birthday_ordinal
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as session:
+        user = User(email=f"export-bench-{time.time_ns()}@example.com", hashed_password="x")
+        session.add(user)
+        session.commit()
+        start = date(1970, 1, 1)
+        for offset in range(0, rows, batch):
+            values = []
+            for i in range(offset, min(offset + batch, rows)):
+                birthday = start + timedelta(days=i % 15000)
+                values.append({
+                    "first_name": f"First{i}",
+                    "last_name": f"Last{i}",
+                    "email": f"user{user.id}-contact{i}@example.com",
+                    "phone": f"+380{i:09d}",
+                    "birthday": birthday,
+                    "birthday_ordinal": birthday_ordinal(birthday),
+                    "additional_info": "benchmark",
+                    "user_id": user.id,
+                })
+            session.execute(insert(Contact), values)
+            session.commit()
+        return user.id
+
+
+async def drain(user_id: int, fmt, batch_size: int) -> dict:
+    from app.export import stream_contacts
+
+    rss_before = current_rss_mb()
+    rss_max = rss_before
+    total_bytes = 0
+    started = time.perf_counter()
+    async for chunk in stream_contacts(user_id, fmt, batch_size=batch_size):
+        total_bytes += len(chunk)
+        rss_max = max(rss_max, current_rss_mb())
+    elapsed = time.perf_counter() - started
+    return {
+        "format": fmt.value,
+        "seconds": round(elapsed, 3),
+        "bytes": total_bytes,
+        "rss_before_mb": round(rss_before, 1),
+        "rss_max_mb": round(rss_max, 1),
+        "rss_growth_mb": round(rss_max - rss_before, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--database-url")
+    parser.add_argument("--user-id", type=int, help="export an already seeded user instead of seeding")
+    args = parser.parse_args()
+
+    url = use_database(args.database_url)
+
+    started = time.perf_counter()
+    user_id = args.user_id or seed(args.rows)
+    seed_seconds = time.perf_counter() - started
+
+    from app.export import ExportFormat
+
+    results = []
+    for fmt in ExportFormat:
+        result = asyncio.run(drain(user_id, fmt, args.batch_size))
+        result["rows_per_second"] = round(args.rows / result["seconds"]) if result["seconds"] else None
+        results.append(result)
+
+    print(json.dumps({
+        "database_url": url,
+        "rows": args.rows,
+        "batch_size": args.batch_size,
+        "seed_seconds": round(seed_seconds, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "results": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Per-request CPU of contact list serialization: response_model vs the orjson fast path.
+
+    python -m benchmarks.json_benchmark --sizes 10 100 1000
+
+"response_model" loads ORM objects, validates them through
+List[schemas.Contact] with from_attributes and renders a JSONResponse, as
+FastAPI does for a route with response_model. "fast" selects column tuples
+and encodes them with app.serialization.encode_contacts.
+"""
+import argparse
+import json
+import time
+from typing import List
+
+from benchmarks._common import use_database
+
+
+def cpu_per_call(fn, iterations: int) -> float:
+    started = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - started) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+    use_database(args.database_url)
+
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from pydantic import TypeAdapter
+
+    from app import crud, schemas
+    from app.db import SessionLocal
+    from app.serialization import ORJSONResponse, encode_contacts
+    from benchmarks.export_benchmark import seed
+
+    user_id = seed(max(args.sizes))
+    adapter = TypeAdapter(List[schemas.Contact])
+    results = {}
+    with SessionLocal() as session:
+        for size in args.sizes:
+            def response_model():
+                contacts = crud.get_contacts(session, user_id, limit=size)
+                validated = adapter.validate_python(contacts, from_attributes=True)
+                body = JSONResponse(jsonable_encoder(validated)).body
+                session.expunge_all()
+                return body
+
+            def fast():
+                rows = crud.get_contacts(session, user_id, limit=size, as_rows=True)
+                return ORJSONResponse(encode_contacts(rows)).body
+
+            assert response_model() == fast()
+            iterations = max(args.iterations * 10 // size, 5)
+            slow_us = cpu_per_call(response_model, iterations)
+            fast_us = cpu_per_call(fast, iterations)
+            results[size] = {
+                "response_model_cpu_us": round(slow_us, 1),
+                "fast_cpu_us": round(fast_us, 1),
+                "speedup": round(slow_us / fast_us, 2),
+            }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
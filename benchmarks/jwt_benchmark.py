@@ -0,0 +1,55 @@
+"""Microbenchmark for access-token verification backends.
+
+    python -m benchmarks.jwt_benchmark --iterations 20000
+
+Compares python-jose against the stdlib HMAC backend, each with and
+without the verified-claims LRU used by app.auth.decode_access_token.
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from app.jwt_backend import SigningKey, TokenCache, get_jwt_backend
+
+
+def bench(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--algorithm", default="HS256")
+    args = parser.parse_args()
+
+    key = SigningKey("benchmark-secret-key", args.algorithm)
+    claims = {"sub": "user@example.com", "uid": 42, "exp": datetime.utcnow() + timedelta(hours=1)}
+
+    results = {}
+    for name in ("jose", "hmac"):
+        backend = get_jwt_backend(name)
+        token = backend.encode(claims, key)
+        cache = TokenCache(maxsize=1000)
+
+        def cached_decode():
+            payload = cache.get(token)
+            if payload is None:
+                payload = backend.decode(token, key)
+                cache.set(token, payload)
+            return payload
+
+        results[name] = {
+            "encode_us": round(bench(lambda: backend.encode(claims, key), args.iterations), 2),
+            "decode_us": round(bench(lambda: backend.decode(token, key), args.iterations), 2),
+            "cached_decode_us": round(bench(cached_decode, args.iterations), 2),
+        }
+
+    print(json.dumps({"algorithm": args.algorithm, "iterations": args.iterations, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
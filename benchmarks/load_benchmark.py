@@ -0,0 +1,280 @@
+"""Latency and throughput of the main API endpoints at fixed concurrency.
+
+    python -m benchmarks.load_benchmark --users 100 --contacts-per-user 1000 --concurrency 16
+    python -m benchmarks.load_benchmark --users 1000 --contacts-per-user 10000 --mode uvicorn --workers 4
+    python -m benchmarks.load_benchmark --database-url sqlite:////tmp/bench.db --skip-seed --output run.json
+
+Seeds the database with benchmarks.seed (unless --skip-seed), then drives
+each endpoint through an in-process httpx ASGITransport ("inproc") and/or
+real uvicorn workers ("uvicorn"), and reports p50/p95/p99 latency and req/s
+as JSON. Only 2xx responses count towards latency; anything else is
+tallied under "errors" by status code and makes the run exit non-zero.
+Compare the JSON of two commits to spot regressions.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from benchmarks._common import use_database
+from benchmarks.seed import BENCH_PASSWORD, seed
+
+SEARCH_TERMS = ("son", "an", "mar", "li", "er", "ch")
+
+
+def percentile(sorted_values, p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(math.ceil(p / 100 * len(sorted_values)) - 1, 0)]
+
+
+def summarize(latencies, errors: dict, elapsed: float) -> dict:
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": dict(sorted(errors.items())),
+        "req_per_s": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+    }
+
+
+def load_fixture(limit_users: int) -> dict:
+    from sqlalchemy import func
+
+    from app.auth import create_access_token
+    from app.db import SessionLocal
+    from app.models import Contact, User
+
+    with SessionLocal() as session:
+        rows = (
+            session.query(User.id, User.email, func.min(Contact.id), func.max(Contact.id))
+            .join(Contact, Contact.user_id == User.id)
+            .filter(User.email.like("bench%-user%@example.com"))
+            .group_by(User.id, User.email)
+            .order_by(User.id)
+            .limit(limit_users)
+            .all()
+        )
+    if not rows:
+        raise SystemExit("No benchmark users found; run without --skip-seed first")
+    return {
+        "users": [
+            {
+                "id": user_id,
+                "email": email,
+                "contact_ids": (min_id, max_id),
+                "token": create_access_token(data={"sub": email, "uid": user_id}),
+            }
+            for user_id, email, min_id, max_id in rows
+        ]
+    }
+
+
+def build_endpoints(fixture: dict, password: str) -> dict:
+    counter = iter(range(sys.maxsize))
+
+    def auth(user):
+        return {"Authorization": f"Bearer {user['token']}"}
+
+    def token(client, rng, user):
+        return client.post("/auth/token", data={"username": user["email"], "password": password})
+
+    def list_offset(client, rng, user):
+        return client.get("/contacts/", params={"limit": 20, "skip": rng.randint(0, 200)}, headers=auth(user))
+
+    def list_keyset(client, rng, user):
+        return client.get("/contacts/", params={"limit": 20, "sort": "last_name"}, headers=auth(user))
+
+    def get_contact(client, rng, user):
+        return client.get(f"/contacts/{rng.randint(*user['contact_ids'])}", headers=auth(user))
+
+    def create(client, rng, user):
+        n = next(counter)
+        return client.post("/contacts/", headers=auth(user), json={
+            "first_name": "Load", "last_name": f"Test{n}", "email": f"load-{time.time_ns()}-{n}@example.com",
+            "phone": "+380000000000", "birthday": "1990-05-17",
+        })
+
+    def search(client, rng, user):
+        return client.get("/contacts/search/", params={"query": rng.choice(SEARCH_TERMS)}, headers=auth(user))
+
+    def birthdays(client, rng, user):
+        return client.get("/contacts/birthdays/", params={"days": 7}, headers=auth(user))
+
+    return {
+        "auth_token": token,
+        "contacts_list": list_offset,
+        "contacts_list_keyset": list_keyset,
+        "contacts_get": get_contact,
+        "contacts_create": create,
+        "contacts_search": search,
+        "contacts_birthdays": birthdays,
+    }
+
+
+async def drive(client, request, users, total: int, concurrency: int, seed_value: int) -> dict:
+    latencies, errors = [], {}
+    remaining = total
+
+    # Відповіді не-2xx (429, 5xx...) не змішуються з латентністю успішних запитів
+    async def worker(worker_id: int):
+        nonlocal remaining
+        rng = random.Random(seed_value + worker_id)
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            response = await request(client, rng, rng.choice(users))
+            elapsed = time.perf_counter() - started
+            if 200 <= response.status_code < 300:
+                latencies.append(elapsed)
+            else:
+                errors[response.status_code] = errors.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def run_suite(client, endpoints: dict, fixture: dict, args) -> dict:
+    results = {}
+    for name, request in endpoints.items():
+        if args.endpoints and name not in args.endpoints:
+            continue
+        # Логін упирається в bcrypt, тож для нього окрема кількість запитів
+        total = args.token_requests if name == "auth_token" else args.requests
+        warmup = min(args.concurrency, total)
+        await drive(client, request, fixture["users"], warmup, args.concurrency, args.seed)
+        results[name] = await drive(client, request, fixture["users"], total, args.concurrency, args.seed)
+        print(f"  {name}: {results[name]}", file=sys.stderr)
+    return results
+
+
+async def run_inproc(endpoints, fixture, args) -> dict:
+    import httpx
+
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        return await run_suite(client, endpoints, fixture, args)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_uvicorn(endpoints, fixture, args) -> dict:
+    import httpx
+
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+        env=os.environ.copy(),
+    )
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            deadline = time.monotonic() + 60
+            while True:
+                try:
+                    await client.get("/docs")
+                    break
+                except httpx.TransportError:
+                    if time.monotonic() > deadline or server.poll() is not None:
+                        raise SystemExit("uvicorn did not start")
+                    await asyncio.sleep(0.2)
+            return await run_suite(client, endpoints, fixture, args)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--contacts-per-user", type=int, default=200)
+    parser.add_argument("--database-url")
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--mode", choices=("inproc", "uvicorn", "both"), default="both")
+    parser.add_argument("--workers", type=int, default=2, help="uvicorn worker processes")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500, help="requests per endpoint")
+    parser.add_argument("--token-requests", type=int, default=50)
+    parser.add_argument("--endpoints", nargs="*", help="subset of endpoints to run")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    url = use_database(args.database_url)
+    # Бенчмарк вимірює лише API: фонову розсилку і slow-log вимикаємо, а ліміти запитів
+    # піднімаємо так, щоб жоден запит не отримав 429
+    os.environ.setdefault("OUTBOX_WORKER_ENABLED", "false")
+    os.environ.setdefault("SLOW_REQUEST_SECONDS", "3600")
+    for name in ("RATE_LIMIT_ME", "RATE_LIMIT_CONTACTS", "RATE_LIMIT_CONTACTS_IP", "RATE_LIMIT_GLOBAL"):
+        os.environ.setdefault(name, "1000000/minute")
+
+    scale = None
+    if not args.skip_seed:
+        seeded = seed(args.users, args.contacts_per_user)
+        scale = {"users": seeded["users"], "contacts": seeded["contacts"], "seed_seconds": seeded["seconds"]}
+        print(f"seeded {scale}", file=sys.stderr)
+    fixture = load_fixture(limit_users=max(args.users, 1))
+    endpoints = build_endpoints(fixture, BENCH_PASSWORD)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "database": url.split("://", 1)[0],
+            "scale": scale,
+            "concurrency": args.concurrency,
+            "requests_per_endpoint": args.requests,
+            "uvicorn_workers": args.workers,
+        },
+        "results": {},
+    }
+    if args.mode in ("inproc", "both"):
+        print("inproc:", file=sys.stderr)
+        report["results"]["inproc"] = asyncio.run(run_inproc(endpoints, fixture, args))
+    if args.mode in ("uvicorn", "both"):
+        print("uvicorn:", file=sys.stderr)
+        report["results"]["uvicorn"] = asyncio.run(run_uvicorn(endpoints, fixture, args))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+    failed = {
+        f"{mode}/{name}": result["errors"]
+        for mode, results in report["results"].items()
+        for name, result in results.items()
+        if result["errors"]
+    }
+    if failed:
+        raise SystemExit(f"non-2xx responses: {failed}")
+
+
+if __name__ == "__main__":
+    main()
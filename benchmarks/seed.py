@@ -0,0 +1,103 @@
+"""Seed a database with Faker-generated users and contacts.
+
+    python -m benchmarks.seed --users 1000 --contacts-per-user 10000 --database-url sqlite:////tmp/bench.db
+
+Every user gets the same password (--password) so the load benchmark can
+log in as any of them. Rows are generated deterministically from --seed.
+"""
+import argparse
+import json
+import random
+import time
+from datetime import timedelta
+
+from benchmarks._common import use_database
+
+BENCH_PASSWORD = "benchmark-password"
+
+
+def seed(users: int, contacts_per_user: int, password: str = BENCH_PASSWORD, seed_value: int = 42,
+         batch: int = 10000) -> dict:
+    from faker import Faker
+    from sqlalchemy import insert
+
+    import app.search  # noqa: F401  реєструє DDL для FTS5 перед create_all
+    from app.db import Base, SessionLocal, engine
+    from app.hashing import _hash
+    from app.models import Contact, User, birthday_ordinal
+    from settings import settings
+
+    fake = Faker()
+    Faker.seed(seed_value)
+    rng = random.Random(seed_value)
+    Base.metadata.create_all(bind=engine)
+    # bcrypt один раз на весь набір: хеш однаковий для всіх користувачів
+    hashed_password = _hash(password.encode("utf-8"), settings.BCRYPT_ROUNDS).decode("utf-8")
+    prefix = f"bench{time.time_ns()}"
+    started = time.perf_counter()
+
+    with SessionLocal() as session:
+        session.execute(insert(User), [
+            {"email": f"{prefix}-user{u}@example.com", "hashed_password": hashed_password, "is_verified": True}
+            for u in range(users)
+        ])
+        session.commit()
+        user_ids = [
+            row.id for row in session.query(User.id).filter(User.email.like(f"{prefix}-user%")).order_by(User.id)
+        ]
+
+        # Пул імен генерується заздалегідь: Faker повільний для мільйонів рядків
+        first_names = [fake.first_name() for _ in range(2000)]
+        last_names = [fake.last_name() for _ in range(2000)]
+        notes = [fake.sentence() for _ in range(500)] + [None] * 500
+        today = fake.date_this_year()
+
+        values = []
+        for user_id in user_ids:
+            for i in range(contacts_per_user):
+                birthday = today - timedelta(days=rng.randint(18 * 365, 80 * 365))
+                values.append({
+                    "first_name": rng.choice(first_names),
+                    "last_name": rng.choice(last_names),
+                    "email": f"{prefix}-u{user_id}-c{i}@example.com",
+                    "phone": f"+380{rng.randint(0, 999999999):09d}",
+                    "birthday": birthday,
+                    "birthday_ordinal": birthday_ordinal(birthday),
+                    "additional_info": rng.choice(notes),
+                    "user_id": user_id,
+                })
+                if len(values) >= batch:
+                    session.execute(insert(Contact), values)
+                    session.commit()
+                    values.clear()
+        if values:
+            session.execute(insert(Contact), values)
+            session.commit()
+
+    return {
+        "users": len(user_ids),
+        "contacts": len(user_ids) * contacts_per_user,
+        "user_emails": [f"{prefix}-user{u}@example.com" for u in range(users)],
+        "user_ids": user_ids,
+        "password": password,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--contacts-per-user", type=int, default=100)
+    parser.add_argument("--password", default=BENCH_PASSWORD)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+    url = use_database(args.database_url)
+
+    result = seed(args.users, args.contacts_per_user, args.password, args.seed)
+    print(json.dumps({"database_url": url, "users": result["users"], "contacts": result["contacts"],
+                      "seconds": result["seconds"]}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Cold start of the application: import time and time to the first response.
+
+    python -m benchmarks.startup_benchmark --runs 10
+    python -m benchmarks.startup_benchmark --runs 5 --budget-ms 1500
+
+Every run is a fresh interpreter that imports app.main, runs the lifespan
+and serves GET / through httpx ASGITransport. The report holds the median
+and max of each phase; with --budget-ms the script exits with status 1 when
+the median time to the first response exceeds the budget, so it can guard
+startup in CI.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks._common import use_database
+
+# Виконується в окремому інтерпретаторі, щоб кеш модулів не спотворював заміри
+PROBE = """
+import asyncio, json, time
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+async def first_request():
+    import httpx
+    async with app.router.lifespan_context(app):
+        started_up = time.perf_counter()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.get("/")
+            response.raise_for_status()
+        return started_up, time.perf_counter()
+
+started_up, responded = asyncio.run(first_request())
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "lifespan_ms": (started_up - imported) * 1000,
+    "first_response_ms": (responded - started) * 1000,
+}))
+"""
+
+
+def run_once(env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float)
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+    use_database(args.database_url)
+
+    env = dict(os.environ, OUTBOX_WORKER_ENABLED="false")
+    runs = [run_once(env) for _ in range(args.runs)]
+    report = {
+        phase: {
+            "median": round(statistics.median(run[phase] for run in runs), 1),
+            "max": round(max(run[phase] for run in runs), 1),
+        }
+        for phase in ("import_ms", "lifespan_ms", "first_response_ms")
+    }
+    report["runs"] = args.runs
+    if args.budget_ms is not None:
+        report["budget_ms"] = args.budget_ms
+        report["within_budget"] = report["first_response_ms"]["median"] <= args.budget_ms
+    print(json.dumps(report, indent=2))
+    if not report.get("within_budget", True):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Per-user query latency as the contacts table grows.
+
+    python -m benchmarks.tenant_benchmark --steps 10000 100000 1000000
+    python -m benchmarks.tenant_benchmark --steps 10000 100000 --without-user-indexes
+    python -m benchmarks.tenant_benchmark --database-url postgresql://.../bench --output tenant.json
+
+Every user owns --contacts-per-user rows; the table grows by adding users
+until it reaches each step. After every step the per-user queries from
+app.crud are timed for a random sample of users and p50/p95 are reported.
+With the (user_id, ...) indexes the latency should stay flat as the table
+grows. --without-user-indexes drops them to show the single-heap baseline.
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timezone
+
+from benchmarks._common import use_database
+from benchmarks.load_benchmark import percentile
+
+USER_INDEXES = (
+    "uq_contacts_user_id_email",
+    "ix_contacts_user_id_id",
+    "ix_contacts_user_id_last_name_id",
+    "ix_contacts_user_id_birthday_id",
+    "ix_contacts_user_id_birthday_ordinal",
+    "ix_contacts_user_id_updated_at",
+)
+
+
+def build_queries(contact_ids: dict) -> dict:
+    from app import crud
+    from app.pagination import ContactSort
+    from app.search import SearchMode
+
+    return {
+        "list_offset": lambda db, rng, user_id: crud.get_contacts(db, user_id, skip=rng.randint(0, 100), limit=20),
+        "list_keyset": lambda db, rng, user_id: crud.get_contacts_page(
+            db, user_id, sort=ContactSort.last_name, after=None, limit=20
+        ),
+        "get_by_id": lambda db, rng, user_id: crud.get_contact_by_id(
+            db, rng.randint(*contact_ids[user_id]), user_id
+        ),
+        "collection_version": lambda db, rng, user_id: crud.get_contacts_version(db, user_id),
+        "birthdays": lambda db, rng, user_id: crud.get_upcoming_birthdays(db, user_id, days=7),
+        "search": lambda db, rng, user_id: crud.search_contacts(
+            db, "son", user_id, mode=SearchMode.substring, limit=20
+        ),
+    }
+
+
+def measure(samples: int, rng: random.Random) -> dict:
+    from sqlalchemy import func
+
+    from app.db import SessionLocal
+    from app.models import Contact
+
+    with SessionLocal() as session:
+        contact_ids = {
+            user_id: (low, high)
+            for user_id, low, high in session.query(
+                Contact.user_id, func.min(Contact.id), func.max(Contact.id)
+            ).group_by(Contact.user_id)
+        }
+        users = list(contact_ids)
+        results = {}
+        for name, query in build_queries(contact_ids).items():
+            latencies = []
+            for _ in range(samples):
+                user_id = rng.choice(users)
+                started = time.perf_counter()
+                query(session, rng, user_id)
+                latencies.append(time.perf_counter() - started)
+                session.expunge_all()
+            latencies.sort()
+            results[name] = {
+                "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+                "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+            }
+    return results
+
+
+def drop_user_indexes() -> None:
+    from sqlalchemy import text
+
+    from app.db import engine
+
+    with engine.begin() as conn:
+        for name in USER_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, nargs="+", default=[10000, 100000, 500000])
+    parser.add_argument("--contacts-per-user", type=int, default=200)
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--without-user-indexes", action="store_true")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+    url = use_database(args.database_url)
+
+    from benchmarks.seed import seed
+
+    rng = random.Random(args.seed)
+    total = 0
+    steps = []
+    for target in sorted(args.steps):
+        users = max((target - total) // args.contacts_per_user, 0)
+        if users:
+            seeded = seed(users, args.contacts_per_user, seed_value=args.seed + len(steps))
+            total += seeded["contacts"]
+            if args.without_user_indexes:
+                drop_user_indexes()
+        steps.append({"contacts": total, "queries": measure(args.samples, rng)})
+        print(json.dumps(steps[-1]), flush=True)
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "database_url": url.split("@")[-1],
+        "contacts_per_user": args.contacts_per_user,
+        "user_indexes": not args.without_user_indexes,
+        "steps": steps,
+    }
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+from datetime import date
+from itertools import count
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.models import Contact, User
+
+
+# Порожня SQLite-БД у пам'яті на кожен тест; модулі самі додають потрібні рядки
+@pytest.fixture()
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine, expire_on_commit=False)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture()
+def make_user(session):
+    def make(email: str = "owner@example.com") -> User:
+        user = User(email=email, hashed_password="x")
+        session.add(user)
+        session.flush()
+        return user
+
+    return make
+
+
+# Поля, не передані явно, заповнюються типовими значеннями з унікальним email
+@pytest.fixture()
+def make_contact(session):
+    numbers = count()
+
+    def make(user_id: int, **fields) -> Contact:
+        n = next(numbers)
+        values = {
+            "first_name": f"C{n}",
+            "last_name": "Doe",
+            "email": f"c{n}@example.com",
+            "phone": "1",
+            "birthday": date(1990, 1, 1),
+            **fields,
+        }
+        contact = Contact(user_id=user_id, **values)
+        session.add(contact)
+        session.flush()
+        return contact
+
+    return make
@@ -0,0 +1,29 @@
+"""contacts keyset pagination indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-01-27 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_contacts_user_id_id", "contacts", ["user_id", "id"])
+    op.create_index("ix_contacts_user_id_last_name_id", "contacts", ["user_id", "last_name", "id"])
+    op.create_index("ix_contacts_user_id_birthday_id", "contacts", ["user_id", "birthday", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_contacts_user_id_birthday_id", table_name="contacts")
+    op.drop_index("ix_contacts_user_id_last_name_id", table_name="contacts")
+    op.drop_index("ix_contacts_user_id_id", table_name="contacts")
@@ -0,0 +1,70 @@
+"""contacts birthday ordinal with batched backfill
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-02-10 10:00:00.000000
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+contacts = sa.table(
+    "contacts",
+    sa.column("id", sa.Integer),
+    sa.column("birthday", sa.Date),
+    sa.column("birthday_ordinal", sa.SmallInteger),
+)
+
+
+def birthday_ordinal(value: date) -> int:
+    return date(2000, value.month, value.day).timetuple().tm_yday
+
+
+def upgrade() -> None:
+    op.add_column("contacts", sa.Column("birthday_ordinal", sa.SmallInteger(), nullable=True))
+
+    # Заповнюємо пакетами, кожен пакет комітиться окремо, щоб не тримати довгих блокувань
+    bind = op.get_bind()
+    update_stmt = (
+        sa.update(contacts)
+        .where(contacts.c.id == sa.bindparam("_id"))
+        .values(birthday_ordinal=sa.bindparam("_ordinal"))
+    )
+    with op.get_context().autocommit_block():
+        last_id = 0
+        while True:
+            rows = bind.execute(
+                sa.select(contacts.c.id, contacts.c.birthday)
+                .where(contacts.c.id > last_id)
+                .order_by(contacts.c.id)
+                .limit(BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            bind.execute(
+                update_stmt,
+                [{"_id": row.id, "_ordinal": birthday_ordinal(row.birthday)} for row in rows],
+            )
+            last_id = rows[-1].id
+
+    # SQLite змінює NOT NULL лише перебудовою таблиці, яка знищила б тригери FTS
+    if bind.dialect.name != "sqlite":
+        op.alter_column("contacts", "birthday_ordinal", existing_type=sa.SmallInteger(), nullable=False)
+    op.create_index("ix_contacts_user_id_birthday_ordinal", "contacts", ["user_id", "birthday_ordinal"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_contacts_user_id_birthday_ordinal", table_name="contacts")
+    op.drop_column("contacts", "birthday_ordinal")
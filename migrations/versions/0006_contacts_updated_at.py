@@ -0,0 +1,66 @@
+"""contacts updated_at for ETags and collection versions
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-02-24 10:00:00.000000
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+contacts = sa.table(
+    "contacts",
+    sa.column("id", sa.Integer),
+    sa.column("updated_at", sa.DateTime),
+)
+
+
+def upgrade() -> None:
+    op.add_column("contacts", sa.Column("updated_at", sa.DateTime(), nullable=True))
+
+    # Заповнюємо пакетами за діапазонами id, кожен пакет комітиться окремо
+    bind = op.get_bind()
+    now = datetime.utcnow()
+    with op.get_context().autocommit_block():
+        last_id = 0
+        while True:
+            upper = bind.execute(
+                sa.select(sa.func.max(contacts.c.id)).where(
+                    contacts.c.id.in_(
+                        sa.select(contacts.c.id)
+                        .where(contacts.c.id > last_id)
+                        .order_by(contacts.c.id)
+                        .limit(BATCH_SIZE)
+                    )
+                )
+            ).scalar()
+            if upper is None:
+                break
+            bind.execute(
+                sa.update(contacts)
+                .where(contacts.c.id > last_id, contacts.c.id <= upper)
+                .values(updated_at=now)
+            )
+            last_id = upper
+
+    # SQLite змінює NOT NULL лише перебудовою таблиці, яка знищила б тригери FTS
+    if bind.dialect.name != "sqlite":
+        op.alter_column("contacts", "updated_at", existing_type=sa.DateTime(), nullable=False)
+    op.create_index("ix_contacts_user_id_updated_at", "contacts", ["user_id", "updated_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_contacts_user_id_updated_at", table_name="contacts")
+    op.drop_column("contacts", "updated_at")
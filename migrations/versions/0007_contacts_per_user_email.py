@@ -0,0 +1,40 @@
+"""contacts: email unique per user instead of globally
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2025-03-03 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Глобально унікальні email лишаються унікальними і в межах користувача,
+    # тож новий індекс будується без очищення дублікатів.
+    # CONCURRENTLY (Postgres) не блокує записи і не працює всередині транзакції.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "uq_contacts_user_id_email",
+            "contacts",
+            ["user_id", "email"],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+    op.drop_index("ix_contacts_email", table_name="contacts")
+    # id вже проіндексований первинним ключем
+    op.drop_index("ix_contacts_id", table_name="contacts")
+
+
+def downgrade() -> None:
+    op.create_index("ix_contacts_id", "contacts", ["id"])
+    op.create_index("ix_contacts_email", "contacts", ["email"], unique=True)
+    op.drop_index("uq_contacts_user_id_email", table_name="contacts")
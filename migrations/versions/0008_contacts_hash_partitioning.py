@@ -0,0 +1,150 @@
+"""contacts: optional hash partitioning by user_id (Postgres)
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2025-03-10 10:00:00.000000
+
+Opt-in: alembic -x contacts_partitions=16 upgrade head
+Without the option (or on SQLite) the revision is a no-op. To partition an
+already upgraded database: alembic downgrade 0007, then upgrade with -x.
+
+The data is moved online: a trigger mirrors writes from the old table while
+rows are copied in id batches (each batch commits separately), then the
+tables are swapped in one short transaction.
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+NEW_TABLE = "contacts_swap"
+
+# Індекси contacts станом на 0007: (ім'я, визначення)
+INDEXES = (
+    ("uq_contacts_user_id_email", "UNIQUE INDEX {name} ON {table} (user_id, email)"),
+    ("ix_contacts_user_id_id", "INDEX {name} ON {table} (user_id, id)"),
+    ("ix_contacts_user_id_last_name_id", "INDEX {name} ON {table} (user_id, last_name, id)"),
+    ("ix_contacts_user_id_birthday_id", "INDEX {name} ON {table} (user_id, birthday, id)"),
+    ("ix_contacts_user_id_birthday_ordinal", "INDEX {name} ON {table} (user_id, birthday_ordinal)"),
+    ("ix_contacts_user_id_updated_at", "INDEX {name} ON {table} (user_id, updated_at)"),
+    *(
+        (f"ix_contacts_{field}_trgm", f"INDEX {{name}} ON {{table}} USING gin ({field} gin_trgm_ops)")
+        for field in ("first_name", "last_name", "email", "phone")
+    ),
+)
+
+
+def requested_partitions() -> int:
+    return int(context.get_x_argument(as_dictionary=True).get("contacts_partitions", 0))
+
+
+def is_partitioned(bind) -> bool:
+    return bind.execute(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'contacts'::regclass)"
+    )).scalar()
+
+
+def create_table(partitions: int) -> None:
+    # Ключ секціонування має входити в первинний ключ: (id, user_id)
+    partition_clause = " PARTITION BY HASH (user_id)" if partitions else ""
+    op.execute(
+        f"CREATE TABLE {NEW_TABLE} (LIKE contacts INCLUDING DEFAULTS INCLUDING CONSTRAINTS, "
+        f"PRIMARY KEY ({'id, user_id' if partitions else 'id'}), "
+        f"FOREIGN KEY (user_id) REFERENCES users (id)){partition_clause}"
+    )
+    for remainder in range(partitions):
+        op.execute(
+            f"CREATE TABLE contacts_p{remainder} PARTITION OF {NEW_TABLE} "
+            f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        )
+    # Таблиця порожня, тож індекси будуються миттєво; імена тимчасові до обміну
+    for name, definition in INDEXES:
+        op.execute("CREATE " + definition.format(name=f"{name}_swap", table=NEW_TABLE))
+
+
+def mirror_writes() -> None:
+    op.execute(f"""
+        CREATE FUNCTION contacts_swap_mirror() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                DELETE FROM {NEW_TABLE} WHERE id = OLD.id AND user_id = OLD.user_id;
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                INSERT INTO {NEW_TABLE} SELECT (NEW).* ON CONFLICT DO NOTHING;
+            END IF;
+            RETURN NULL;
+        END $$
+    """)
+    op.execute(
+        "CREATE TRIGGER contacts_swap_mirror AFTER INSERT OR UPDATE OR DELETE ON contacts "
+        "FOR EACH ROW EXECUTE FUNCTION contacts_swap_mirror()"
+    )
+
+
+# FOR SHARE: рядок, який зараз копіюється, не можна змінити до коміту пакета,
+# тож тригер завжди бачить уже скопійовану версію і замінює її
+def copy_in_batches(bind) -> None:
+    last_id = 0
+    while True:
+        upper = bind.execute(sa.text(
+            "SELECT max(id) FROM (SELECT id FROM contacts WHERE id > :last_id ORDER BY id LIMIT :batch) AS b"
+        ), {"last_id": last_id, "batch": BATCH_SIZE}).scalar()
+        if upper is None:
+            break
+        bind.execute(sa.text(
+            f"INSERT INTO {NEW_TABLE} SELECT * FROM contacts WHERE id > :last_id AND id <= :upper "
+            "FOR SHARE ON CONFLICT DO NOTHING"
+        ), {"last_id": last_id, "upper": upper})
+        last_id = upper
+
+
+def swap() -> None:
+    op.execute("LOCK TABLE contacts IN ACCESS EXCLUSIVE MODE")
+    op.execute("DROP TRIGGER contacts_swap_mirror ON contacts")
+    op.execute("DROP FUNCTION contacts_swap_mirror()")
+    op.execute(f"ALTER SEQUENCE contacts_id_seq OWNED BY {NEW_TABLE}.id")
+    op.execute("DROP TABLE contacts")
+    op.execute(f"ALTER TABLE {NEW_TABLE} RENAME TO contacts")
+    op.execute(f"ALTER TABLE contacts RENAME CONSTRAINT {NEW_TABLE}_pkey TO contacts_pkey")
+    for name, _ in INDEXES:
+        op.execute(f"ALTER INDEX {name}_swap RENAME TO {name}")
+
+
+def rebuild(partitions: int) -> None:
+    bind = op.get_bind()
+    if bind.execute(sa.text("SELECT EXISTS (SELECT 1 FROM contacts WHERE user_id IS NULL)")).scalar():
+        raise RuntimeError("contacts without user_id cannot be partitioned; delete or reassign them first")
+    # Кожна інструкція комітиться одразу: тригер стає видимим до копіювання,
+    # а пакети не тримають блокування довше, ніж треба
+    with op.get_context().autocommit_block():
+        # Залишки перерваного запуску: копіювання починається спочатку
+        op.execute("DROP TRIGGER IF EXISTS contacts_swap_mirror ON contacts")
+        op.execute("DROP FUNCTION IF EXISTS contacts_swap_mirror()")
+        op.execute(f"DROP TABLE IF EXISTS {NEW_TABLE}")
+        create_table(partitions)
+        mirror_writes()
+        copy_in_batches(bind)
+    # Обмін — одна коротка транзакція під ACCESS EXCLUSIVE
+    swap()
+
+
+def upgrade() -> None:
+    partitions = requested_partitions()
+    bind = op.get_bind()
+    if not partitions or bind.dialect.name != "postgresql" or is_partitioned(bind):
+        return
+    rebuild(partitions)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql" and is_partitioned(bind):
+        rebuild(0)
@@ -0,0 +1,39 @@
+"""birthday digest log
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2025-03-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "birthday_digests",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("digest_date", sa.Date(), nullable=False),
+        sa.Column("contacts", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "uq_birthday_digests_date_user_id", "birthday_digests", ["digest_date", "user_id"], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_birthday_digests_date_user_id", table_name="birthday_digests")
+    op.drop_table("birthday_digests")
@@ -0,0 +1,40 @@
+"""contact change log
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2025-03-24 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Лічильник змін користувача; server_default заповнює наявні рядки
+    op.add_column("users", sa.Column("change_seq", sa.Integer(), nullable=False, server_default="0"))
+    op.create_table(
+        "contact_changes",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("seq", sa.Integer(), nullable=False),
+        sa.Column("contact_id", sa.Integer(), nullable=False),
+        sa.Column("op", sa.String(length=8), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("user_id", "seq"),
+    )
+    op.create_index("ix_contact_changes_created_at", "contact_changes", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_contact_changes_created_at", table_name="contact_changes")
+    op.drop_table("contact_changes")
+    op.drop_column("users", "change_seq")
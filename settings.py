@@ -1,11 +1,35 @@
 from pydantic_settings import BaseSettings
 from pydantic import EmailStr
+from typing import Optional
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    DB_ASYNC: bool = False
+    ASYNC_DATABASE_URL: Optional[str] = None
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_PGBOUNCER: bool = False
+    DB_CREATE_ALL: bool = False
+    DATABASE_REPLICA_URLS: str = ""
+    DB_REPLICA_CHECK_INTERVAL: float = 5.0
+    ADMIN_TOKEN: Optional[str] = None
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: Optional[str] = None
+    SLOW_REQUEST_SECONDS: float = 1.0
+    SLOW_REQUEST_MAX_STATEMENTS: int = 200
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    EMAIL_TOKEN_EXPIRE_MINUTES: int = 60
+    JWT_BACKEND: str = "jose"
+    JWT_CACHE_SIZE: int = 10000
+    BCRYPT_ROUNDS: int = 12
+    HASH_EXECUTOR: str = "process"
+    HASH_WORKERS: int = 2
+    HASH_MAX_PENDING: int = 64
     MAIL_USERNAME: str
     MAIL_PASSWORD: str
     MAIL_FROM: EmailStr 
@@ -17,9 +41,52 @@ class Settings(BaseSettings):
     USE_CREDENTIALS: bool = True
     VALIDATE_CERTS: bool = True
     RATE_LIMIT_GLOBAL: str = "10/minute"
+    RATE_LIMIT_ME: str = "5/minute"
+    RATE_LIMIT_CONTACTS: str = "120/minute"
+    # Окремий ліміт на IP-адресу для всього API контактів, незалежно від користувача
+    RATE_LIMIT_CONTACTS_IP: str = "600/minute"
+    RATE_LIMIT_STORAGE_URI: str = "memory://"
+    RATE_LIMIT_STRATEGY: str = "moving-window"
     CLOUDINARY_CLOUD_NAME: str
     CLOUDINARY_API_KEY: str
     CLOUDINARY_API_SECRET: str
+    AVATAR_STORAGE: str = "cloudinary"
+    AVATAR_LOCAL_DIR: str = "media/avatars"
+    AVATAR_LOCAL_URL: str = "/media/avatars"
+    AVATAR_MAX_BYTES: int = 5 * 1024 * 1024
+    AVATAR_MAX_SIDE: int = 512
+    AVATAR_QUALITY: int = 85
+    AVATAR_MAX_CONCURRENT_UPLOADS: int = 4
+    AVATAR_MAX_PENDING_UPLOADS: int = 32
+    AVATAR_WORKERS: int = 2
+    REDIS_URL: Optional[str] = None
+    USER_CACHE_BACKEND: str = "local"
+    USER_CACHE_TTL: int = 300
+    USER_CACHE_MAXSIZE: int = 10000
+    BULK_IMPORT_CHUNK_SIZE: int = 500
+    BULK_IMPORT_MAX_ERRORS: int = 1000
+    EXPORT_BATCH_SIZE: int = 1000
+    FAST_JSON_RESPONSES: bool = True
+    CONTACT_BATCH_MAX_SIZE: int = 1000
+    EMAIL_TEMPLATE_CACHE_DIR: Optional[str] = None
+    OUTBOX_WORKER_ENABLED: bool = True
+    OUTBOX_BATCH_SIZE: int = 50
+    OUTBOX_CONCURRENCY: int = 2
+    OUTBOX_SMTP_POOL_SIZE: int = 2
+    OUTBOX_MAX_ATTEMPTS: int = 5
+    OUTBOX_BACKOFF_BASE: float = 30
+    OUTBOX_BACKOFF_MAX: float = 3600
+    OUTBOX_LEASE_SECONDS: int = 300
+    OUTBOX_POLL_INTERVAL: float = 5
+    BIRTHDAY_DIGEST_ENABLED: bool = False
+    BIRTHDAY_DIGEST_HOUR: int = 7
+    BIRTHDAY_DIGEST_DAYS: int = 7
+    BIRTHDAY_DIGEST_CHUNK_SIZE: int = 500
+    BIRTHDAY_DIGEST_CONCURRENCY: int = 4
+    CONTACT_CHANGES_PAGE_SIZE: int = 500
+    CONTACT_CHANGES_POLL_SECONDS: float = 15
+    CONTACT_CHANGES_RETENTION_DAYS: int = 30
+    CONTACT_CHANGES_COMPACT_INTERVAL: float = 0
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -0,0 +1,128 @@
+import asyncio
+import io
+
+import pytest
+from fastapi import UploadFile
+
+from app.avatars import AvatarService, AvatarTooLarge, AvatarUploadsOverloaded, InvalidImage
+from app.storage import LocalStorage
+
+Image = pytest.importorskip("PIL.Image")
+
+
+class CountingStorage(LocalStorage):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.saves = 0
+
+    def save(self, key, data, content_type):
+        self.saves += 1
+        return super().save(key, data, content_type)
+
+
+def png(width, height, color="red"):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def upload_file(data):
+    return UploadFile(io.BytesIO(data), filename="avatar.png")
+
+
+@pytest.fixture()
+def storage(tmp_path):
+    return CountingStorage(str(tmp_path), "/media/avatars")
+
+
+def test_avatar_is_downsized_reencoded_and_deduplicated(storage, tmp_path):
+    service = AvatarService(storage, max_side=64)
+
+    async def run():
+        first = await service.upload(upload_file(png(300, 150)))
+        # Новий сервіс без пам'яті про ключі: дубль знаходиться через сховище
+        second = await AvatarService(storage, max_side=64).upload(upload_file(png(300, 150)))
+        third = await service.upload(upload_file(png(300, 150)))
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+    assert first == second == third
+    assert storage.saves == 1
+    assert service.metrics.snapshot()["deduplicated"] == 1
+    with Image.open(tmp_path / first.rsplit("/", 1)[1]) as image:
+        assert (image.format, image.size) == ("WEBP", (64, 32))
+
+
+def test_invalid_and_oversized_uploads_are_rejected(storage):
+    service = AvatarService(storage, max_bytes=1000)
+    with pytest.raises(InvalidImage):
+        asyncio.run(service.upload(upload_file(b"not an image")))
+    with pytest.raises(AvatarTooLarge):
+        asyncio.run(service.upload(upload_file(b"x" * 2000)))
+    assert storage.saves == 0
+
+
+def test_uploads_over_the_pending_cap_are_rejected(storage):
+    service = AvatarService(storage, max_pending=0)
+    with pytest.raises(AvatarUploadsOverloaded):
+        asyncio.run(service.upload(upload_file(png(10, 10))))
+
+
+# Ключ рахується з вихідних байтів: інший результат перекодування (інша версія Pillow
+# на іншому воркері) не створює нового файлу
+def test_key_does_not_depend_on_reencoded_output(storage, monkeypatch):
+    outputs = iter([b"first-encoding", b"second-encoding"])
+    monkeypatch.setattr("app.avatars.process_image", lambda *args: next(outputs))
+    first = asyncio.run(AvatarService(storage).upload(upload_file(png(10, 10))))
+    second = asyncio.run(AvatarService(storage).upload(upload_file(png(10, 10))))
+    assert first == second
+    assert storage.saves == 1
+
+
+# Модульний сервіс використовується з кількох event loop (перезапуск застосунку, тести)
+def test_semaphore_follows_the_running_loop(storage):
+    service = AvatarService(storage, max_concurrent=1)
+
+    async def run(color):
+        return await asyncio.gather(*(service.upload(upload_file(png(10, 10, color))) for _ in range(2)))
+
+    assert len(set(asyncio.run(run("red")))) == 1
+    assert len(set(asyncio.run(run("blue")))) == 1
+
+
+@pytest.fixture()
+def cloudinary_storage(monkeypatch):
+    cloudinary_utils = pytest.importorskip("app.cloudinary_utils")
+    uploads = []
+
+    def upload(file, **options):
+        uploads.append(options)
+        return {"secure_url": f"https://cdn.example.com/{options['public_id']}.webp"}
+
+    monkeypatch.setattr(cloudinary_utils.cloudinary.uploader, "upload", upload)
+    return cloudinary_utils.CloudinaryStorage(folder="avatars"), uploads
+
+
+def test_cloudinary_finds_avatars_uploaded_by_other_workers(cloudinary_storage, monkeypatch):
+    storage, uploads = cloudinary_storage
+    monkeypatch.setattr(
+        "cloudinary.api.resource", lambda public_id: {"secure_url": f"https://cdn.example.com/{public_id}.webp"}
+    )
+    url = asyncio.run(AvatarService(storage, max_side=64).upload(upload_file(png(100, 100))))
+    assert url.startswith("https://cdn.example.com/avatars/")
+    assert uploads == []
+
+
+@pytest.mark.parametrize("error", ["NotFound", "RateLimited"])
+def test_cloudinary_lookup_failure_is_a_miss(cloudinary_storage, monkeypatch, error):
+    from cloudinary import exceptions
+
+    storage, uploads = cloudinary_storage
+
+    def resource(public_id):
+        raise getattr(exceptions, error)("lookup failed")
+
+    monkeypatch.setattr("cloudinary.api.resource", resource)
+    url = asyncio.run(AvatarService(storage, max_side=64).upload(upload_file(png(100, 100))))
+    assert url.startswith("https://cdn.example.com/avatars/")
+    assert len(uploads) == 1 and uploads[0]["overwrite"] is False
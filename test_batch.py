@@ -0,0 +1,53 @@
+from datetime import date
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app import crud
+from app.models import Contact
+from app.schemas import ContactFilter, ContactUpdate
+
+
+@pytest.fixture()
+def db(session, make_user, make_contact):
+    owner = make_user()
+    other = make_user("other@example.com")
+    for i, name in enumerate(["Stale", "Stale", "Fresh", "Stale"]):
+        make_contact(other.id if i == 3 else owner.id, first_name=name, last_name=f"Doe{i}")
+    session.commit()
+    return session, owner.id
+
+
+def test_batch_delete_by_filter_is_scoped_to_user(db):
+    session, user_id = db
+    deleted = crud.batch_delete_contacts(session, user_id, filter=ContactFilter(query="stale"))
+    assert deleted == [1, 2]
+    assert [c.first_name for c in session.query(Contact).order_by(Contact.id)] == ["Fresh", "Stale"]
+
+
+def test_batch_update_by_ids_skips_foreign_contacts(db):
+    session, user_id = db
+    updated = crud.batch_update_contacts(
+        session, user_id, ContactUpdate(birthday=date(2001, 3, 1)), ids=[1, 3, 4, 3]
+    )
+    assert updated == [1, 3]
+    contact = session.get(Contact, 1)
+    session.refresh(contact)
+    assert (contact.birthday, contact.birthday_ordinal) == (date(2001, 3, 1), 61)
+
+
+def test_batch_size_limit_rejects_before_changing_anything(db):
+    session, user_id = db
+    with pytest.raises(crud.BatchTooLarge):
+        crud.batch_delete_contacts(session, user_id, ids=[1, 2, 3], max_size=2)
+    with pytest.raises(crud.BatchTooLarge):
+        crud.batch_delete_contacts(session, user_id, filter=ContactFilter(query="Doe"), max_size=2)
+    assert session.query(Contact).count() == 4
+
+
+def test_failed_batch_update_is_rolled_back(db):
+    session, user_id = db
+    with pytest.raises(IntegrityError) as error:
+        crud.batch_update_contacts(session, user_id, ContactUpdate(email="same@example.com"), ids=[1, 2])
+    assert crud.is_duplicate_contact_email(error.value)
+    assert session.query(Contact).filter(Contact.email == "same@example.com").count() == 0
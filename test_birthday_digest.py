@@ -0,0 +1,77 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import birthday_digest
+from app.birthday_digest import BirthdayDigestJob
+from app.db import Base
+from app.models import BirthdayDigest, Contact, EmailOutbox, User
+
+DIGEST_DATE = date(2025, 12, 30)
+
+
+@pytest.fixture()
+def session_factory(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/digest.db", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def session_scope():
+        with factory() as session:
+            yield session
+
+    monkeypatch.setattr(birthday_digest, "session_scope", session_scope)
+
+    with factory() as session:
+        # Вікно 30.12 + 7 днів переходить через кінець року
+        birthdays = {
+            "ann@example.com": (True, [date(1990, 1, 2), date(1985, 12, 31)]),
+            "bob@example.com": (True, [date(1970, 6, 1)]),
+            "eve@example.com": (False, [date(1990, 12, 30)]),
+            "joe@example.com": (True, [date(2000, 12, 30)]),
+            "kim@example.com": (True, [date(1999, 1, 5)]),
+        }
+        for email, (verified, dates) in birthdays.items():
+            user = User(email=email, hashed_password="x", is_verified=verified)
+            session.add(user)
+            session.flush()
+            for i, birthday in enumerate(dates):
+                session.add(Contact(first_name=f"Friend{i}", last_name=email.split("@")[0], email=f"{i}@{email}",
+                                    phone="1", birthday=birthday, user_id=user.id))
+        session.commit()
+    return factory
+
+
+def queued(factory):
+    with factory() as session:
+        return sorted(message.recipient for message in session.query(EmailOutbox))
+
+
+def test_digests_are_grouped_per_verified_user(session_factory):
+    job = BirthdayDigestJob(days=7, chunk_size=2, concurrency=2)
+    stats = asyncio.run(job.run(DIGEST_DATE))
+
+    assert queued(session_factory) == ["ann@example.com", "joe@example.com", "kim@example.com"]
+    assert (stats.emails, stats.contacts, stats.chunks) == (3, 4, 2)
+    with session_factory() as session:
+        body = session.query(EmailOutbox).filter_by(recipient="ann@example.com").one().html_body
+    # Найближчий день народження йде першим
+    assert body.index("31 December") < body.index("02 January")
+
+
+def test_interrupted_run_resumes_without_resending(session_factory):
+    job = BirthdayDigestJob(days=7, chunk_size=1, concurrency=1)
+    # "Падіння" після першого пакета: записано лише дайджест першого користувача
+    assert asyncio.run(job.process_chunk(DIGEST_DATE, (0, 1))) == (1, 2)
+
+    stats = asyncio.run(job.run(DIGEST_DATE))
+    assert stats.emails == 2
+    assert asyncio.run(job.run(DIGEST_DATE)).emails == 0
+    assert queued(session_factory) == ["ann@example.com", "joe@example.com", "kim@example.com"]
+    with session_factory() as session:
+        assert session.query(BirthdayDigest).count() == 3
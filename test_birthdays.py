@@ -0,0 +1,44 @@
+from datetime import date
+
+import pytest
+
+from app import crud
+from app.models import birthday_ordinal
+
+
+class FixedDate(date):
+    today_value = date(2026, 12, 29)
+
+    @classmethod
+    def today(cls):
+        return cls.today_value
+
+
+@pytest.fixture()
+def db(session, make_user, make_contact):
+    user = make_user()
+    for birthday in [date(1990, 12, 30), date(1985, 1, 3), date(1992, 1, 10), date(2000, 2, 29)]:
+        make_contact(user.id, birthday=birthday)
+    session.commit()
+    return session, user.id
+
+
+def test_birthday_ordinal_is_year_independent():
+    assert birthday_ordinal(date(1999, 3, 1)) == birthday_ordinal(date(2000, 3, 1)) == 61
+    assert birthday_ordinal(date(2000, 2, 29)) == 60
+    assert birthday_ordinal(date(1999, 12, 31)) == 366
+
+
+def test_upcoming_birthdays_wrap_around_year_end(db, monkeypatch):
+    session, user_id = db
+    monkeypatch.setattr(crud, "date", FixedDate)
+    results = crud.get_upcoming_birthdays(session, user_id)
+    assert [c.birthday for c in results] == [date(1990, 12, 30), date(1985, 1, 3)]
+
+
+def test_upcoming_birthdays_window_includes_leap_day(db, monkeypatch):
+    session, user_id = db
+    monkeypatch.setattr(FixedDate, "today_value", date(2027, 2, 27))
+    monkeypatch.setattr(crud, "date", FixedDate)
+    results = crud.get_upcoming_birthdays(session, user_id, days=3)
+    assert [c.birthday for c in results] == [date(2000, 2, 29)]
@@ -0,0 +1,42 @@
+import asyncio
+
+from app.bulk_import import ImportFormat, format_from_content_type, iter_records
+
+
+async def chunked(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def collect(data: bytes, fmt: ImportFormat, size: int = 5):
+    async def run():
+        return [item async for item in iter_records(chunked(data, size), fmt)]
+    return asyncio.run(run())
+
+
+def test_csv_records_survive_chunk_boundaries_and_quoted_newlines():
+    data = 'first_name,last_name\r\nJohn,"Doe\nJr"\r\nJane,Doe\r\n'.encode("utf-8")
+    assert collect(data, ImportFormat.csv) == [
+        (1, {"first_name": "John", "last_name": "Doe\nJr"}),
+        (2, {"first_name": "Jane", "last_name": "Doe"}),
+    ]
+
+
+def test_csv_reports_column_mismatch():
+    records = collect(b"a,b\n1\n", ImportFormat.csv)
+    assert records == [(1, "Expected 2 columns, got 1")]
+
+
+def test_ndjson_reports_bad_lines():
+    data = '{"a": 1}\n\nnot json\n["x"]\n{"ü": "ß"}'.encode("utf-8")
+    records = collect(data, ImportFormat.ndjson, size=3)
+    assert records[0] == (1, {"a": 1})
+    assert records[1][0] == 2 and records[1][1].startswith("Invalid JSON")
+    assert records[2] == (3, "Expected a JSON object")
+    assert records[3] == (4, {"ü": "ß"})
+
+
+def test_format_from_content_type():
+    assert format_from_content_type("text/csv; charset=utf-8") is ImportFormat.csv
+    assert format_from_content_type("application/x-ndjson") is ImportFormat.ndjson
+    assert format_from_content_type("application/json") is None
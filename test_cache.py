@@ -0,0 +1,84 @@
+import asyncio
+
+from app import crud
+from app.cache import LocalTTLCache, RedisCache, UserCache
+from app.schemas import CachedUser
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+# Локальна заміна redis.asyncio для тестів
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_local_cache_expires_entries():
+    clock = FakeClock()
+    cache = LocalTTLCache(maxsize=10, clock=clock)
+    run(cache.set("a", {"v": 1}, ttl=5))
+    assert run(cache.get("a")) == {"v": 1}
+    clock.now = 5
+    assert run(cache.get("a")) is None
+
+
+def test_local_cache_evicts_least_recently_used():
+    cache = LocalTTLCache(maxsize=2)
+    run(cache.set("a", {"v": 1}, ttl=60))
+    run(cache.set("b", {"v": 2}, ttl=60))
+    run(cache.get("a"))
+    run(cache.set("c", {"v": 3}, ttl=60))
+    assert run(cache.get("b")) is None
+    assert run(cache.get("a")) == {"v": 1}
+    assert len(cache) == 2
+
+
+def test_user_cache_counts_hits_and_invalidates():
+    cache = UserCache(RedisCache(FakeRedis()), ttl=60)
+    user = CachedUser(id=1, email="user@example.com", is_verified=False)
+    assert run(cache.get_by_id(1)) is None
+    run(cache.set(user))
+    assert run(cache.get_by_email(" user@EXAMPLE.com")) == user
+    assert run(cache.get_by_id(1)) == user
+    run(cache.invalidate(user_id=1, email="user@example.com"))
+    assert run(cache.get_by_id(1)) is None
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 2
+
+
+def test_invalidate_by_id_drops_email_entry():
+    cache = UserCache(LocalTTLCache(), ttl=60)
+    run(cache.set(CachedUser(id=1, email="User@example.com", is_verified=False)))
+    run(cache.invalidate(user_id=1))
+    assert run(cache.get_by_email("User@example.com")) is None
+
+
+# Кеш і БД знаходять ті самі варіанти email і не знаходять інших
+def test_cache_and_db_agree_on_email_variants(session, make_user):
+    make_user("User@example.com")
+    cache = UserCache(LocalTTLCache(), ttl=60)
+    run(cache.set(CachedUser(id=1, email="User@example.com", is_verified=False)))
+    for email in ("User@example.com", " User@EXAMPLE.COM ", "user@example.com"):
+        found = crud.get_user_by_email(session, email) is not None
+        assert (run(cache.get_by_email(email)) is not None) == found
+    assert crud.get_user_by_email(session, "User@Example.com") is not None
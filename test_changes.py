@@ -0,0 +1,89 @@
+import asyncio
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+from app import crud
+from app.changes import change_notifier
+from app.crud import ChangeCursorExpired
+from app.db import Base
+from app.models import ContactChange, User
+from app.schemas import ContactCreate, ContactUpdate
+
+
+def contact(n: int) -> ContactCreate:
+    return ContactCreate(first_name=f"F{n}", last_name="L", email=f"c{n}@example.com", phone="1",
+                         birthday=date(1990, 1, 1))
+
+
+@pytest.fixture()
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/changes.db", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as session:
+        for email in ("ann@example.com", "bob@example.com"):
+            session.add(User(email=email, hashed_password="x"))
+        session.commit()
+        yield session
+
+
+def ops(changes):
+    return [(change["seq"], change["op"], change["contact_id"]) for change in changes]
+
+
+def test_every_write_path_is_logged_in_order(db):
+    first = crud.create_contact(db, contact(1), user_id=1)
+    assert crud.bulk_create_contacts(db, 1, [(1, contact(2)), (2, contact(3))]) == []
+    crud.create_contact(db, contact(4), user_id=2)
+    crud.update_contact(db, first.id, ContactUpdate(phone="2"), user_id=1)
+    crud.batch_update_contacts(db, 1, ContactUpdate(last_name="M"), ids=[2, 3])
+    crud.batch_delete_contacts(db, 1, ids=[3])
+
+    with pytest.raises(ChangeCursorExpired):
+        crud.get_contact_changes(db, 1, since=100)
+    assert crud.get_contact_changes(db, 1, since=None) == ([], 7, False)
+    # Кілька змін контакту згортаються в останню; лічильник в іншого користувача свій
+    changes, next_since, has_more = crud.get_contact_changes(db, 1, since=0)
+    assert ops(changes) == [(4, "update", 1), (5, "update", 2), (7, "delete", 3)]
+    assert (next_since, has_more) == (7, False)
+    assert changes[0]["contact"].phone == "2" and changes[2]["contact"] is None
+    assert ops(crud.get_contact_changes(db, 2, since=0)[0]) == [(1, "insert", 4)]
+
+
+def test_pages_and_later_deletes(db):
+    for n in range(3):
+        crud.create_contact(db, contact(n), user_id=1)
+    crud.delete_contact(db, 2, user_id=1)
+
+    changes, next_since, has_more = crud.get_contact_changes(db, 1, since=0, limit=2)
+    # Контакт 2 видалено після цієї сторінки: клієнт отримує одразу видалення
+    assert ops(changes) == [(1, "insert", 1), (2, "delete", 2)]
+    assert (next_since, has_more) == (2, True)
+    changes, next_since, has_more = crud.get_contact_changes(db, 1, since=2, limit=2)
+    assert ops(changes) == [(3, "insert", 3), (4, "delete", 2)]
+    assert (next_since, has_more) == (4, False)
+
+
+def test_compaction_expires_old_cursors(db):
+    for n in range(3):
+        crud.create_contact(db, contact(n), user_id=1)
+    db.execute(update(ContactChange).where(ContactChange.seq <= 2).values(created_at=datetime(2020, 1, 1)))
+    db.commit()
+
+    assert crud.compact_contact_changes(db, datetime.utcnow() - timedelta(days=30)) == 2
+    with pytest.raises(ChangeCursorExpired):
+        crud.get_contact_changes(db, 1, since=1)
+    assert ops(crud.get_contact_changes(db, 1, since=2)[0]) == [(3, "insert", 3)]
+    assert crud.get_contact_changes(db, 1, since=3) == ([], 3, False)
+
+
+def test_commit_wakes_subscribers(db):
+    async def scenario():
+        with change_notifier.subscribe(1) as ann, change_notifier.subscribe(2) as bob:
+            await asyncio.to_thread(crud.create_contact, db, contact(1), 1)
+            await asyncio.sleep(0)
+            return ann.is_set(), bob.is_set()
+
+    assert asyncio.run(scenario()) == (True, False)
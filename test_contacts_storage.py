@@ -0,0 +1,50 @@
+from datetime import date
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+
+from app import crud
+from app.schemas import ContactCreate, ContactUpdate
+
+
+def contact(email: str) -> ContactCreate:
+    return ContactCreate(first_name="Ann", last_name="Lee", email=email, phone="1", birthday=date(1990, 1, 1))
+
+
+@pytest.fixture()
+def db(session, make_user):
+    users = [make_user(f"user{i}@example.com") for i in range(2)]
+    session.commit()
+    return session, [user.id for user in users]
+
+
+def test_email_is_unique_per_user(db):
+    session, (first, second) = db
+    crud.create_contact(session, contact("ann@example.com"), first)
+    crud.create_contact(session, contact("ann@example.com"), second)
+    with pytest.raises(IntegrityError) as error:
+        crud.create_contact(session, contact("ann@example.com"), first)
+    assert crud.is_duplicate_contact_email(error.value)
+
+
+def test_null_for_required_field_is_rejected_by_schema(db):
+    session, (first, _) = db
+    with pytest.raises(ValidationError):
+        ContactUpdate(phone=None)
+    # Необов'язкове поле можна очистити, а непередані поля не чіпаються
+    assert ContactUpdate(additional_info=None).model_dump(exclude_unset=True) == {"additional_info": None}
+
+    # Інші порушення цілісності не видаються за конфлікт email
+    created = crud.create_contact(session, contact("ann@example.com"), first)
+    with pytest.raises(IntegrityError) as error:
+        crud.update_contact(session, created.id, ContactUpdate.model_construct(phone=None), first)
+    assert not crud.is_duplicate_contact_email(error.value)
+
+
+def test_bulk_import_conflicts_only_within_user(db):
+    session, (first, second) = db
+    crud.create_contact(session, contact("ann@example.com"), first)
+    rows = [(1, contact("ann@example.com")), (2, contact("bob@example.com"))]
+    assert crud.bulk_create_contacts(session, second, rows) == []
+    assert crud.bulk_create_contacts(session, first, rows) == [(1, "Contact with this email already exists")]
@@ -0,0 +1,34 @@
+from app.email_templates import TEMPLATE_FOLDER, EmailTemplates
+
+
+def make_templates(tmp_path, **files):
+    for name, source in files.items():
+        (tmp_path / name).write_text(source)
+    return EmailTemplates(tmp_path, cache_dir=str(tmp_path))
+
+
+def test_precompiled_render_matches_jinja(tmp_path):
+    templates = make_templates(tmp_path, **{"mail.html": "<a href='{{ host }}/v?t={{ token }}'>{{ token }}</a>"})
+    compiled = templates.compile("mail.html")
+    assert compiled.precompiled
+    values = {"host": "https://x", "token": "a<b>&\"c"}
+    assert templates.render("mail.html", **values) == compiled.template.render(values)
+
+
+def test_templates_with_logic_fall_back_to_jinja(tmp_path):
+    templates = make_templates(tmp_path, **{"mail.html": "{% if token %}{{ token|upper }}{% endif %}"})
+    assert not templates.compile("mail.html").precompiled
+    assert templates.render("mail.html", token="abc") == "ABC"
+    assert templates.render("mail.html") == ""
+
+
+def test_render_batch(tmp_path):
+    templates = make_templates(tmp_path, **{"mail.txt": "token={{ token }}"})
+    assert templates.render_batch("mail.txt", [{"token": "<1>"}, {"token": "2"}]) == ["token=<1>", "token=2"]
+
+
+def test_verification_template_is_precompiled(tmp_path):
+    templates = EmailTemplates(TEMPLATE_FOLDER, cache_dir=str(tmp_path))
+    templates.warm()
+    assert templates.compile("verify_email.html").precompiled
+    assert "/verify-email?token=abc" in templates.render("verify_email.html", token="abc")
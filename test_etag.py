@@ -0,0 +1,68 @@
+from datetime import date, datetime
+
+import pytest
+
+from app import crud
+from app.etag import etag_matches, make_etag
+from app.models import Contact
+from app.schemas import ContactCreate, ContactUpdate
+
+
+@pytest.fixture()
+def db(session, make_user):
+    user = make_user()
+    session.commit()
+    return session, user.id
+
+
+def contact(i):
+    return ContactCreate(first_name=f"C{i}", last_name="Doe", email=f"c{i}@example.com",
+                         phone="1", birthday=date(1990, 1, i + 1))
+
+
+def test_etag_matching():
+    etag = make_etag("contact", 1, "2025-01-01")
+    assert etag == make_etag("contact", 1, "2025-01-01")
+    assert etag != make_etag("contact", 2, "2025-01-01")
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
+
+
+def test_collection_version_changes_on_every_write(db, make_user):
+    session, user_id = db
+    other = make_user("other@example.com").id
+    versions = [crud.get_contacts_version(session, user_id)]
+    assert versions[0] == 0
+
+    first = crud.create_contact(session, contact(0), user_id)
+    versions.append(crud.get_contacts_version(session, user_id))
+    crud.bulk_create_contacts(session, user_id, [(1, contact(1)), (2, contact(2))])
+    versions.append(crud.get_contacts_version(session, user_id))
+    crud.update_contact(session, first.id, ContactUpdate(phone="2"), user_id)
+    versions.append(crud.get_contacts_version(session, user_id))
+    crud.batch_update_contacts(session, user_id, ContactUpdate(last_name="Roe"), ids=[2, 3])
+    versions.append(crud.get_contacts_version(session, user_id))
+    crud.delete_contact(session, first.id, user_id)
+    versions.append(crud.get_contacts_version(session, user_id))
+
+    assert len(set(versions)) == len(versions)
+    assert crud.get_contacts_version(session, user_id) == versions[-1]
+    assert crud.get_contacts_version(session, other) == 0
+
+
+# Заміна контакту з тим самим updated_at і тією ж кількістю все одно дає нову версію
+def test_collection_version_ignores_timestamps_and_counts(db):
+    session, user_id = db
+    first = crud.create_contact(session, contact(0), user_id)
+    crud.create_contact(session, contact(1), user_id)
+    session.query(Contact).update({Contact.updated_at: datetime(2025, 1, 1)})
+    session.commit()
+    before = crud.get_contacts_version(session, user_id)
+
+    crud.delete_contact(session, first.id, user_id)
+    replacement = crud.create_contact(session, contact(2), user_id)
+    session.query(Contact).filter(Contact.id == replacement.id).update({Contact.updated_at: datetime(2025, 1, 1)})
+    session.commit()
+    assert crud.get_contacts_version(session, user_id) != before
@@ -0,0 +1,137 @@
+import asyncio
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import db as database
+from app.db import Base
+from app.export import EXPORT_FIELDS, ExportFormat, encode_csv, encode_ndjson, stream_contacts
+from app.models import Contact, User
+
+ROW = (1, "Ann", 'O"Neil, Jr.', "ann@example.com", "1\n2", date(1990, 1, 2), None)
+
+
+def test_encode_ndjson_keeps_nulls_and_unicode():
+    line = encode_ndjson([ROW[:1] + ("Ганна",) + ROW[2:]]).decode("utf-8")
+    assert line.endswith("\n") and "Ганна" in line
+    assert json.loads(line) == {
+        "id": 1, "first_name": "Ганна", "last_name": 'O"Neil, Jr.', "email": "ann@example.com",
+        "phone": "1\n2", "birthday": "1990-01-02", "additional_info": None,
+    }
+    assert encode_ndjson([]) == b""
+
+
+def test_encode_csv_quotes_fields_and_writes_none_as_empty():
+    body = encode_csv([ROW], header=True).decode("utf-8")
+    assert '"O""Neil, Jr."' in body
+    header, row = csv.reader(io.StringIO(body))
+    assert tuple(header) == EXPORT_FIELDS
+    assert row == ["1", "Ann", 'O"Neil, Jr.', "ann@example.com", "1\n2", "1990-01-02", ""]
+
+
+def seed(session) -> int:
+    owner = User(email="owner@example.com", hashed_password="x")
+    other = User(email="other@example.com", hashed_password="x")
+    session.add_all([owner, other])
+    session.flush()
+    for n in range(5):
+        session.add(Contact(user_id=owner.id, first_name=f"C{n}", last_name="Doe", email=f"c{n}@example.com",
+                            phone="1", birthday=date(1990, 1, 1)))
+    session.add(Contact(user_id=other.id, first_name="X", last_name="Doe", email="x@example.com",
+                        phone="1", birthday=date(1990, 1, 1)))
+    session.commit()
+    return owner.id
+
+
+async def collect(user_id: int, fmt: ExportFormat) -> list:
+    return [chunk async for chunk in stream_contacts(user_id, fmt, batch_size=2)]
+
+
+# stream_contacts відкриває власну сесію, тож фабрики підміняються в app.db для обох режимів
+@pytest.fixture(params=[False, True], ids=["sync", "async"])
+def export_db(request, tmp_path, monkeypatch):
+    path = tmp_path / "export.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as session:
+        user_id = seed(session)
+    monkeypatch.setattr(database, "DB_ASYNC", request.param)
+    if request.param:
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        monkeypatch.setitem(database._clients, "AsyncSessionLocal", async_sessionmaker(async_engine, class_=AsyncSession))
+    else:
+        monkeypatch.setitem(database._clients, "SessionLocal", sessionmaker(bind=engine))
+    yield user_id
+    if request.param:
+        asyncio.run(async_engine.dispose())
+    engine.dispose()
+
+
+def test_stream_yields_one_chunk_per_batch(export_db):
+    chunks = asyncio.run(collect(export_db, ExportFormat.ndjson))
+    assert [chunk.count(b"\n") for chunk in chunks] == [2, 2, 1]
+    rows = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+    assert [row["email"] for row in rows] == [f"c{n}@example.com" for n in range(5)]
+
+
+def test_csv_stream_starts_with_header(export_db):
+    chunks = asyncio.run(collect(export_db, ExportFormat.csv))
+    assert chunks[0] == encode_csv((), header=True)
+    assert len(chunks) == 4
+    assert len(list(csv.reader(io.StringIO(b"".join(chunks).decode("utf-8"))))) == 6
+
+
+EXPORT_API_PROBE = """
+import json
+from fastapi.testclient import TestClient
+from app.main import app
+
+def login(client, email):
+    assert client.post("/auth/register", json={"email": email, "password": "secret123"}).status_code == 201
+    token = client.post("/auth/token", data={"username": email, "password": "secret123"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+def contact(n):
+    return {"first_name": f"C{n}", "last_name": "Doe", "email": f"c{n}@example.com", "phone": "1", "birthday": "1990-01-01"}
+
+with TestClient(app) as client:
+    ann, bob = login(client, "ann@example.com"), login(client, "bob@example.com")
+    for n in range(3):
+        assert client.post("/contacts/", headers=ann, json=contact(n)).status_code == 200
+    assert client.post("/contacts/", headers=bob, json=contact(9)).status_code == 200
+
+    response = client.get("/contacts/export", headers=ann)
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-disposition"] == 'attachment; filename="contacts.ndjson"'
+    emails = [json.loads(line)["email"] for line in response.text.splitlines()]
+    assert emails == ["c0@example.com", "c1@example.com", "c2@example.com"], emails
+
+    response = client.get("/contacts/export", headers=bob, params={"format": "csv"})
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    assert response.headers["content-disposition"] == 'attachment; filename="contacts.csv"'
+    assert response.text.splitlines()[1:] == ["4,C9,Doe,c9@example.com,1,1990-01-01,"], response.text
+    assert client.get("/contacts/export").status_code == 401
+"""
+
+
+@pytest.mark.parametrize("db_async", ["false", "true"])
+def test_export_route_returns_only_own_contacts(tmp_path, db_async):
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{tmp_path}/api.db",
+        DB_ASYNC=db_async,
+        DB_CREATE_ALL="true",
+        OUTBOX_WORKER_ENABLED="false",
+        EXPORT_BATCH_SIZE="2",
+    )
+    result = subprocess.run([sys.executable, "-c", EXPORT_API_PROBE], env=env, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
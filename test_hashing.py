@@ -0,0 +1,32 @@
+import asyncio
+
+import pytest
+
+from app.hashing import HashingOverloaded, PasswordHasher
+
+
+def make_hasher(**kwargs):
+    return PasswordHasher(workers=1, rounds=4, executor="thread", **kwargs)
+
+
+def test_hash_and_verify():
+    hasher = make_hasher()
+    hashed = asyncio.run(hasher.hash("secret"))
+    assert hashed.startswith("$2b$04$")
+    assert asyncio.run(hasher.verify("secret", hashed))
+    assert not asyncio.run(hasher.verify("wrong", hashed))
+    assert hasher.metrics.snapshot()["count"] == 3
+    hasher.shutdown()
+
+
+def test_verify_rejects_malformed_hash():
+    hasher = make_hasher()
+    assert not asyncio.run(hasher.verify("secret", "not-a-bcrypt-hash"))
+    hasher.shutdown()
+
+
+def test_queue_limit_sheds_load():
+    hasher = make_hasher(max_pending=0)
+    with pytest.raises(HashingOverloaded):
+        asyncio.run(hasher.hash("secret"))
+    assert hasher.metrics.rejected == 1
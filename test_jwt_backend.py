@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+
+import pytest
+from jose import JWTError
+
+from app.jwt_backend import HMACBackend, JoseBackend, SigningKey, TokenCache
+
+KEY = SigningKey("test-secret", "HS256")
+
+
+def claims(minutes=5):
+    return {"sub": "user@example.com", "uid": 1, "exp": datetime.utcnow() + timedelta(minutes=minutes)}
+
+
+@pytest.mark.parametrize("encoder", [JoseBackend(), HMACBackend()])
+@pytest.mark.parametrize("decoder", [JoseBackend(), HMACBackend()])
+def test_backends_are_interchangeable(encoder, decoder):
+    token = encoder.encode(claims(), KEY)
+    payload = decoder.decode(token, KEY)
+    assert payload["sub"] == "user@example.com"
+    assert payload["uid"] == 1
+
+
+def test_hmac_backend_rejects_tampered_and_expired_tokens():
+    backend = HMACBackend()
+    token = backend.encode(claims(), KEY)
+    with pytest.raises(JWTError):
+        backend.decode(token[:-2] + "xx", KEY)
+    with pytest.raises(JWTError):
+        backend.decode(token, SigningKey("other-secret", "HS256"))
+    with pytest.raises(JWTError):
+        backend.decode(backend.encode(claims(minutes=-1), KEY), KEY)
+    with pytest.raises(JWTError):
+        backend.decode("garbage", KEY)
+
+
+# Підписаний, але з некоректним exp/nbf токен має давати JWTError (401), а не 500
+@pytest.mark.parametrize("value", ["soon", None, [1]])
+@pytest.mark.parametrize("claim", ["exp", "nbf"])
+def test_hmac_backend_rejects_malformed_time_claims(claim, value):
+    token = JoseBackend().encode({"sub": "a", claim: value}, KEY)
+    with pytest.raises(JWTError):
+        HMACBackend().decode(token, KEY)
+
+
+def test_token_cache_evicts_at_expiry():
+    now = [1000.0]
+    cache = TokenCache(maxsize=10, clock=lambda: now[0])
+    cache.set("token", {"sub": "a", "exp": 1010})
+    cache.set("no-exp", {"sub": "b"})
+    assert cache.get("token") == {"sub": "a", "exp": 1010}
+    assert cache.get("no-exp") is None
+    now[0] = 1010.0
+    assert cache.get("token") is None
+    assert len(cache) == 0
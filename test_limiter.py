@@ -0,0 +1,88 @@
+import json
+import os
+import subprocess
+import sys
+
+from starlette.requests import Request
+
+from app.auth import create_access_token
+from app.limiter import ip_key, user_key, user_or_ip_key
+
+
+def make_request(authorization: str = None) -> Request:
+    headers = [(b"authorization", authorization.encode())] if authorization else []
+    return Request({"type": "http", "headers": headers, "client": ("10.0.0.1", 1234)})
+
+
+def test_anonymous_requests_are_keyed_by_ip():
+    assert ip_key(make_request()) == "ip:10.0.0.1"
+    assert user_or_ip_key(make_request()) == "ip:10.0.0.1"
+
+
+def test_authenticated_requests_are_keyed_by_user_id():
+    token = create_access_token({"sub": "user@example.com", "uid": 7})
+    assert user_or_ip_key(make_request(f"Bearer {token}")) == "user:7"
+
+
+def test_invalid_token_falls_back_to_ip():
+    assert user_or_ip_key(make_request("Bearer not-a-token")) == "ip:10.0.0.1"
+
+
+# Ліміт контактів бере лише id, перевірений get_current_user, а не вміст заголовка
+def test_contacts_key_uses_verified_user_only():
+    token = create_access_token({"sub": "user@example.com", "uid": 7})
+    assert user_key(make_request(f"Bearer {token}")) == "ip:10.0.0.1"
+    request = make_request("Bearer not-a-token")
+    request.state.user_id = 7
+    assert user_key(request) == "user:7"
+
+
+# Ліміт контактів спільний для всіх маршрутів і рахується окремо для кожного користувача
+# (старий токен без uid — той самий користувач); поверх нього діє ліміт на IP
+PROBE = """
+import json
+from fastapi.testclient import TestClient
+from app.auth import create_access_token
+from app.limiter import limiter
+from app.main import app
+
+def headers(claims):
+    return {"Authorization": "Bearer " + create_access_token(claims)}
+
+ann = headers({"sub": "ann@example.com", "uid": 1})
+with TestClient(app) as client:
+    assert client.post("/auth/register", json={"email": "ann@example.com", "password": "secret123"}).status_code == 201
+    statuses = [client.get("/contacts/", headers=ann).status_code for _ in range(3)]
+    statuses.append(client.get("/contacts/birthdays/", headers=ann).status_code)
+    statuses.append(client.get("/contacts/", headers=headers({"sub": "ann@example.com"})).status_code)
+    statuses += [client.get("/contacts/", headers=headers({"sub": "bob@example.com", "uid": 2})).status_code for _ in range(3)]
+    statuses.append(client.get("/contacts/", headers={"Authorization": "Bearer garbage"}).status_code)
+print(json.dumps({"statuses": statuses, "storage_dead": limiter._storage_dead}))
+"""
+
+EXPECTED = [200, 200, 200, 429, 429, 200, 200, 429, 401]
+
+
+def run_probe(tmp_path, storage_uri):
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{tmp_path}/limiter.db",
+        DB_CREATE_ALL="true",
+        OUTBOX_WORKER_ENABLED="false",
+        RATE_LIMIT_CONTACTS="3/minute",
+        RATE_LIMIT_CONTACTS_IP="5/minute",
+        RATE_LIMIT_STORAGE_URI=storage_uri,
+    )
+    result = subprocess.run([sys.executable, "-c", PROBE], env=env, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_contacts_limits_are_per_user_and_per_ip(tmp_path):
+    assert run_probe(tmp_path, "memory://") == {"statuses": EXPECTED, "storage_dead": False}
+
+
+def test_unreachable_storage_falls_back_to_process_memory(tmp_path):
+    # Закритий порт: лімітер переходить на пам'ять процесу і продовжує рахувати ліміти
+    result = run_probe(tmp_path, "redis://127.0.0.1:1/0")
+    assert result == {"statuses": EXPECTED, "storage_dead": True}
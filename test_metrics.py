@@ -0,0 +1,78 @@
+import asyncio
+
+from sqlalchemy import create_engine, text
+
+from app.instrumentation import (
+    DB_QUERIES, HTTP_REQUESTS, MetricsMiddleware, RequestStats, current_request, format_statements, instrument_engine,
+)
+from app.metrics import Registry
+from app.routers.metrics import collect_services
+
+
+def test_registry_renders_prometheus_text():
+    registry = Registry()
+    requests = registry.counter("requests", "Requests", ("route",))
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    requests.inc(route='/a"b')
+    requests.inc(2, route='/a"b')
+    latency.observe(0.05)
+    latency.observe(0.5)
+    registry.register_collector(lambda: [
+        ("depth", "gauge", "Queue depth", [({}, 7)]),
+        ("sent", "counter", "Sent emails", [({"result": "ok"}, 4)]),
+    ])
+
+    lines = registry.render().splitlines()
+    assert "# TYPE requests counter" in lines
+    assert 'requests_total{route="/a\\"b"} 3' in lines
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 2' in lines
+    assert "latency_seconds_count 2" in lines
+    assert "depth 7" in lines
+    assert "# TYPE sent counter" in lines
+    assert 'sent_total{result="ok"} 4' in lines
+
+
+# Монотонні величини експортуються як counter із суфіксом _total
+def test_monotonic_metrics_are_counters():
+    assert HTTP_REQUESTS.type == DB_QUERIES.type == "counter"
+    types = {name: metric_type for name, metric_type, _, _ in collect_services()}
+    for name in ("db_pool_waits", "db_pool_connects", "email_outbox_messages", "password_hash_jobs",
+                 "user_cache_lookups", "avatar_uploads"):
+        assert types[name] == "counter", name
+    assert types["email_outbox_queue_depth"] == types["db_pool_checked_out"] == "gauge"
+
+
+def test_queries_are_attributed_to_the_current_request():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine, "test")
+    stats = RequestStats(max_statements=10)
+    token = current_request.set(stats)
+    try:
+        with engine.connect() as conn:
+            for _ in range(3):
+                conn.execute(text("SELECT 1"))
+    finally:
+        current_request.reset(token)
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 2"))
+
+    assert stats.queries == 3
+    assert format_statements(stats).startswith("  3x ")
+
+
+def test_middleware_logs_slow_requests(caplog):
+    async def app(scope, receive, send):
+        current_request.get().record("SELECT * FROM users WHERE email = ?", 0.01)
+        await send({"type": "http.response.start", "status": 204, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    middleware = MetricsMiddleware(app, slow_request_seconds=0)
+    scope = {"type": "http", "method": "GET", "path": "/slow"}
+    with caplog.at_level("WARNING", logger="app.slow_requests"):
+        asyncio.run(middleware(scope, None, send))
+    assert "GET /slow -> 204" in caplog.text
+    assert "1x" in caplog.text and "FROM users" in caplog.text
@@ -0,0 +1,120 @@
+import asyncio
+import socket
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi_mail import ConnectionConfig
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import outbox
+from app.db import Base
+from app.models import EmailOutbox
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return "250 OK"
+
+
+@pytest.fixture()
+def session_factory(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def session_scope():
+        with factory() as session:
+            yield session
+
+    monkeypatch.setattr(outbox, "session_scope", session_scope)
+    return factory
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture()
+def smtp():
+    # Пропускається лише тест із реальним SMTP-сервером
+    aiosmtpd = pytest.importorskip("aiosmtpd.controller")
+    handler = RecordingHandler()
+    port = free_port()
+    controller = aiosmtpd.Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    yield handler, port
+    controller.stop()
+
+
+def make_worker(port, **kwargs):
+    conf = ConnectionConfig(
+        MAIL_USERNAME="", MAIL_PASSWORD="", MAIL_FROM="app@example.com", MAIL_PORT=port,
+        MAIL_SERVER="127.0.0.1", MAIL_STARTTLS=False, MAIL_SSL_TLS=False,
+        USE_CREDENTIALS=False, VALIDATE_CERTS=False,
+    )
+    return outbox.OutboxWorker(outbox.SMTPConnectionPool(conf, size=2, timeout=5), "app@example.com", **kwargs)
+
+
+def enqueue(factory, count):
+    with factory() as session:
+        session.add_all(
+            EmailOutbox(recipient=f"user{i}@example.com", subject="Hi", html_body="<p>hi</p>") for i in range(count)
+        )
+        session.commit()
+
+
+def statuses(factory):
+    with factory() as session:
+        return {m.recipient: (m.status, m.attempts) for m in session.query(EmailOutbox)}
+
+
+def test_worker_sends_batch_over_pooled_connections(session_factory, smtp):
+    handler, port = smtp
+    enqueue(session_factory, 5)
+    worker = make_worker(port, batch_size=10)
+
+    async def run():
+        processed = await worker.run_once()
+        await worker.pool.close()
+        return processed
+
+    assert asyncio.run(run()) == 5
+    assert sorted(envelope.rcpt_tos[0] for envelope in handler.messages) == [f"user{i}@example.com" for i in range(5)]
+    assert set(statuses(session_factory).values()) == {("sent", 1)}
+    assert worker.metrics.sent == 5
+
+
+def test_failed_send_is_retried_then_dead_lettered(session_factory):
+    enqueue(session_factory, 1)
+    # Порт без SMTP-сервера: кожна спроба завершується помилкою з'єднання
+    worker = make_worker(free_port(), max_attempts=2, backoff_base=60)
+
+    asyncio.run(worker.run_once())
+    with session_factory() as session:
+        message = session.query(EmailOutbox).one()
+        assert (message.status, message.attempts) == ("pending", 1)
+        assert message.next_attempt_at > datetime.utcnow() + timedelta(seconds=50)
+        # Не чекаємо backoff у тесті
+        message.next_attempt_at = datetime.utcnow()
+        session.commit()
+
+    asyncio.run(worker.run_once())
+    assert statuses(session_factory) == {"user0@example.com": ("dead", 2)}
+    assert (worker.metrics.retried, worker.metrics.dead) == (1, 1)
+
+
+def test_backoff_grows_exponentially_and_is_capped():
+    worker = make_worker(25, backoff_base=10, backoff_max=100)
+    assert 9 <= worker.backoff(1).total_seconds() <= 11
+    assert 36 <= worker.backoff(3).total_seconds() <= 44
+    assert worker.backoff(10).total_seconds() <= 110
@@ -0,0 +1,21 @@
+from datetime import date
+
+import pytest
+
+from app.pagination import ContactSort, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(ContactSort.birthday, date(1990, 1, 1), 42)
+    assert decode_cursor(cursor, ContactSort.birthday) == (date(1990, 1, 1), 42)
+
+
+def test_cursor_rejects_other_sort():
+    cursor = encode_cursor(ContactSort.last_name, "Doe", 7)
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, ContactSort.id)
+
+
+def test_cursor_rejects_garbage():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor", ContactSort.id)
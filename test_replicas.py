@@ -0,0 +1,80 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import Column, MetaData, String, Table, create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.db import _mark_request_wrote  # noqa: F401  реєструє after_commit
+from app.replicas import Replica, ReplicaSet, RoutingSession
+
+marker = Table("marker", MetaData(), Column("name", String))
+
+
+def sqlite_engine(path, name):
+    engine = create_engine(f"sqlite:///{path}")
+    marker.create(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(marker).values(name=name))
+    return engine
+
+
+@pytest.fixture
+def databases(tmp_path):
+    primary = sqlite_engine(tmp_path / "primary.db", "primary")
+    replicas = ReplicaSet([
+        Replica("replica-0", sqlite_engine(tmp_path / "replica0.db", "replica-0")),
+        Replica("replica-1", sqlite_engine(tmp_path / "replica1.db", "replica-1")),
+    ])
+    return primary, replicas
+
+
+def read_source(session) -> str:
+    return session.execute(select(marker.c.name)).scalar()
+
+
+def test_reads_round_robin_over_replicas(databases):
+    primary, replicas = databases
+    ReadSession = sessionmaker(class_=RoutingSession, primary=primary, replicas=replicas)
+    sources = []
+    for _ in range(4):
+        with ReadSession() as session:
+            sources.append(read_source(session))
+            # Репліка закріплюється за сесією
+            assert read_source(session) == sources[-1]
+    assert sources == ["replica-0", "replica-1", "replica-0", "replica-1"]
+
+
+def test_writes_and_read_after_write_stay_on_primary(databases):
+    primary, replicas = databases
+    state = SimpleNamespace()
+    ReadSession = sessionmaker(class_=RoutingSession, primary=primary, replicas=replicas)
+    WriteSession = sessionmaker(bind=primary)
+
+    with ReadSession(info={"request_state": state}) as session:
+        assert read_source(session).startswith("replica")
+        session.execute(insert(marker).values(name="written"))
+        assert read_source(session) == "primary"
+
+    with WriteSession(info={"request_state": state}) as session:
+        session.execute(insert(marker).values(name="written"))
+        session.commit()
+    with ReadSession(info={"request_state": state}) as session:
+        assert read_source(session) == "primary"
+
+
+def test_unhealthy_replicas_fall_back_to_primary(databases, tmp_path):
+    primary, replicas = databases
+    broken = Replica("replica-2", create_engine(f"sqlite:///{tmp_path}/missing/replica.db"))
+    replicas.replicas.append(broken)
+    ReadSession = sessionmaker(class_=RoutingSession, primary=primary, replicas=replicas)
+
+    asyncio.run(replicas.check(timeout=5))
+    assert replicas.status() == {"replica-0": True, "replica-1": True, "replica-2": False}
+    with ReadSession() as session:
+        assert read_source(session) != "primary"
+
+    for replica in replicas.replicas:
+        replica.set_healthy(False)
+    with ReadSession() as session:
+        assert read_source(session) == "primary"
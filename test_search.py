@@ -0,0 +1,46 @@
+import pytest
+
+from app import crud
+from app.search import SearchMode, escape_like
+
+
+@pytest.fixture()
+def db(session, make_user, make_contact):
+    user = make_user()
+    other = make_user("other@example.com")
+    for i, (first, last) in enumerate([("Jane", "Doe"), ("Janet", "Smith"), ("Bob", "Janeway")]):
+        make_contact(user.id, first_name=first, last_name=last, phone=f"555-01{i}")
+    make_contact(other.id, first_name="Jane", last_name="Other")
+    session.commit()
+    return session, user.id
+
+
+def test_escape_like():
+    assert escape_like("50%_off") == "50\\%\\_off"
+
+
+def test_substring_search_is_scoped_to_user(db):
+    session, user_id = db
+    results = crud.search_contacts(session, "jane", user_id)
+    assert {c.first_name for c in results} == {"Jane", "Janet", "Bob"}
+
+
+def test_prefix_search(db):
+    session, user_id = db
+    results = crud.search_contacts(session, "Smi", user_id, mode=SearchMode.prefix)
+    assert [c.last_name for c in results] == ["Smith"]
+
+
+def test_search_respects_limit(db):
+    session, user_id = db
+    assert len(crud.search_contacts(session, "555", user_id, limit=2)) == 2
+
+
+# SQLite-запасний варіант: збіг — хоча б одна спільна триграма, порядок — bm25()
+def test_fuzzy_search_ranks_typos_by_shared_trigrams(db):
+    session, user_id = db
+    results = crud.search_contacts(session, "Janewy", user_id, mode=SearchMode.fuzzy)
+    assert [c.last_name for c in results] == ["Janeway", "Doe", "Smith"]
+    assert [c.last_name for c in crud.search_contacts(session, "Smiht", user_id, mode=SearchMode.fuzzy)] == ["Smith"]
+    # Перестановка, що руйнує всі триграми, нічого не знаходить
+    assert crud.search_contacts(session, "Jnae", user_id, mode=SearchMode.fuzzy) == []
@@ -0,0 +1,55 @@
+from datetime import date
+from typing import List
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app import crud, schemas
+from app.pagination import ContactSort
+from app.serialization import ORJSONResponse, encode_contacts
+
+
+@pytest.fixture()
+def db(session, make_user, make_contact):
+    user = make_user()
+    for i in range(5):
+        make_contact(user.id, first_name=f"Імʼя{i}", last_name=f"Doe \"{i}\"", birthday=date(1990, 1, i + 1),
+                     additional_info=None if i % 2 else "note")
+    session.commit()
+    return session, user.id
+
+
+# Швидкий шлях має давати ті самі байти, що й response_model + JSONResponse
+def test_fast_path_matches_response_model_output(db):
+    session, user_id = db
+    objects = crud.get_contacts(session, user_id, limit=100)
+    rows = crud.get_contacts(session, user_id, limit=100, as_rows=True)
+    validated = TypeAdapter(List[schemas.Contact]).validate_python(objects, from_attributes=True)
+    expected = JSONResponse(jsonable_encoder(validated)).body
+    assert encode_contacts(rows) == expected
+    assert ORJSONResponse(encode_contacts(rows)).body == expected
+
+
+def test_keyset_page_works_with_rows(db):
+    session, user_id = db
+    rows, next_key = crud.get_contacts_page(session, user_id, sort=ContactSort.last_name, limit=2, as_rows=True)
+    objects, object_key = crud.get_contacts_page(session, user_id, sort=ContactSort.last_name, limit=2)
+    assert [row.id for row in rows] == [contact.id for contact in objects]
+    assert next_key == object_key
+
+
+# NULL у additional_info кодується як null — однаково з orjson і без нього
+@pytest.mark.parametrize("use_orjson", [True, False], ids=["orjson", "pydantic"])
+def test_null_fields_match_response_model(db, monkeypatch, use_orjson):
+    session, user_id = db
+    if not use_orjson:
+        monkeypatch.setattr("app.serialization.orjson", None)
+    objects = crud.get_contacts(session, user_id, limit=100)
+    rows = crud.get_contacts(session, user_id, limit=100, as_rows=True)
+    assert [row.additional_info for row in rows] == ["note", None, "note", None, "note"]
+    validated = TypeAdapter(List[schemas.Contact]).validate_python(objects, from_attributes=True)
+    expected = JSONResponse(jsonable_encoder(validated)).body
+    assert b'"additional_info":null' in expected
+    assert encode_contacts(rows) == expected